@@ -1,6 +1,6 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 
 router = APIRouter()
 
@@ -12,6 +12,7 @@ except Exception:
 BenchmarkEntryPayload = core.BenchmarkEntryPayload
 BenchmarkEntryUpdate = core.BenchmarkEntryUpdate
 SupabaseError = core.SupabaseError
+conditional_json_response = core.conditional_json_response
 
 
 def ensure_supabase():
@@ -22,8 +23,8 @@ def utc_now_iso():
     return core.utc_now_iso()
 
 
-def fetch_benchmark_snapshot(mode: str = "full"):
-    return core.fetch_benchmark_snapshot(mode)
+def fetch_benchmark_snapshot(mode: str = "full", **filters):
+    return core.fetch_benchmark_snapshot(mode, **filters)
 
 
 def normalize_benchmark_entry(row: Dict[str, Any]) -> Dict[str, Any]:
@@ -35,8 +36,22 @@ def _normalize_pub_time(value: Any):
 
 
 @router.get("/api/benchmark/state")
-async def get_benchmark_state(mode: str = Query("full")):
-    return await fetch_benchmark_snapshot(mode)
+async def get_benchmark_state(
+    request: Request,
+    mode: str = Query("full"),
+    category_id: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+):
+    snapshot = await fetch_benchmark_snapshot(
+        mode,
+        category_id=category_id,
+        keyword=q,
+        limit=limit,
+        cursor=cursor,
+    )
+    return conditional_json_response(request, snapshot)
 
 
 @router.post("/api/benchmark/entries")
@@ -2,7 +2,7 @@
 from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
 router = APIRouter()
 
@@ -15,6 +15,8 @@ CommentAccountPayload = core.CommentAccountPayload
 CommentAccountUpdate = core.CommentAccountUpdate
 MyAccountSyncPayload = core.MyAccountSyncPayload
 SupabaseError = core.SupabaseError
+conditional_json_response = core.conditional_json_response
+create_http_session = core.create_http_session
 ensure_supabase = core.ensure_supabase
 extract_mid_from_homepage_link = core.extract_mid_from_homepage_link
 fetch_account_videos_from_bili = core.fetch_account_videos_from_bili
@@ -60,7 +62,7 @@ async def sync_benchmark_account_videos_for_account(
             stat = await fetch_account_video_stat(bvid, session=session)
         return build_account_video_payload(account_id, item, stat)
 
-    async with aiohttp.ClientSession() as session:
+    async with create_http_session() as session:
         results = await asyncio.gather(
             *(build_row(item, session) for item in videos),
             return_exceptions=False,
@@ -148,7 +150,7 @@ async def delete_benchmark_account(account_id: str):
 
 
 @router.get("/api/benchmark-accounts/state")
-async def get_benchmark_account_state(account_id: Optional[str] = None):
+async def get_benchmark_account_state(request: Request, account_id: Optional[str] = None):
     client = ensure_supabase()
     accounts = await client.select(BENCHMARK_ACCOUNT_TABLE, params={"order": "created_at.asc"})
     videos: List[Dict[str, Any]] = []
@@ -161,10 +163,13 @@ async def get_benchmark_account_state(account_id: Optional[str] = None):
             },
         )
 
-    return {
-        "accounts": [normalize_comment_account(item) for item in accounts],
-        "videos": [normalize_account_video(item) for item in videos],
-    }
+    return conditional_json_response(
+        request,
+        {
+            "accounts": [normalize_comment_account(item) for item in accounts],
+            "videos": [normalize_account_video(item) for item in videos],
+        },
+    )
 
 
 @router.get("/api/benchmark-accounts/video-counts")
@@ -177,7 +182,7 @@ async def get_benchmark_account_video_counts():
     if not accounts:
         return {"total": 0, "items": [], "failures": []}
 
-    async with aiohttp.ClientSession() as session:
+    async with create_http_session() as session:
         tasks: List[Tuple[str, str, asyncio.Task]] = []
         for account in accounts:
             account_id = account.get("id") or ""
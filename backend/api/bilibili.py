@@ -12,6 +12,7 @@ except Exception:
 
 BilibiliProxyRequest = core.BilibiliProxyRequest
 build_bilibili_headers = core.build_bilibili_headers
+create_http_session = core.create_http_session
 extract_video_identity = core.extract_video_identity
 handle_bilibili_proxy = core.handle_bilibili_proxy
 resolve_bilibili_url = core.resolve_bilibili_url
@@ -83,7 +84,7 @@ async def bilibili_video_info(request: dict):
 
 
 
-        async with aiohttp.ClientSession() as session:
+        async with create_http_session() as session:
 
             async with session.get(api_url, params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as resp:
 
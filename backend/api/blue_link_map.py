@@ -1,6 +1,6 @@
 from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
 router = APIRouter()
 
@@ -14,15 +14,15 @@ BlueLinkMapCategoryCreate = core.BlueLinkMapCategoryCreate
 BlueLinkMapCategoryUpdate = core.BlueLinkMapCategoryUpdate
 BlueLinkMapClearPayload = core.BlueLinkMapClearPayload
 BlueLinkMapEntryUpdate = core.BlueLinkMapEntryUpdate
-CACHE_NS_BLUE_LINK_MAP = core.CACHE_NS_BLUE_LINK_MAP
 SupabaseError = core.SupabaseError
-cache = core.cache
+conditional_json_response = core.conditional_json_response
 detect_blue_link_platform = core.detect_blue_link_platform
 fetch_blue_link_map_snapshot = core.fetch_blue_link_map_snapshot
 is_valid_blue_link_source_link = core.is_valid_blue_link_source_link
 normalize_blue_link_map_category = core.normalize_blue_link_map_category
 normalize_blue_link_map_entry = core.normalize_blue_link_map_entry
 normalize_blue_link_source_link = core.normalize_blue_link_source_link
+patch_blue_link_map_cache = core.patch_blue_link_map_cache
 
 
 
@@ -37,12 +37,29 @@ def ensure_supabase(*args, **kwargs):
 def utc_now_iso(*args, **kwargs):
     return _core_attr("utc_now_iso")(*args, **kwargs)
 
+
+async def _tombstone_entries(client, filters: Dict[str, Any]) -> List[str]:
+    """Soft-delete matching entries so delta sync can report them as deleted."""
+    now = utc_now_iso()
+    rows = await client.update(
+        "blue_link_map_entries",
+        {"deleted_at": now, "updated_at": now},
+        {**filters, "deleted_at": "is.null"},
+    )
+    return [str(row.get("id")) for row in rows or []]
+
+
 @router.get("/api/blue-link-map/state-v2")
 
-async def get_blue_link_map_state(product_ids: Optional[str] = None):
+async def get_blue_link_map_state(
+    request: Request,
+    product_ids: Optional[str] = None,
+    since: Optional[str] = None,
+):
 
     ids = [pid.strip() for pid in (product_ids or "").split(",") if pid and pid.strip()]
-    return await fetch_blue_link_map_snapshot(ids if ids else None)
+    snapshot = await fetch_blue_link_map_snapshot(ids if ids else None, since=since)
+    return conditional_json_response(request, snapshot)
 
 @router.post("/api/blue-link-map/categories")
 
@@ -80,6 +97,8 @@ async def create_blue_link_map_category(payload: BlueLinkMapCategoryCreate):
 
         raise HTTPException(status_code=status, detail=str(exc.message))
 
+    patch_blue_link_map_cache(categories=record)
+
     return {"category": normalize_blue_link_map_category(record[0])}
 
 @router.patch("/api/blue-link-map/categories/{category_id}")
@@ -124,6 +143,8 @@ async def patch_blue_link_map_category(category_id: str, payload: BlueLinkMapCat
 
         raise HTTPException(status_code=404, detail="分类不存在")
 
+    patch_blue_link_map_cache(categories=record)
+
     return {"category": normalize_blue_link_map_category(record[0])}
 
 @router.delete("/api/blue-link-map/categories/{category_id}")
@@ -138,10 +159,13 @@ async def delete_blue_link_map_category(category_id: str):
 
         raise HTTPException(status_code=404, detail="分类不存在")
 
-    await client.delete("blue_link_map_entries", {"category_id": f"eq.{category_id}"})
+    # 先软删分类下的条目，增量同步的客户端才能收到这些删除
+    removed = await _tombstone_entries(client, {"category_id": f"eq.{category_id}"})
 
     await client.delete("blue_link_map_categories", {"id": f"eq.{category_id}"})
 
+    patch_blue_link_map_cache(removed_entry_ids=removed, removed_category_ids=[category_id])
+
     return {"status": "ok"}
 
 @router.post("/api/blue-link-map/entries/batch")
@@ -188,6 +212,8 @@ async def batch_upsert_blue_link_map_entries(payload: BlueLinkMapBatchPayload):
 
             "updated_at": now,
 
+            "deleted_at": None,
+
         }
 
         if entry.product_id:
@@ -232,7 +258,7 @@ async def batch_upsert_blue_link_map_entries(payload: BlueLinkMapBatchPayload):
 
             raise HTTPException(status_code=500, detail=str(exc.message))
 
-    cache.invalidate(CACHE_NS_BLUE_LINK_MAP)
+    patch_blue_link_map_cache(entries=results)
 
     return {"entries": [normalize_blue_link_map_entry(item) for item in results]}
 
@@ -243,11 +269,11 @@ async def clear_blue_link_map_entries(payload: BlueLinkMapClearPayload):
     category_id = (payload.category_id or "").strip()
     if not account_id or not category_id:
         raise HTTPException(status_code=400, detail="账号或分类不能为空")
-    await client.delete(
-        "blue_link_map_entries",
+    removed = await _tombstone_entries(
+        client,
         {"account_id": f"eq.{account_id}", "category_id": f"eq.{category_id}"},
     )
-    cache.invalidate(CACHE_NS_BLUE_LINK_MAP)
+    patch_blue_link_map_cache(removed_entry_ids=removed)
 
     return {"status": "ok"}
 
@@ -257,7 +283,7 @@ async def patch_blue_link_map_entry(entry_id: str, payload: BlueLinkMapEntryUpda
 
     client = ensure_supabase()
 
-    existing_rows = await client.select("blue_link_map_entries", {"id": f"eq.{entry_id}"})
+    existing_rows = await client.select("blue_link_map_entries", {"id": f"eq.{entry_id}", "deleted_at": "is.null"})
 
     if not existing_rows:
 
@@ -325,6 +351,8 @@ async def patch_blue_link_map_entry(entry_id: str, payload: BlueLinkMapEntryUpda
 
             "updated_at": updates["updated_at"],
 
+            "deleted_at": None,
+
         }
 
         try:
@@ -349,11 +377,13 @@ async def patch_blue_link_map_entry(entry_id: str, payload: BlueLinkMapEntryUpda
 
         merged_entry = merged[0]
 
+        removed: List[str] = []
+
         if merged_entry.get("id") != entry_id:
 
-            await client.delete("blue_link_map_entries", {"id": f"eq.{entry_id}"})
+            removed = await _tombstone_entries(client, {"id": f"eq.{entry_id}"})
 
-        cache.invalidate(CACHE_NS_BLUE_LINK_MAP)
+        patch_blue_link_map_cache(entries=[merged_entry], removed_entry_ids=removed)
 
         return {"entry": normalize_blue_link_map_entry(merged_entry)}
 
@@ -371,7 +401,7 @@ async def patch_blue_link_map_entry(entry_id: str, payload: BlueLinkMapEntryUpda
 
         raise HTTPException(status_code=404, detail="映射不存在")
 
-    cache.invalidate(CACHE_NS_BLUE_LINK_MAP)
+    patch_blue_link_map_cache(entries=record)
 
     return {"entry": normalize_blue_link_map_entry(record[0])}
 
@@ -381,14 +411,14 @@ async def delete_blue_link_map_entry(entry_id: str):
 
     client = ensure_supabase()
 
-    existing = await client.select("blue_link_map_entries", {"id": f"eq.{entry_id}"})
+    existing = await client.select("blue_link_map_entries", {"id": f"eq.{entry_id}", "deleted_at": "is.null"})
 
     if not existing:
 
         raise HTTPException(status_code=404, detail="映射不存在")
 
-    await client.delete("blue_link_map_entries", {"id": f"eq.{entry_id}"})
+    removed = await _tombstone_entries(client, {"id": f"eq.{entry_id}"})
 
-    cache.invalidate(CACHE_NS_BLUE_LINK_MAP)
+    patch_blue_link_map_cache(removed_entry_ids=removed)
 
     return {"status": "ok"}
@@ -1,8 +1,7 @@
 import asyncio
 from typing import Any, Dict, List, Optional, Tuple
 
-import aiohttp
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
 router = APIRouter()
 
@@ -17,6 +16,8 @@ CommentComboCreate = core.CommentComboCreate
 CommentComboUpdate = core.CommentComboUpdate
 MyAccountSyncPayload = core.MyAccountSyncPayload
 SupabaseError = core.SupabaseError
+conditional_json_response = core.conditional_json_response
+create_http_session = core.create_http_session
 ensure_supabase = core.ensure_supabase
 extract_mid_from_homepage_link = core.extract_mid_from_homepage_link
 fetch_account_videos_from_bili = core.fetch_account_videos_from_bili
@@ -30,9 +31,9 @@ utc_now_iso = core.utc_now_iso
 
 @router.get("/api/comment/blue-links/state-v2")
 
-async def get_comment_blue_link_state():
+async def get_comment_blue_link_state(request: Request):
 
-    return await fetch_comment_snapshot()
+    return conditional_json_response(request, await fetch_comment_snapshot())
 
 @router.post("/api/comment/accounts")
 
@@ -116,7 +117,7 @@ async def delete_comment_account(account_id: str):
     return {"status": "ok"}
 
 @router.get("/api/my-accounts/state")
-async def get_my_account_state(account_id: Optional[str] = None):
+async def get_my_account_state(request: Request, account_id: Optional[str] = None):
     client = ensure_supabase()
     accounts = await client.select("comment_accounts", params={"order": "created_at.asc"})
     videos: List[Dict[str, Any]] = []
@@ -128,10 +129,13 @@ async def get_my_account_state(account_id: Optional[str] = None):
                 "order": "pub_time.desc.nullslast,updated_at.desc",
             },
         )
-    return {
-        "accounts": [normalize_comment_account(item) for item in accounts],
-        "videos": [normalize_account_video(item) for item in videos],
-    }
+    return conditional_json_response(
+        request,
+        {
+            "accounts": [normalize_comment_account(item) for item in accounts],
+            "videos": [normalize_account_video(item) for item in videos],
+        },
+    )
 
 @router.get("/api/my-accounts/video-counts")
 async def get_my_account_video_counts():
@@ -143,7 +147,7 @@ async def get_my_account_video_counts():
     if not accounts:
         return {"total": 0, "items": [], "failures": []}
 
-    async with aiohttp.ClientSession() as session:
+    async with create_http_session() as session:
         tasks: List[Tuple[str, str, asyncio.Task]] = []
         for account in accounts:
             account_id = account.get("id") or ""
@@ -1,11 +1,12 @@
+import asyncio
 import json
 import logging
 import re
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Optional, Set
 from urllib.parse import parse_qs, urlparse
 
 import aiohttp
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
@@ -18,9 +19,12 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+JdImageBatchRequest = core.JdImageBatchRequest
 JdImageRequest = core.JdImageRequest
 JD_SCENE_ID = core.JD_SCENE_ID
 JD_ELITE_ID = core.JD_ELITE_ID
+JD_MAIN_IMAGE_BATCH_CONCURRENCY = core.JD_MAIN_IMAGE_BATCH_CONCURRENCY
+JD_MAIN_IMAGE_BATCH_LIMIT = core.JD_MAIN_IMAGE_BATCH_LIMIT
 SupabaseError = core.SupabaseError
 
 
@@ -32,6 +36,10 @@ def utc_now_iso():
     return core.utc_now_iso()
 
 
+def conditional_json_response(request: Request, payload: Any):
+    return core.conditional_json_response(request, payload)
+
+
 def _core_attr(name: str):
     return getattr(core, name)
 
@@ -40,20 +48,12 @@ def build_bilibili_headers(*args, **kwargs):
     return _core_attr("build_bilibili_headers")(*args, **kwargs)
 
 
-def extract_jd_sku_from_url(*args, **kwargs):
-    return _core_attr("extract_jd_sku_from_url")(*args, **kwargs)
-
-
-def fetch_jd_page(*args, **kwargs):
-    return _core_attr("fetch_jd_page")(*args, **kwargs)
-
-
-def extract_jd_images_from_html(*args, **kwargs):
-    return _core_attr("extract_jd_images_from_html")(*args, **kwargs)
+def create_http_session(*args, **kwargs):
+    return _core_attr("create_http_session")(*args, **kwargs)
 
 
-def select_best_jd_image(*args, **kwargs):
-    return _core_attr("select_best_jd_image")(*args, **kwargs)
+def fetch_jd_main_image(*args, **kwargs):
+    return _core_attr("fetch_jd_main_image")(*args, **kwargs)
 
 
 def extract_taobao_item_id(*args, **kwargs):
@@ -77,8 +77,19 @@ COMMISSION_STATE_ROW_ID = "default"
 MAX_COMMISSION_STATE_ITEMS = 2000
 
 
+COMMISSION_STATE_VERSION_CONFLICT = "佣金列表已在其他页面更新，请刷新后重试"
+
+
 class CommissionStatePayload(BaseModel):
     items: List[Dict[str, Any]] = Field(default_factory=list)
+    version: Optional[int] = None
+
+
+class CommissionStateDelta(BaseModel):
+    version: int
+    upsert: List[Dict[str, Any]] = Field(default_factory=list)
+    remove: List[str] = Field(default_factory=list)
+    order: Optional[List[str]] = None
 
 
 def normalize_commission_state_items(value: Any) -> List[Dict[str, Any]]:
@@ -91,6 +102,38 @@ def normalize_commission_state_items(value: Any) -> List[Dict[str, Any]]:
     return normalized
 
 
+def commission_state_payload(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {"items": normalize_commission_state_items(row.get("items")), "version": row.get("version")}
+
+
+def apply_commission_state_delta(items: List[Dict[str, Any]], delta: CommissionStateDelta) -> List[Dict[str, Any]]:
+    """Replace/append items by ``id``, drop removed ids, then move ``order`` ids to the front in that order.
+
+    Items not named in ``order`` keep their relative order after the ordered ones.
+    """
+    removed = {str(key) for key in delta.remove}
+    changed: Dict[str, Dict[str, Any]] = {}
+    for item in delta.upsert:
+        key = str(item.get("id") or "").strip() if isinstance(item, dict) else ""
+        if not key:
+            raise HTTPException(status_code=400, detail="商品缺少 id")
+        changed[key] = item
+
+    result: List[Dict[str, Any]] = []
+    for item in items:
+        key = str(item.get("id"))
+        if key in removed:
+            continue
+        result.append(changed.pop(key, item))
+    result.extend(item for key, item in changed.items() if key not in removed)
+
+    if delta.order:
+        by_id = {str(item.get("id")): item for item in result}
+        ordered = [by_id.pop(str(key)) for key in dict.fromkeys(delta.order) if str(key) in by_id]
+        result = ordered + [item for item in result if str(item.get("id")) in by_id]
+    return result
+
+
 TAOBAO_TITLE_BLACKLIST = {
     "\u5546\u54C1\u8BE6\u60C5",
     "\u5B9D\u8D1D\u63CF\u8FF0",
@@ -141,6 +184,23 @@ def _normalize_price_text(raw: Any) -> str:
     return match.group(1) if match else ""
 
 
+_TAOBAO_TITLE_PATTERN = re.compile(
+    r'"(?:itemName|title|skuName)"\s*:\s*"([^"\\]*(?:\\.[^"\\]*)*)"', flags=re.IGNORECASE
+)
+_TAOBAO_PAGE_TITLE_PATTERN = re.compile(r"<title>(.*?)</title>", flags=re.IGNORECASE | re.DOTALL)
+_TAOBAO_SKU_KEY_PATTERN = re.compile(r'"(\d{10,})":\{')
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _decode_json_object_at(raw_html: str, start: int) -> dict:
+    # raw_decode 直接从偏移处解析，不复制页面切片，也不逐字符数括号
+    try:
+        value, _ = _JSON_DECODER.raw_decode(raw_html, start)
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
 def _extract_json_object_by_key(raw_html: str, key: str) -> dict:
     if not raw_html or not key:
         return {}
@@ -149,27 +209,7 @@ def _extract_json_object_by_key(raw_html: str, key: str) -> dict:
     idx = raw_html.find(needle)
     if idx < 0:
         return {}
-
-    start = idx + len(f'"{key}":')
-    depth = 0
-    end = None
-
-    for cursor, ch in enumerate(raw_html[start:], start=start):
-        if ch == "{":
-            depth += 1
-        elif ch == "}":
-            depth -= 1
-            if depth == 0:
-                end = cursor + 1
-                break
-
-    if not end:
-        return {}
-
-    try:
-        return json.loads(raw_html[start:end])
-    except Exception:
-        return {}
+    return _decode_json_object_at(raw_html, idx + len(needle) - 1)
 
 
 def _extract_price_from_sku_obj(sku_obj: dict) -> str:
@@ -187,14 +227,15 @@ def _extract_price_from_sku_obj(sku_obj: dict) -> str:
     return ""
 
 
-def _iter_sku_keys(raw_html: str):
+def _iter_sku_objects(raw_html: str):
+    """Yield (sku id, object offset) for each distinct SKU in page order."""
     seen = set()
-    for match in re.finditer(r'"(\d{10,})":\{', raw_html or ""):
+    for match in _TAOBAO_SKU_KEY_PATTERN.finditer(raw_html or ""):
         sku_key = match.group(1)
         if sku_key in seen:
             continue
         seen.add(sku_key)
-        yield sku_key
+        yield sku_key, match.end() - 1
 
 
 def _extract_title_from_html(raw_html: str) -> str:
@@ -202,17 +243,16 @@ def _extract_title_from_html(raw_html: str) -> str:
         return ""
 
     title_candidates = []
-    pattern = r'"(?:itemName|title|skuName)"\s*:\s*"([^"\\]*(?:\\.[^"\\]*)*)"'
-    for raw in re.findall(pattern, raw_html, flags=re.IGNORECASE):
+    for raw in _TAOBAO_TITLE_PATTERN.findall(raw_html):
         decoded = _decode_js_string(raw).strip()
         if not decoded or decoded in TAOBAO_TITLE_BLACKLIST:
             continue
         title_candidates.append(decoded)
 
     if title_candidates:
-        return sorted(title_candidates, key=len, reverse=True)[0]
+        return max(title_candidates, key=len)
 
-    title_match = re.search(r"<title>(.*?)</title>", raw_html, flags=re.IGNORECASE | re.DOTALL)
+    title_match = _TAOBAO_PAGE_TITLE_PATTERN.search(raw_html)
     if not title_match:
         return ""
 
@@ -233,8 +273,11 @@ def parse_taobao_detail_html(raw_html: str, sku_id: str = "") -> dict:
         price = _extract_price_from_sku_obj(_extract_json_object_by_key(html_text, target_sku))
 
     if not price:
-        for candidate_sku in _iter_sku_keys(html_text):
-            price = _extract_price_from_sku_obj(_extract_json_object_by_key(html_text, candidate_sku))
+        # 按需逐个解析，找到有价 SKU 即停止扫描
+        for candidate_sku, offset in _iter_sku_objects(html_text):
+            if candidate_sku == target_sku:
+                continue
+            price = _extract_price_from_sku_obj(_decode_json_object_at(html_text, offset))
             if price:
                 break
 
@@ -275,7 +318,7 @@ async def fetch_taobao_detail_fallback(source_url: str, item_id: str) -> dict:
 
     seen = set()
     timeout = aiohttp.ClientTimeout(total=20)
-    async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+    async with create_http_session(headers=headers, timeout=timeout) as session:
         for target in candidates:
             url = str(target or "").strip()
             if not url or url in seen:
@@ -299,7 +342,7 @@ async def fetch_taobao_detail_fallback(source_url: str, item_id: str) -> dict:
 
 
 @router.get("/api/commission/state")
-async def get_commission_state():
+async def get_commission_state(request: Request):
     client = ensure_supabase()
     try:
         rows = await client.select(
@@ -310,7 +353,7 @@ async def get_commission_state():
         raise HTTPException(status_code=500, detail=str(exc.message))
 
     if rows:
-        return {"items": normalize_commission_state_items(rows[0].get("items"))}
+        return conditional_json_response(request, commission_state_payload(rows[0]))
 
     now = utc_now_iso()
     try:
@@ -327,7 +370,7 @@ async def get_commission_state():
         raise HTTPException(status_code=500, detail=str(exc.message))
 
     first = inserted[0] if inserted else {"items": []}
-    return {"items": normalize_commission_state_items(first.get("items"))}
+    return conditional_json_response(request, commission_state_payload(first))
 
 
 @router.put("/api/commission/state")
@@ -338,8 +381,12 @@ async def update_commission_state(payload: CommissionStatePayload):
 
     client = ensure_supabase()
     now = utc_now_iso()
+    if payload.version is not None:
+        record = await _write_commission_state_items(client, items, payload.version)
+        return {"items": items, "version": record.get("version")}
+
     try:
-        await client.upsert(
+        record = await client.upsert(
             COMMISSION_STATE_TABLE,
             [
                 {
@@ -353,7 +400,43 @@ async def update_commission_state(payload: CommissionStatePayload):
     except SupabaseError as exc:
         raise HTTPException(status_code=500, detail=str(exc.message))
 
-    return {"items": items}
+    return {"items": items, "version": (record[0] if record else {}).get("version")}
+
+
+@router.patch("/api/commission/state")
+async def patch_commission_state(payload: CommissionStateDelta):
+    client = ensure_supabase()
+    try:
+        rows = await client.select(
+            COMMISSION_STATE_TABLE,
+            params={"id": f"eq.{COMMISSION_STATE_ROW_ID}", "select": "items,version", "limit": 1},
+        )
+    except SupabaseError as exc:
+        raise HTTPException(status_code=500, detail=str(exc.message))
+
+    if not rows or int(rows[0].get("version") or 0) != payload.version:
+        raise HTTPException(status_code=409, detail=COMMISSION_STATE_VERSION_CONFLICT)
+
+    items = apply_commission_state_delta(normalize_commission_state_items(rows[0].get("items")), payload)
+    if len(items) > MAX_COMMISSION_STATE_ITEMS:
+        raise HTTPException(status_code=400, detail="商品数量超出上限，请先清理列表")
+
+    record = await _write_commission_state_items(client, items, payload.version)
+    return {"version": record.get("version"), "item_count": len(items)}
+
+
+async def _write_commission_state_items(client, items: List[Dict[str, Any]], version: int) -> Dict[str, Any]:
+    try:
+        record = await client.update(
+            COMMISSION_STATE_TABLE,
+            {"items": items, "updated_at": utc_now_iso()},
+            {"id": f"eq.{COMMISSION_STATE_ROW_ID}", "version": f"eq.{version}"},
+        )
+    except SupabaseError as exc:
+        raise HTTPException(status_code=500, detail=str(exc.message))
+    if not record:
+        raise HTTPException(status_code=409, detail=COMMISSION_STATE_VERSION_CONFLICT)
+    return record[0]
 
 @router.post("/api/jd/product")
 
@@ -405,7 +488,7 @@ async def jd_product_proxy(request: dict):
 
 
 
-        async with aiohttp.ClientSession() as session:
+        async with create_http_session() as session:
 
             async with session.post(api_url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=15)) as response:
 
@@ -443,63 +526,9 @@ async def jd_main_image(request: JdImageRequest):
 
         raise HTTPException(status_code=400, detail="请提供京东商品链接")
 
-
-
-    sku = extract_jd_sku_from_url(link)
-
-    target_url = link
-
-    if sku:
-
-        target_url = f"https://item.jd.com/{sku}.html"
-
-
-
     try:
 
-        html_content = await fetch_jd_page(target_url)
-
-        images = extract_jd_images_from_html(html_content)
-
-        needs_mobile = not images or not any('/n0/' in (img or '') for img in images)
-
-        if needs_mobile and sku:
-
-            mobile_url = f"https://item.m.jd.com/product/{sku}.html"
-
-            try:
-
-                mobile_html = await fetch_jd_page(mobile_url)
-
-                mobile_images = extract_jd_images_from_html(mobile_html)
-
-                if mobile_images:
-
-                    images = mobile_images
-
-            except Exception as mobile_error:
-
-                logger.info(f"[JD] mobile fetch failed: {mobile_error}")
-
-        best_image = select_best_jd_image(images)
-
-        if not best_image:
-
-            raise HTTPException(status_code=404, detail="未能在页面中找到主图")
-
-        return {
-
-            "status": "success",
-
-            "sku": sku,
-
-            "source": target_url,
-
-            "image": best_image,
-
-            "candidates": images
-
-        }
+        return await fetch_jd_main_image(link)
 
     except HTTPException:
 
@@ -509,6 +538,27 @@ async def jd_main_image(request: JdImageRequest):
 
         raise HTTPException(status_code=500, detail=f"获取主图失败: {str(e)}")
 
+@router.post("/api/jd/main-image/batch")
+async def jd_main_image_batch(request: JdImageBatchRequest):
+    links = list(dict.fromkeys(link.strip() for link in request.urls if link and link.strip()))
+    if not links:
+        raise HTTPException(status_code=400, detail="请提供京东商品链接")
+    if len(links) > JD_MAIN_IMAGE_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"单次最多 {JD_MAIN_IMAGE_BATCH_LIMIT} 个链接")
+
+    semaphore = asyncio.Semaphore(JD_MAIN_IMAGE_BATCH_CONCURRENCY)
+
+    async def resolve(link: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return {"url": link, **(await fetch_jd_main_image(link))}
+            except HTTPException as exc:
+                return {"url": link, "status": "error", "detail": str(exc.detail)}
+            except Exception as exc:
+                return {"url": link, "status": "error", "detail": f"获取主图失败: {str(exc)}"}
+
+    return {"results": await asyncio.gather(*(resolve(link) for link in links))}
+
 @router.post("/api/taobao/resolve")
 async def taobao_resolve(request: dict):
     """Resolve Taobao/Tmall link and return product IDs for mapping."""
@@ -635,7 +685,7 @@ async def jd_resolve_url(request: dict):
         logger.info(f"[jd-resolve] input: {url[:80]}...")
 
         headers = build_bilibili_headers()
-        async with aiohttp.ClientSession() as session:
+        async with create_http_session() as session:
 
             async def resolve_jingfen_detail(raw_url: str) -> str:
                 token = extract_jingfen_token(raw_url)
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import APIRouter
+
+router = APIRouter()
+
+try:
+    import core as core
+except Exception:
+    from backend import core as core
+
+cancel_background_job = core.cancel_background_job
+job_runner = core.job_runner
+
+
+@router.get("/api/jobs")
+async def list_jobs(kind: Optional[str] = None):
+    """列出后台任务（排队/运行中/近期结束），附带各类型的并发与耗时统计。"""
+    return {"jobs": job_runner.list(kind), "stats": job_runner.stats()}
+
+
+@router.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    return cancel_background_job(job_id)
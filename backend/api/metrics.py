@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+router = APIRouter()
+
+try:
+    import core as core
+except Exception:
+    from backend import core as core
+
+loop_stall_monitor = core.loop_stall_monitor
+outbound_request_metrics = core.outbound_request_metrics
+render_metrics = core.render_metrics
+supabase_metrics = core.supabase_metrics
+
+
+@router.get("/api/metrics")
+async def get_metrics():
+    """Prometheus 文本格式：路由请求/耗时/响应大小、Supabase 请求、对外 HTTP 请求、缓存与后台任务队列。"""
+    return PlainTextResponse(
+        await render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get("/api/metrics/loop")
+async def get_loop_metrics():
+    """事件循环延迟与阻塞统计（需设置 LOOP_STALL_MONITOR=1 开启），含阻塞最多的代码位置。"""
+    return loop_stall_monitor.snapshot()
+
+
+@router.get("/api/metrics/supabase")
+async def get_supabase_metrics():
+    """Supabase 请求统计：按表/方法的次数、耗时分布、流量与错误率，按路由的扇出，以及慢查询（只含表名与过滤字段名）。"""
+    return supabase_metrics.snapshot()
+
+
+@router.get("/api/metrics/outbound")
+async def get_outbound_metrics():
+    """对外 HTTP 请求统计（LLM、京东/淘宝、B 站等）：按目标域名/方法的次数、错误率与耗时分布。"""
+    return outbound_request_metrics.snapshot()
@@ -14,25 +14,34 @@ PROMPT_TEMPLATE_LOCK = core.PROMPT_TEMPLATE_LOCK
 PROMPT_TEMPLATE_OVERRIDES = core.PROMPT_TEMPLATE_OVERRIDES
 PromptTemplateUpdate = core.PromptTemplateUpdate
 SchemeCreate = core.SchemeCreate
+SchemeItemOpsPayload = core.SchemeItemOpsPayload
 SchemeUpdate = core.SchemeUpdate
 SupabaseError = core.SupabaseError
+apply_scheme_item_ops = core.apply_scheme_item_ops
 ensure_supabase = core.ensure_supabase
 get_prompt_template_overrides = core.get_prompt_template_overrides
 load_local_image_templates = core.load_local_image_templates
 normalize_scheme = core.normalize_scheme
+normalize_scheme_summary = core.normalize_scheme_summary
 save_prompt_template_overrides = core.save_prompt_template_overrides
 utc_now_iso = core.utc_now_iso
 
+SCHEME_FULL_FIELDS = "id,name,category_id,category_name,remark,items,created_at,updated_at"
+SCHEME_SUMMARY_FIELDS = "id,name,category_id,category_name,remark,item_count,created_at,updated_at"
+SCHEME_VERSION_CONFLICT = "方案已被修改，请刷新后重试"
+
 
 @router.get("/api/schemes")
 
-async def list_schemes(category_id: Optional[str] = None):
+async def list_schemes(category_id: Optional[str] = None, fields: str = "full"):
 
     client = ensure_supabase()
 
+    summary = fields == "summary"
+
     params = {
 
-        "select": "id,name,category_id,category_name,remark,items,created_at,updated_at",
+        "select": SCHEME_SUMMARY_FIELDS if summary else SCHEME_FULL_FIELDS,
 
         "order": "created_at.desc"
 
@@ -48,7 +57,22 @@ async def list_schemes(category_id: Optional[str] = None):
 
     except SupabaseError as exc:
 
-        raise HTTPException(status_code=500, detail=str(exc.message))
+        if not (summary and "item_count" in str(exc.message)):
+
+            raise HTTPException(status_code=500, detail=str(exc.message))
+
+        # item_count 迁移未执行时退回读取 items，在服务端计数
+        try:
+
+            rows = await client.select("schemes", params={**params, "select": SCHEME_FULL_FIELDS})
+
+        except SupabaseError as fallback_exc:
+
+            raise HTTPException(status_code=500, detail=str(fallback_exc.message))
+
+    if summary:
+
+        return {"schemes": [normalize_scheme_summary(row) for row in rows]}
 
     return {"schemes": [normalize_scheme(row) for row in rows]}
 
@@ -164,9 +188,15 @@ async def update_scheme(scheme_id: str, payload: SchemeUpdate):
 
     updates["updated_at"] = utc_now_iso()
 
+    filters = {"id": f"eq.{scheme_id}"}
+
+    if payload.version is not None:
+
+        filters["version"] = f"eq.{payload.version}"
+
     try:
 
-        record = await client.update("schemes", updates, {"id": f"eq.{scheme_id}"})
+        record = await client.update("schemes", updates, filters)
 
     except SupabaseError as exc:
 
@@ -174,10 +204,78 @@ async def update_scheme(scheme_id: str, payload: SchemeUpdate):
 
     if not record:
 
+        if payload.version is not None and await client.select("schemes", {"id": f"eq.{scheme_id}", "select": "id"}):
+
+            raise HTTPException(status_code=409, detail=SCHEME_VERSION_CONFLICT)
+
         raise HTTPException(status_code=404, detail="方案不存在")
 
     return {"scheme": normalize_scheme(record[0])}
 
+@router.patch("/api/schemes/{scheme_id}/items")
+
+async def patch_scheme_items(scheme_id: str, payload: SchemeItemOpsPayload):
+
+    if not payload.ops:
+
+        raise HTTPException(status_code=400, detail="没有需要更新的内容")
+
+    client = ensure_supabase()
+
+    try:
+
+        rows = await client.select("schemes", {"id": f"eq.{scheme_id}", "select": "id,items,version"})
+
+    except SupabaseError as exc:
+
+        raise HTTPException(status_code=500, detail=str(exc.message))
+
+    if not rows:
+
+        raise HTTPException(status_code=404, detail="方案不存在")
+
+    current = rows[0]
+
+    if int(current.get("version") or 0) != payload.version:
+
+        raise HTTPException(status_code=409, detail=SCHEME_VERSION_CONFLICT)
+
+    items = current.get("items") if isinstance(current.get("items"), list) else []
+
+    next_items = apply_scheme_item_ops(items, payload.ops)
+
+    try:
+
+        record = await client.update(
+
+            "schemes",
+
+            {"items": next_items, "updated_at": utc_now_iso()},
+
+            {"id": f"eq.{scheme_id}", "version": f"eq.{payload.version}"},
+
+        )
+
+    except SupabaseError as exc:
+
+        raise HTTPException(status_code=500, detail=str(exc.message))
+
+    if not record:
+
+        raise HTTPException(status_code=409, detail=SCHEME_VERSION_CONFLICT)
+
+    return {
+
+        "id": scheme_id,
+
+        "version": record[0].get("version"),
+
+        "item_count": len(next_items),
+
+        "updated_at": record[0].get("updated_at"),
+
+    }
+
 @router.delete("/api/schemes/{scheme_id}")
 
 async def delete_scheme(scheme_id: str):
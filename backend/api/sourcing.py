@@ -1,10 +1,8 @@
-import asyncio
 import time
-import uuid
 from typing import Any, Dict, List, Optional
 
 import httpx
-from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
+from fastapi import APIRouter, File, Form, Header, HTTPException, Request, UploadFile
 
 router = APIRouter()
 
@@ -16,6 +14,8 @@ except Exception:
 AiBatchStartRequest = core.AiBatchStartRequest
 AiConfirmRequest = core.AiConfirmRequest
 AiFillRequest = core.AiFillRequest
+CACHE_NS_BENCHMARK_CATEGORIES = core.CACHE_NS_BENCHMARK_CATEGORIES
+JOB_KIND_SOURCING_AI_BATCH = core.JOB_KIND_SOURCING_AI_BATCH
 SCHEME_SYNC_FIELDS = core.SCHEME_SYNC_FIELDS
 SUPABASE_SERVICE_ROLE_KEY = core.SUPABASE_SERVICE_ROLE_KEY
 SUPABASE_URL = core.SUPABASE_URL
@@ -28,6 +28,11 @@ SourcingItemsByIdsRequest = core.SourcingItemsByIdsRequest
 SupabaseError = core.SupabaseError
 _sanitize_tags = core._sanitize_tags
 ai_fill_product_params = core.ai_fill_product_params
+backfill_sourcing_search_text = core.backfill_sourcing_search_text
+cache = core.cache
+cancel_background_job = core.cancel_background_job
+conditional_json_response = core.conditional_json_response
+create_sourcing_ai_job_state = core.create_sourcing_ai_job_state
 decimal_str = core.decimal_str
 delete_old_cover = core.delete_old_cover
 derive_uid_prefix = core.derive_uid_prefix
@@ -35,6 +40,8 @@ ensure_supabase = core.ensure_supabase
 fetch_sourcing_categories = core.fetch_sourcing_categories
 fetch_sourcing_category_counts = core.fetch_sourcing_category_counts
 fetch_sourcing_items_page = core.fetch_sourcing_items_page
+get_sourcing_ai_job_state = core.get_sourcing_ai_job_state
+job_runner = core.job_runner
 merge_spec_payload = core.merge_spec_payload
 normalize_sourcing_category = core.normalize_sourcing_category
 normalize_sourcing_item = core.normalize_sourcing_item
@@ -42,62 +49,20 @@ normalize_spec_fields = core.normalize_spec_fields
 normalize_spec_payload = core.normalize_spec_payload
 resolve_sourcing_ai_batch_items = core.resolve_sourcing_ai_batch_items
 run_sourcing_ai_batch_job = core.run_sourcing_ai_batch_job
+stream_job_events = core.stream_job_events
 sync_scheme_item_cover = core.sync_scheme_item_cover
+sourcing_search_text_fields = core.sourcing_search_text_fields
 sync_scheme_item_fields = core.sync_scheme_item_fields
 utc_now_iso = core.utc_now_iso
-
-
-def _update_sourcing_ai_job_state(job_id: str, **updates: Any) -> None:
-    with core.sourcing_ai_job_lock:
-        state = core.sourcing_ai_job_store.get(job_id)
-        if not state:
-            return
-        state.update(updates)
-        state["updated_at"] = utc_now_iso()
-        core.sourcing_ai_job_store[job_id] = dict(state)
-
-
-if not hasattr(core, "update_sourcing_ai_job_state"):
-    core.update_sourcing_ai_job_state = _update_sourcing_ai_job_state
-
-
-def create_sourcing_ai_job_state(total: int) -> Dict[str, Any]:
-    helper = getattr(core, "create_sourcing_ai_job_state", None)
-    if callable(helper):
-        return helper(total)
-
-    now = utc_now_iso()
-    state = {
-        "id": uuid.uuid4().hex,
-        "status": "queued",
-        "total": total,
-        "processed": 0,
-        "success": 0,
-        "failed": 0,
-        "failures": [],
-        "error": None,
-        "created_at": now,
-        "updated_at": now,
-    }
-    with core.sourcing_ai_job_lock:
-        core.sourcing_ai_job_store[state["id"]] = dict(state)
-    return dict(state)
-
-
-def get_sourcing_ai_job_state(job_id: str) -> Optional[Dict[str, Any]]:
-    helper = getattr(core, "get_sourcing_ai_job_state", None)
-    if callable(helper):
-        return helper(job_id)
-
-    with core.sourcing_ai_job_lock:
-        state = core.sourcing_ai_job_store.get(job_id)
-        return dict(state) if state else None
+write_sourcing_items = core.write_sourcing_items
 
 
 @router.get("/api/sourcing/overview")
 
 async def get_sourcing_overview(
 
+    request: Request,
+
     category_id: Optional[str] = None,
 
     limit: int = 50,
@@ -112,6 +77,8 @@ async def get_sourcing_overview(
 
     include_counts: bool = True,
 
+    cursor: Optional[str] = None,
+
 ):
 
     categories = await fetch_sourcing_categories(include_counts=include_counts)
@@ -128,10 +95,11 @@ async def get_sourcing_overview(
 
         fields=fields,
         sort=sort,
+        cursor=cursor,
 
     )
 
-    return {
+    payload = {
 
         "categories": categories,
 
@@ -147,10 +115,14 @@ async def get_sourcing_overview(
 
             "next_offset": items_page["next_offset"],
 
+            "next_cursor": items_page["next_cursor"],
+
         }
 
     }
 
+    return conditional_json_response(request, payload)
+
 @router.get("/api/sourcing/categories")
 
 async def list_sourcing_categories(include_counts: bool = True):
@@ -179,6 +151,7 @@ async def list_sourcing_items(
 
     fields: str = "list",
     sort: Optional[str] = None,
+    cursor: Optional[str] = None,
 
 ):
 
@@ -194,6 +167,7 @@ async def list_sourcing_items(
 
         fields=fields,
         sort=sort,
+        cursor=cursor,
 
     )
 
@@ -331,6 +305,8 @@ async def create_sourcing_category(payload: SourcingCategoryCreate):
 
     category = normalize_sourcing_category(record[0])
 
+    cache.invalidate(CACHE_NS_BENCHMARK_CATEGORIES)
+
     return {"category": category}
 
 @router.patch("/api/sourcing/categories/{category_id}")
@@ -388,6 +364,8 @@ async def patch_sourcing_category(category_id: str, payload: SourcingCategoryUpd
 
         raise HTTPException(status_code=404, detail="分类不存在")
 
+    cache.invalidate(CACHE_NS_BENCHMARK_CATEGORIES)
+
     return {"category": normalize_sourcing_category(record[0])}
 
 @router.delete("/api/sourcing/categories/{category_id}")
@@ -409,6 +387,8 @@ async def delete_sourcing_category(category_id: str):
 
     await client.delete("sourcing_categories", {"id": f"eq.{category_id}"})
 
+    cache.invalidate(CACHE_NS_BENCHMARK_CATEGORIES)
+
     return {"status": "ok"}
 
 @router.post("/api/sourcing/items")
@@ -467,6 +447,8 @@ async def create_sourcing_item(payload: SourcingItemCreate, request: Request):
 
         "title": title,
 
+        **sourcing_search_text_fields(title),
+
         "link": payload.link or None,
 
         "taobao_link": payload.taobao_link or None,
@@ -513,7 +495,7 @@ async def create_sourcing_item(payload: SourcingItemCreate, request: Request):
 
     try:
 
-        record = await client.insert("sourcing_items", body)
+        record = await write_sourcing_items(lambda row: client.insert("sourcing_items", row), body)
 
     except SupabaseError as exc:
 
@@ -690,6 +672,8 @@ async def create_sourcing_items_batch(payload: SourcingItemBatchCreate, request:
 
                 "title": title,
 
+                **sourcing_search_text_fields(title),
+
                 "link": item.link or None,
 
                 "taobao_link": item.taobao_link or None,
@@ -728,14 +712,9 @@ async def create_sourcing_items_batch(payload: SourcingItemBatchCreate, request:
 
             try:
 
-                record = await client.update(
-
-                    "sourcing_items",
-
+                record = await write_sourcing_items(
+                    lambda row: client.update("sourcing_items", row, {"id": f"eq.{existing['id']}"}),
                     updates,
-
-                    {"id": f"eq.{existing['id']}"}
-
                 )
 
             except SupabaseError as exc:
@@ -776,6 +755,8 @@ async def create_sourcing_items_batch(payload: SourcingItemBatchCreate, request:
 
             "title": title,
 
+            **sourcing_search_text_fields(title),
+
             "link": item.link or None,
 
             "taobao_link": item.taobao_link or None,
@@ -828,7 +809,9 @@ async def create_sourcing_items_batch(payload: SourcingItemBatchCreate, request:
 
         try:
 
-            inserted_items = await client.insert("sourcing_items", rows)
+            inserted_items = await write_sourcing_items(
+                lambda batch: client.insert("sourcing_items", batch), rows
+            )
 
             await client.update(
 
@@ -876,6 +859,14 @@ async def create_sourcing_items_batch(payload: SourcingItemBatchCreate, request:
 
     }
 
+@router.post("/api/sourcing/search-index/backfill")
+async def backfill_sourcing_search_index():
+    """为旧商品补齐拼音搜索字段（search_text）。"""
+    try:
+        return await backfill_sourcing_search_text()
+    except SupabaseError as exc:
+        raise HTTPException(status_code=500, detail=str(exc.message))
+
 @router.post("/api/sourcing/items/ai-fill")
 
 async def ai_fill_sourcing_items(payload: AiFillRequest, request: Request):
@@ -933,6 +924,7 @@ async def ai_fill_sourcing_items(payload: AiFillRequest, request: Request):
         spec_fields_raw,
         product_names,
         model_override=payload.model,
+        force=payload.force,
     )
 
     return {
@@ -1039,15 +1031,27 @@ async def ai_batch_start(payload: AiBatchStartRequest, request: Request):
         raise HTTPException(status_code=400, detail="\u8be5\u54c1\u7c7b\u6ca1\u6709\u9884\u8bbe\u53c2\u6570\u5b57\u6bb5")
     if not items:
         raise HTTPException(status_code=404, detail="\u6ca1\u6709\u627e\u5230\u5546\u54c1")
-    job_state = create_sourcing_ai_job_state(total=len(items))
-    asyncio.create_task(
-        run_sourcing_ai_batch_job(
+    job_state = create_sourcing_ai_job_state(
+        total=len(items),
+        params={
+            "item_ids": [str(item.get("id")) for item in items],
+            "category_name": category.get("name", ""),
+            "spec_fields": spec_fields_raw,
+            "model": payload.model,
+            "force": payload.force,
+        },
+    )
+    job_runner.submit(
+        JOB_KIND_SOURCING_AI_BATCH,
+        job_state["id"],
+        lambda: run_sourcing_ai_batch_job(
             job_state["id"],
             items,
             category.get("name", ""),
             spec_fields_raw,
             payload.model,
-        )
+            force=payload.force,
+        ),
     )
     return {"status": "queued", "job_id": job_state["id"], "total": len(items)}
 
@@ -1059,6 +1063,16 @@ async def ai_batch_status(job_id: str):
         raise HTTPException(status_code=404, detail="\u4efb\u52a1\u4e0d\u5b58\u5728")
     return state
 
+@router.get("/api/sourcing/items/ai-batch/events/{job_id}")
+
+async def ai_batch_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    return stream_job_events(job_id, get_sourcing_ai_job_state, last_event_id)
+
+@router.post("/api/sourcing/items/ai-batch/cancel/{job_id}")
+
+async def ai_batch_cancel(job_id: str):
+    return cancel_background_job(job_id, JOB_KIND_SOURCING_AI_BATCH)
+
 @router.patch("/api/sourcing/items/{item_id}")
 
 async def patch_sourcing_item(item_id: str, payload: SourcingItemUpdate, request: Request):
@@ -1084,6 +1098,7 @@ async def patch_sourcing_item(item_id: str, payload: SourcingItemUpdate, request
             raise HTTPException(status_code=400, detail="选品标题不能为空")
 
         updates["title"] = title
+        updates.update(sourcing_search_text_fields(title))
 
     if payload.link is not None:
 
@@ -1192,7 +1207,9 @@ async def patch_sourcing_item(item_id: str, payload: SourcingItemUpdate, request
 
     try:
 
-        record = await client.update("sourcing_items", updates, {"id": f"eq.{item_id}"})
+        record = await write_sourcing_items(
+            lambda row: client.update("sourcing_items", row, {"id": f"eq.{item_id}"}), updates
+        )
 
     except SupabaseError as exc:
 
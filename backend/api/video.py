@@ -1,7 +1,8 @@
 import logging
-from typing import Any
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
 from fastapi import APIRouter, Form, HTTPException
+from fastapi.responses import StreamingResponse
 
 router = APIRouter()
 
@@ -12,24 +13,29 @@ except Exception:
 
 DEEPSEEK_API_KEY = core.DEEPSEEK_API_KEY
 DEEPSEEK_MODEL = core.DEEPSEEK_MODEL
+LLM_CACHE_NS_SUBTITLE_SEGMENT = core.LLM_CACHE_NS_SUBTITLE_SEGMENT
 SUBTITLE_DIR = core.SUBTITLE_DIR
+SUBTITLE_SEGMENT_CONCURRENCY = core.SUBTITLE_SEGMENT_CONCURRENCY
 VIDEO_DIR = core.VIDEO_DIR
 YTDLPLogger = core.YTDLPLogger
 aiofiles = core.aiofiles
 aiohttp = core.aiohttp
 asyncio = core.asyncio
 build_bilibili_headers = core.build_bilibili_headers
-deepseek_client = core.deepseek_client
+build_subtitle_segment_chunks = core.build_subtitle_segment_chunks
 ensure_bilibili_cookie_file = core.ensure_bilibili_cookie_file
 extract_video_identity = core.extract_video_identity
 fetch_subtitle_from_official_api = core.fetch_subtitle_from_official_api
 json = core.json
+lazy_import = core.lazy_import
 load_cached_subtitle = core.load_cached_subtitle
+make_cache_key = core.make_cache_key
+merge_segment_texts = core.merge_segment_texts
+normalize_llm_cache_text = core.normalize_llm_cache_text
 os = core.os
 re = core.re
 sanitize_filename = core.sanitize_filename
 save_subtitle_cache = core.save_subtitle_cache
-yt_dlp = core.yt_dlp
 
 logger = logging.getLogger(__name__)
 
@@ -105,7 +111,7 @@ async def download_video(url: str = Form(...)):
 
     try:
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with lazy_import("yt_dlp").YoutubeDL(ydl_opts) as ydl:
 
             await asyncio.to_thread(ydl.download, [url])
 
@@ -215,7 +221,7 @@ async def get_subtitle(
 
     try:
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with lazy_import("yt_dlp").YoutubeDL(ydl_opts) as ydl:
 
             info = await asyncio.to_thread(ydl.extract_info, final_url, download=False)
 
@@ -261,7 +267,7 @@ async def get_subtitle(
 
                 ydl_opts['writeautomaticsub'] = True
 
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl2:
+                with lazy_import("yt_dlp").YoutubeDL(ydl_opts) as ydl2:
 
                     await asyncio.to_thread(ydl2.download, [final_url])
 
@@ -341,9 +347,123 @@ async def get_subtitle(
 
         raise HTTPException(status_code=500, detail=f"获取字幕失败: {str(e)}")
 
+SEGMENT_INSTRUCTION = """【你是一位资深的文案排版助手。我会给你一段没有标点的视频字幕提取文案，请按以下要求处理：
+
+添加标点： 为文案补充正确的标点符号，使逻辑清晰。
+
+禁止修改： 严禁修改、增加或删除原有的任何文字词汇，保持原汁原味。
+
+格式限制： 全文禁止使用双引号（""）。
+
+商品分段： 识别文案中的不同商品或主题，并在每个商品介绍之间进行分段。
+
+只输出排版后的文案，不要包含任何多余的开场白或解释。】"""
+
+# 修改 SEGMENT_INSTRUCTION 或分块策略时递增，使旧的缓存结果失效
+SEGMENT_PROMPT_VERSION = 1
+
+
+def _extract_choice_content(choice: Any) -> str:
+    if isinstance(choice, dict):
+        message = choice.get("message") or {}
+        if isinstance(message, dict):
+            return message.get("content", "")
+        return getattr(message, "content", "")
+    message = getattr(choice, "message", None)
+    if isinstance(message, dict):
+        return message.get("content", "")
+    return getattr(message, "content", "")
+
+
+async def request_segment_completion(text: str) -> str:
+    """对单个分块调用 DeepSeek 排版。"""
+    prompt = f"""{SEGMENT_INSTRUCTION}\n\n\n\n文案内容：\n\n{text}\n\n\n\n请严格按照要求输出排版后的文案。"""
+    response = await core.get_llm_client("deepseek").chat.completions.create(
+        model=DEEPSEEK_MODEL or "deepseek-chat",
+        messages=[
+            {
+                "role": "system",
+                "content": "你是电商文案排版助手，只能在不改动原始词汇的前提下添加标点与分段。",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.2,
+    )
+    choices = response.choices or []
+    if not choices:
+        raise HTTPException(status_code=500, detail="AI 未返回结果")
+    return (_extract_choice_content(choices[0]) or "").strip()
+
+
+async def segment_chunk_with_cache(lines: List[str], force: bool = False) -> str:
+    text = "\n".join(lines)
+    cache_key = make_cache_key(
+        SEGMENT_PROMPT_VERSION,
+        DEEPSEEK_MODEL or "deepseek-chat",
+        [normalize_llm_cache_text(line) for line in lines],
+    )
+    result_cache = core.llm_result_cache
+    if not force:
+        cached = await result_cache.get(LLM_CACHE_NS_SUBTITLE_SEGMENT, cache_key)
+        if isinstance(cached, str):
+            return cached
+    content = await request_segment_completion(text)
+    if content:
+        await result_cache.set(LLM_CACHE_NS_SUBTITLE_SEGMENT, cache_key, content)
+    return content
+
+
+async def iter_segment_results(
+    chunks: List[List[str]],
+    force: bool = False,
+) -> AsyncIterator[Dict[str, Any]]:
+    """并发排版各分块，按完成顺序产出进度，并按原文顺序产出去重后的片段。"""
+    semaphore = asyncio.Semaphore(SUBTITLE_SEGMENT_CONCURRENCY)
+
+    async def run_chunk(index: int, lines: List[str]) -> Tuple[int, str]:
+        async with semaphore:
+            return index, await segment_chunk_with_cache(lines, force=force)
+
+    total = len(chunks)
+    tasks = [asyncio.create_task(run_chunk(index, lines)) for index, lines in enumerate(chunks)]
+    results: Dict[int, str] = {}
+    next_index = 0
+    stitched = ""
+    completed = 0
+    try:
+        for future in asyncio.as_completed(tasks):
+            index, text = await future
+            results[index] = text
+            completed += 1
+            yield {"type": "progress", "completed": completed, "total": total}
+            while next_index in results:
+                current = results.pop(next_index)
+                piece = merge_segment_texts(stitched, current)
+                # 未能识别重叠（模型改写了接缝处）时另起一行，避免两块文案粘连
+                if stitched and piece == current and not stitched.endswith("\n"):
+                    piece = "\n" + piece
+                stitched += piece
+                yield {"type": "chunk", "index": next_index, "total": total, "text": piece}
+                next_index += 1
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    yield {"type": "done", "total": total, "text": stitched}
+
+
+async def stream_segment_results(chunks: List[List[str]], force: bool = False) -> AsyncIterator[str]:
+    try:
+        async for event in iter_segment_results(chunks, force=force):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+    except Exception as exc:
+        detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+        yield json.dumps({"type": "error", "detail": detail}, ensure_ascii=False) + "\n"
+
+
 @router.post("/api/subtitle/segment")
 async def segment_subtitle(request: dict):
-    """使用 DeepSeek 对字幕进行语义分段"""
+    """使用 DeepSeek 对字幕进行语义分段（长文案分块并发处理，stream=true 时按 NDJSON 流式返回，force=true 时跳过结果缓存）"""
     try:
         events = request.get('events', [])
         if not events:
@@ -355,58 +475,26 @@ async def segment_subtitle(request: dict):
             if content:
                 text_parts.append(content)
 
-        raw_text = "\n".join(text_parts).strip()
-        if not raw_text:
+        if not "\n".join(text_parts).strip():
             raise HTTPException(status_code=400, detail="字幕内容为空")
 
-        trimmed_text = raw_text[:10000]
-        instruction = """【你是一位资深的文案排版助手。我会给你一段没有标点的视频字幕提取文案，请按以下要求处理：
-
-添加标点： 为文案补充正确的标点符号，使逻辑清晰。
-
-禁止修改： 严禁修改、增加或删除原有的任何文字词汇，保持原汁原味。
-
-格式限制： 全文禁止使用双引号（""）。
-
-商品分段： 识别文案中的不同商品或主题，并在每个商品介绍之间进行分段。
-
-只输出排版后的文案，不要包含任何多余的开场白或解释。】"""
+        if not DEEPSEEK_API_KEY:
+            raise HTTPException(status_code=500, detail="未配置 DeepSeek API 密钥")
 
-        prompt = f"""{instruction}\n\n\n\n文案内容：\n\n{trimmed_text}\n\n\n\n请严格按照要求输出排版后的文案。"""
+        chunks = build_subtitle_segment_chunks(text_parts)
+        force = bool(request.get("force"))
 
-        if not DEEPSEEK_API_KEY or not deepseek_client:
-            raise HTTPException(status_code=500, detail="未配置 DeepSeek API 密钥")
+        if request.get("stream"):
+            return StreamingResponse(
+                stream_segment_results(chunks, force=force),
+                media_type="application/x-ndjson",
+            )
 
-        response = await asyncio.to_thread(
-            deepseek_client.chat.completions.create,
-            model=DEEPSEEK_MODEL or "deepseek-chat",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "你是电商文案排版助手，只能在不改动原始词汇的前提下添加标点与分段。",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-        )
-
-        choices = response.choices or []
-        if not choices:
-            raise HTTPException(status_code=500, detail="AI 未返回结果")
-
-        def extract_choice_content(choice: Any) -> str:
-            if isinstance(choice, dict):
-                message = choice.get("message") or {}
-                if isinstance(message, dict):
-                    return message.get("content", "")
-                return getattr(message, "content", "")
-            message = getattr(choice, "message", None)
-            if isinstance(message, dict):
-                return message.get("content", "")
-            return getattr(message, "content", "")
-
-        content = extract_choice_content(choices[0])
-        return {"status": "ok", "text": content}
+        content = ""
+        async for event in iter_segment_results(chunks, force=force):
+            if event["type"] == "done":
+                content = event["text"]
+        return {"status": "ok", "text": content, "chunks": len(chunks)}
     except HTTPException:
         raise
     except Exception as exc:
@@ -1,7 +1,7 @@
 import asyncio
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
 
 router = APIRouter()
 
@@ -10,18 +10,25 @@ try:
 except Exception:
     from backend import core as core
 
+COUNT_METHODS = core.COUNT_METHODS
+JOB_KIND_ZHIHU_SCRAPE = core.JOB_KIND_ZHIHU_SCRAPE
 SupabaseError = core.SupabaseError
 ZhihuKeywordPayload = core.ZhihuKeywordPayload
 ZhihuKeywordUpdate = core.ZhihuKeywordUpdate
 ZhihuQuestionCreatePayload = core.ZhihuQuestionCreatePayload
 ZhihuScrapeRunPayload = core.ZhihuScrapeRunPayload
+build_keyset_filter = core.build_keyset_filter
+cancel_background_job = core.cancel_background_job
 create_zhihu_job_state = core.create_zhihu_job_state
+decode_page_cursor = core.decode_page_cursor
+encode_page_cursor = core.encode_page_cursor
 extract_zhihu_question_id = core.extract_zhihu_question_id
 fetch_supabase_count = core.fetch_supabase_count
 get_zhihu_job_state = core.get_zhihu_job_state
 invalidate_zhihu_keywords_map_cache = core.invalidate_zhihu_keywords_map_cache
+stream_job_events = core.stream_job_events
 strip_html_tags = core.strip_html_tags
-zhihu_scrape_job = core.zhihu_scrape_job
+submit_zhihu_scrape_job = core.submit_zhihu_scrape_job
 
 
 
@@ -257,17 +264,29 @@ async def create_zhihu_question(payload: ZhihuQuestionCreatePayload):
     }
 
 @router.get("/api/zhihu/questions")
-async def list_zhihu_questions(keyword_id: Optional[str] = None, q: Optional[str] = None, limit: int = 50, offset: int = 0):
+async def list_zhihu_questions(
+    keyword_id: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    count: str = "exact",
+):
     client = ensure_supabase()
     limit = max(1, min(int(limit or 50), 200))
     offset = max(0, int(offset or 0))
+    count_method = count if count in COUNT_METHODS else None
+    after = decode_page_cursor(cursor)
 
     params: Dict[str, Any] = {
         "select": "id,title,url,first_keyword_id,created_at,updated_at,last_seen_at",
-        "order": "updated_at.desc",
-        "limit": limit,
+        "order": "updated_at.desc,id.desc",
+        "limit": limit + 1,
         "offset": offset,
     }
+    if after:
+        params["and"] = build_keyset_filter("updated_at", after)
+        params.pop("offset")
     count_params: Dict[str, Any] = {}
 
     safe_q = None
@@ -294,6 +313,7 @@ async def list_zhihu_questions(keyword_id: Optional[str] = None, q: Optional[str
                     "limit": limit,
                     "has_more": False,
                     "next_offset": offset,
+                    "next_cursor": None,
                     "total": 0,
                 },
             }
@@ -301,9 +321,15 @@ async def list_zhihu_questions(keyword_id: Optional[str] = None, q: Optional[str
         params["id"] = id_filter
         count_params["id"] = id_filter
 
-    questions_task = client.select("zhihu_questions", params)
-    total_task = fetch_supabase_count(client, "zhihu_questions", count_params)
-    questions, total = await asyncio.gather(questions_task, total_task)
+    if count_method:
+        questions, total = await asyncio.gather(
+            client.select("zhihu_questions", params),
+            fetch_supabase_count(client, "zhihu_questions", count_params, method=count_method),
+        )
+    else:
+        questions, total = await client.select("zhihu_questions", params), None
+    has_more = len(questions) > limit
+    questions = questions[:limit]
 
     question_ids = [str(row.get("id")) for row in questions if row.get("id")]
     if question_ids:
@@ -358,7 +384,7 @@ async def list_zhihu_questions(keyword_id: Optional[str] = None, q: Optional[str
         )
 
     next_offset = offset + len(items)
-    has_more = next_offset < total
+    next_cursor = encode_page_cursor(questions[-1], "updated_at") if has_more else None
     return {
         "items": items,
         "total": total,
@@ -367,6 +393,7 @@ async def list_zhihu_questions(keyword_id: Optional[str] = None, q: Optional[str
             "limit": limit,
             "has_more": has_more,
             "next_offset": next_offset,
+            "next_cursor": next_cursor,
             "total": total,
         },
     }
@@ -391,12 +418,10 @@ async def get_zhihu_question_stats(question_id: str, days: int = 15):
 @router.post("/api/zhihu/scrape/run")
 async def run_zhihu_scrape(payload: Optional[ZhihuScrapeRunPayload] = None, dry_run: bool = False):
     keyword_id = payload.keyword_id if payload else None
-    job_state = create_zhihu_job_state(total=0, keyword_id=keyword_id)
+    job_state = create_zhihu_job_state(total=0, keyword_id=keyword_id, persist=not dry_run)
     job_id = job_state["id"]
     if not dry_run:
-        asyncio.create_task(
-            zhihu_scrape_job(keyword_id=keyword_id, include_existing=True, job_id=job_id)
-        )
+        submit_zhihu_scrape_job(job_id, keyword_id)
     return {"status": "queued", "job_id": job_id}
 
 @router.get("/api/zhihu/scrape/status/{job_id}")
@@ -405,3 +430,11 @@ async def get_zhihu_scrape_status(job_id: str):
     if not state:
         raise HTTPException(status_code=404, detail="任务不存在")
     return state
+
+@router.get("/api/zhihu/scrape/events/{job_id}")
+async def stream_zhihu_scrape_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    return stream_job_events(job_id, get_zhihu_job_state, last_event_id)
+
+@router.post("/api/zhihu/scrape/cancel/{job_id}")
+async def cancel_zhihu_scrape(job_id: str):
+    return cancel_background_job(job_id, JOB_KIND_ZHIHU_SCRAPE)
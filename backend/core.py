@@ -10,12 +10,16 @@ import asyncio
 
 import base64
 
+import importlib.util
+
 import io
 
 import json
 
 import os
 
+import random
+
 import re
 
 import time
@@ -24,6 +28,7 @@ import hashlib
 import html
 import logging
 import threading
+from collections import deque
 
 from datetime import datetime, timezone, date, timedelta
 
@@ -31,7 +36,7 @@ from decimal import Decimal, InvalidOperation
 
 from pathlib import Path
 
-from typing import List, Optional, Dict, Any, Tuple, Set, Literal, Callable, Awaitable
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple, Set, Literal, Callable, Awaitable, AsyncIterator, Iterable, Sequence
 from uuid import uuid4
 
 from urllib.parse import urlencode, urlparse, parse_qs, quote, unquote
@@ -45,36 +50,92 @@ import aiofiles
 
 import httpx
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
-from playwright.async_api import async_playwright
-
-from dashscope import MultiModalConversation, Generation
-
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # orjson 可选：缺失时退回标准库 json
+    orjson = None
+
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Request
 
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response, StreamingResponse
 
 from fastapi.middleware.cors import CORSMiddleware
 
-from openai import OpenAI
-
-from PIL import Image, ImageFilter, ImageOps
-
-import yt_dlp
-
-from pypinyin import lazy_pinyin, Style
-
 from pydantic import BaseModel, Field, validator
 try:
     from backend.services.cache import cache
+    from backend.services.compression import CompressionMiddleware
+    from backend.services.http_cache import ConditionalJSON
+    from backend.services.llm_cache import LlmResultCache, make_cache_key
+    from backend.services.llm_clients import LlmClientRegistry
+    from backend.services.job_checkpoints import JobCheckpointStore
+    from backend.services.job_runner import JobRunner
+    from backend.services.job_events import JobEventBroker
+    from backend.services.loop_monitor import LoopStallMonitor
+    from backend.services.metrics import (
+        HttpRequestMetrics,
+        OutboundRequestMetrics,
+        RequestContextMiddleware,
+        SupabaseQueryMetrics,
+        render_prometheus,
+    )
     from backend.services import bilibili_account as bilibili_account_service
 except Exception:
     from services.cache import cache  # type: ignore
+    from services.compression import CompressionMiddleware  # type: ignore
+    from services.http_cache import ConditionalJSON  # type: ignore
+    from services.llm_cache import LlmResultCache, make_cache_key  # type: ignore
+    from services.llm_clients import LlmClientRegistry  # type: ignore
+    from services.job_checkpoints import JobCheckpointStore  # type: ignore
+    from services.job_runner import JobRunner  # type: ignore
+    from services.job_events import JobEventBroker  # type: ignore
+    from services.loop_monitor import LoopStallMonitor  # type: ignore
+    from services.metrics import (  # type: ignore
+        HttpRequestMetrics,
+        OutboundRequestMetrics,
+        RequestContextMiddleware,
+        SupabaseQueryMetrics,
+        render_prometheus,
+    )
     from services import bilibili_account as bilibili_account_service  # type: ignore
 
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from openai import AsyncOpenAI
+
+# 重依赖按需加载：冷启动（如 Vercel）只为真正用到的功能付出导入成本。
+# 模块内通过 lazy_import(name) 取用；外部访问 core.<name>（含 main.<name>）也会触发加载。
+LAZY_IMPORTS: Dict[str, Tuple[str, Optional[str]]] = {
+    "AsyncIOScheduler": ("apscheduler.schedulers.asyncio", "AsyncIOScheduler"),
+    "AsyncOpenAI": ("openai", "AsyncOpenAI"),
+    "CronTrigger": ("apscheduler.triggers.cron", "CronTrigger"),
+    "Generation": ("dashscope", "Generation"),
+    "Image": ("PIL.Image", None),
+    "ImageFilter": ("PIL.ImageFilter", None),
+    "ImageOps": ("PIL.ImageOps", None),
+    "MultiModalConversation": ("dashscope", "MultiModalConversation"),
+    "Style": ("pypinyin", "Style"),
+    "async_playwright": ("playwright.async_api", "async_playwright"),
+    "lazy_pinyin": ("pypinyin", "lazy_pinyin"),
+    "yt_dlp": ("yt_dlp", None),
+}
+
+def lazy_import(name: str) -> Any:
+    value = globals().get(name)
+    if value is None:
+        module_name, attr = LAZY_IMPORTS[name]
+        module = importlib.import_module(module_name)
+        value = getattr(module, attr) if attr else module
+        globals()[name] = value
+    return value
+
+def __getattr__(name: str) -> Any:
+    if name in LAZY_IMPORTS:
+        return lazy_import(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # 加载环境变量
 
 load_dotenv()
@@ -142,6 +203,7 @@ class AiFillRequest(BaseModel):
     mode: Literal["single", "batch", "selected"] = "single"
     product_names: Optional[List[str]] = None
     model: Optional[str] = None
+    force: bool = False
 
 class AiConfirmRequest(BaseModel):
     category_id: str
@@ -155,6 +217,7 @@ class AiBatchStartRequest(BaseModel):
     price_max: Optional[float] = None
     sort: Optional[str] = None
     model: Optional[str] = None
+    force: bool = False
 
 class SchemeGenerateRequest(BaseModel):
     type: str
@@ -174,6 +237,18 @@ class SchemeUpdate(BaseModel):
     category_name: Optional[str] = None
     remark: Optional[str] = None
     items: Optional[List[Dict[str, Any]]] = None
+    version: Optional[int] = None
+
+class SchemeItemOp(BaseModel):
+    op: Literal["add", "remove", "move", "patch"]
+    id: Optional[str] = None
+    item: Optional[Dict[str, Any]] = None
+    index: Optional[int] = None
+    fields: Optional[Dict[str, Any]] = None
+
+class SchemeItemOpsPayload(BaseModel):
+    version: int
+    ops: List[SchemeItemOp] = Field(default_factory=list)
 
 class PromptTemplateUpdate(BaseModel):
     content: Optional[str] = None
@@ -327,12 +402,22 @@ PLAYWRIGHT_ENABLED = env_bool("PLAYWRIGHT_ENABLED", default=not IS_VERCEL)
 CACHE_TTL_SECONDS = 2.0
 SOURCING_CATEGORY_COUNT_TTL_SECONDS = 60.0
 BLUE_LINK_MAP_CACHE_TTL_SECONDS = 10.0
+BLUE_LINK_MAP_TOMBSTONE_RETENTION_DAYS = int(os.getenv("BLUE_LINK_MAP_TOMBSTONE_RETENTION_DAYS", "30"))
+# 同步版本回退的秒数：覆盖版本生成时尚未提交的并发写入
+BLUE_LINK_MAP_SYNC_SKEW_SECONDS = 5.0
 ZHIHU_KEYWORDS_MAP_CACHE_TTL_SECONDS = 300.0
+BENCHMARK_CATEGORIES_CACHE_TTL_SECONDS = 60.0
+JD_MAIN_IMAGE_CACHE_TTL_SECONDS = 6 * 3600.0
+# search_text 列缺失（迁移未执行）的判定保留多久后重新尝试写入该列
+SOURCING_SEARCH_TEXT_MISSING_TTL_SECONDS = 600.0
 
+CACHE_NS_BENCHMARK_CATEGORIES = "benchmark_categories"
 CACHE_NS_BLUE_LINK_MAP = "blue_link_map"
+CACHE_NS_JD_MAIN_IMAGE = "jd_main_image"
 CACHE_NS_SOURCING_CATEGORY_COUNT = "sourcing_category_count"
 CACHE_NS_ZHIHU_KEYWORDS = "zhihu_keywords"
 CACHE_NS_SOURCING_ITEMS = "sourcing_items"
+CACHE_NS_SOURCING_SEARCH_TEXT_MISSING = "sourcing_search_text_missing"
 
 SOURCING_ITEMS_CACHE_LIMIT = 32
 
@@ -358,10 +443,31 @@ COOKIE_FILE = COOKIE_DIR / "bilibili_cookies.txt"
 
 SUBTITLE_CACHE_VERSION = 2
 
+LLM_CACHE_DIR = DOWNLOAD_DIR / "llm-cache"
+
 for dir_path in [DOWNLOAD_DIR, VIDEO_DIR, SUBTITLE_DIR, COOKIE_DIR]:
 
     dir_path.mkdir(parents=True, exist_ok=True)
 
+# 大模型结果缓存（按提示词版本 + 模型 + 归一化输入做内容寻址）
+
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600.0
+LLM_CACHE_MAX_ENTRIES = 2000
+
+LLM_CACHE_NS_SUBTITLE_SEGMENT = "subtitle_segment"
+LLM_CACHE_NS_AI_PARAMS = "ai_params"
+
+AI_PARAMS_PROMPT_VERSION = 1
+
+llm_result_cache = LlmResultCache(
+    LLM_CACHE_DIR,
+    ttl=LLM_CACHE_TTL_SECONDS,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+)
+
+def normalize_llm_cache_text(value: Any) -> str:
+    return re.sub(r"\s+", " ", str(value or "")).strip()
+
 # API 密钥
 
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
@@ -405,6 +511,52 @@ SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 
+# Supabase HTTP 客户端：连接池上限、可选 HTTP/2（需安装 h2）、幂等请求的抖动重试
+
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "30"))
+
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "50"))
+
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "20"))
+
+SUPABASE_HTTP2 = env_bool("SUPABASE_HTTP2", default=False)
+
+SUPABASE_MAX_RETRIES = int(os.getenv("SUPABASE_MAX_RETRIES", "2"))
+
+SUPABASE_RETRY_BACKOFF = float(os.getenv("SUPABASE_RETRY_BACKOFF", "0.3"))
+
+SUPABASE_IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+SUPABASE_RETRY_STATUS_CODES = (502, 503, 504)
+
+SUPABASE_SLOW_QUERY_SECONDS = float(os.getenv("SUPABASE_SLOW_QUERY_SECONDS", "1.0"))
+
+supabase_metrics = SupabaseQueryMetrics(slow_threshold=SUPABASE_SLOW_QUERY_SECONDS)
+
+http_request_metrics = HttpRequestMetrics()
+
+# 对外 HTTP 请求（LLM、京东/淘宝、B 站等）按目标域名统计；Supabase 另有 supabase_metrics
+outbound_request_metrics = OutboundRequestMetrics()
+
+def create_http_session(**kwargs: Any) -> aiohttp.ClientSession:
+    """aiohttp.ClientSession that reports to outbound_request_metrics."""
+    trace_configs = list(kwargs.pop("trace_configs", None) or [])
+    trace_configs.append(outbound_request_metrics.aiohttp_trace_config())
+    return aiohttp.ClientSession(trace_configs=trace_configs, **kwargs)
+
+def create_httpx_client(*, limits: Optional[httpx.Limits] = None, **kwargs: Any) -> httpx.AsyncClient:
+    """httpx.AsyncClient that reports to outbound_request_metrics."""
+    transport = httpx.AsyncHTTPTransport(limits=limits) if limits else httpx.AsyncHTTPTransport()
+    return httpx.AsyncClient(transport=outbound_request_metrics.httpx_transport(transport), **kwargs)
+
+# 事件循环阻塞监测（默认关闭）：记录循环延迟，超过阈值时抓取正在执行的调用栈
+
+LOOP_STALL_MONITOR_ENABLED = env_bool("LOOP_STALL_MONITOR", default=False)
+
+LOOP_STALL_THRESHOLD_SECONDS = float(os.getenv("LOOP_STALL_THRESHOLD_SECONDS", "0.1"))
+
+loop_stall_monitor = LoopStallMonitor(threshold=LOOP_STALL_THRESHOLD_SECONDS)
+
 FEISHU_APP_ID = os.getenv("FEISHU_APP_ID")
 
 FEISHU_APP_SECRET = os.getenv("FEISHU_APP_SECRET")
@@ -413,21 +565,54 @@ FEISHU_API_BASE = "https://open.feishu.cn/open-apis"
 
 feishu_http_client: Optional[httpx.AsyncClient] = None
 
+BIGMODEL_API_BASE = "https://open.bigmodel.cn/api/paas/v4"
+
+BIGMODEL_SEARCH_CONCURRENCY = 4
+
+BIGMODEL_SEARCH_TIMEOUT = 30.0
+
+BIGMODEL_CHAT_TIMEOUT = 300.0
+
+bigmodel_http_client: Optional[httpx.AsyncClient] = None
+
 feishu_token_cache = {"token": None, "expires_at": 0.0}
 
-# 初始化 DeepSeek 客户端（允许无密钥启动）
+# 大模型客户端（异步，按 base_url 共享连接池；startup 创建、shutdown 关闭，允许无密钥启动）
 
-deepseek_client: Optional[OpenAI] = None
+DASHSCOPE_COMPATIBLE_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
 
-if DEEPSEEK_API_KEY:
+LLM_CLIENT_TIMEOUT = float(os.getenv("LLM_CLIENT_TIMEOUT", "300"))
 
-    deepseek_client = OpenAI(
+LLM_CLIENT_MAX_RETRIES = int(os.getenv("LLM_CLIENT_MAX_RETRIES", "2"))
 
-        api_key=DEEPSEEK_API_KEY,
+LLM_CLIENT_MAX_CONNECTIONS = int(os.getenv("LLM_CLIENT_MAX_CONNECTIONS", "20"))
 
-        base_url=DEEPSEEK_BASE_URL
+llm_client_registry: Optional[LlmClientRegistry] = None
 
-    )
+def get_llm_client_registry() -> LlmClientRegistry:
+    global llm_client_registry
+    if llm_client_registry is None:
+        llm_client_registry = LlmClientRegistry(
+            timeout=LLM_CLIENT_TIMEOUT,
+            max_retries=LLM_CLIENT_MAX_RETRIES,
+            max_connections=LLM_CLIENT_MAX_CONNECTIONS,
+            outbound_metrics=outbound_request_metrics,
+        )
+    return llm_client_registry
+
+def get_llm_client(provider: str) -> "AsyncOpenAI":
+    """按服务商返回共享的异步客户端（deepseek / dashscope）"""
+    if provider == "deepseek":
+        api_key = DEEPSEEK_API_KEY or os.getenv("DEEPSEEK_API_KEY", "")
+        base_url = DEEPSEEK_BASE_URL
+    elif provider == "dashscope":
+        api_key = os.getenv("DASHSCOPE_API_KEY") or DASHSCOPE_API_KEY or ""
+        base_url = os.getenv("DASHSCOPE_BASE_URL") or DASHSCOPE_COMPATIBLE_BASE_URL
+    else:
+        raise ValueError(f"unknown llm provider: {provider}")
+    if not api_key:
+        raise HTTPException(status_code=500, detail=f"未配置 {provider} API 密钥")
+    return get_llm_client_registry().client(api_key=api_key, base_url=base_url)
 
 
 cookie_file_initialized = False
@@ -456,7 +641,30 @@ BILIBILI_DM_IMG_STR = bilibili_account_service.BILIBILI_DM_IMG_STR
 BILIBILI_DM_COVER_IMG_STR = bilibili_account_service.BILIBILI_DM_COVER_IMG_STR
 BILIBILI_DM_IMG_INTER = bilibili_account_service.BILIBILI_DM_IMG_INTER
 
-app = FastAPI(title="B站电商创作工作台 API")
+def json_loads(data: Any) -> Any:
+    """Decode JSON bytes/str with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# 状态快照接口的 ETag：序列化结果与哈希随缓存的快照对象一起复用
+
+state_responses = ConditionalJSON()
+
+
+def conditional_json_response(request: Request, payload: Any) -> Response:
+    """JSON response with a strong ETag; 304 when ``If-None-Match`` matches."""
+    key = (request.url.path, request.url.query)
+    return state_responses.respond(key, payload, request.headers.get("if-none-match"))
+
+# 大列表快照接口的序列化与压缩：orjson 默认响应类 + 超过阈值的 gzip/brotli 压缩
+
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+
+app = FastAPI(
+    title="B站电商创作工作台 API",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
 
 PROMPT_TEMPLATE_DEFAULTS = {
 
@@ -532,7 +740,7 @@ def load_local_image_templates() -> List[Dict[str, Any]]:
 
 supabase_client: Optional["SupabaseClient"] = None
 
-zhihu_scheduler: Optional[AsyncIOScheduler] = None
+zhihu_scheduler: Optional["AsyncIOScheduler"] = None
 zhihu_playwright = None
 zhihu_browser = None
 zhihu_job_store: Dict[str, Dict[str, Any]] = {}
@@ -541,6 +749,36 @@ zhihu_job_lock = threading.Lock()
 sourcing_ai_job_store: Dict[str, Dict[str, Any]] = {}
 sourcing_ai_job_lock = threading.Lock()
 
+# 后台任务检查点：任务状态与逐项进度落盘，重启后续跑未完成的任务
+
+JOB_CHECKPOINT_DB = DOWNLOAD_DIR / "jobs.sqlite3"
+
+JOB_RETENTION_SECONDS = 3 * 24 * 3600.0
+
+JOB_KIND_ZHIHU_SCRAPE = "zhihu_scrape"
+
+JOB_KIND_SOURCING_AI_BATCH = "sourcing_ai_batch"
+
+job_checkpoint_store = JobCheckpointStore(JOB_CHECKPOINT_DB)
+
+# 统一的后台任务调度：按类型限制并发，结束的任务状态保留 JOB_STATE_TTL_SECONDS 后从内存移除
+
+JOB_STATE_TTL_SECONDS = 3600.0
+
+JOB_KIND_CONCURRENCY = {JOB_KIND_ZHIHU_SCRAPE: 1, JOB_KIND_SOURCING_AI_BATCH: 2}
+
+JOB_PRIORITY_USER = 0
+
+JOB_PRIORITY_RESUMED = 10
+
+job_runner = JobRunner(ttl=JOB_STATE_TTL_SECONDS)
+
+# 任务进度推送（SSE）：状态更新时发布增量，观察者数量不影响发布成本
+
+JOB_EVENTS_HEARTBEAT_SECONDS = 15.0
+
+job_event_broker = JobEventBroker()
+
 class SupabaseError(Exception):
 
     def __init__(self, status_code: int, message: str):
@@ -553,7 +791,19 @@ class SupabaseError(Exception):
 
 class SupabaseClient:
 
-    def __init__(self, base_url: str, service_key: str):
+    def __init__(
+        self,
+        base_url: str,
+        service_key: str,
+        *,
+        timeout: float = SUPABASE_TIMEOUT,
+        max_connections: int = SUPABASE_MAX_CONNECTIONS,
+        max_keepalive: int = SUPABASE_MAX_KEEPALIVE,
+        http2: bool = SUPABASE_HTTP2,
+        max_retries: int = SUPABASE_MAX_RETRIES,
+        retry_backoff: float = SUPABASE_RETRY_BACKOFF,
+        metrics: Optional[SupabaseQueryMetrics] = None,
+    ):
 
         if not base_url or not service_key:
 
@@ -567,35 +817,50 @@ class SupabaseClient:
 
         self.rpc_url = f"{self.base_url}/rest/v1/rpc"
 
-        self._client = httpx.AsyncClient(timeout=30.0)
+        self.max_retries = max(0, max_retries)
+
+        self.retry_backoff = max(0.0, retry_backoff)
+
+        self.metrics = metrics or supabase_metrics
+
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.info("[Supabase] 未安装 h2，HTTP/2 已关闭")
+            http2 = False
+
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+            ),
+            http2=http2,
+        )
 
     async def close(self) -> None:
 
         await self._client.aclose()
 
-    async def request(
+    def _retry_delay(self, attempt: int) -> float:
+        # full jitter：在 [0, backoff * 2^attempt] 内随机等待，避免重试同时打到服务端
+        return random.uniform(0, self.retry_backoff * (2 ** attempt))
 
+    async def _send(
         self,
-
         method: str,
-
-        path: str,
-
+        url: str,
         *,
-
+        resource: str = "",
         params: Optional[Dict[str, Any]] = None,
-
         json_payload: Optional[Any] = None,
-
         prefer: Optional[str] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[bool] = None,
+    ) -> httpx.Response:
+        """Send one request, retrying transient failures; raise SupabaseError on >= 400.
 
-        is_rpc: bool = False
-
-    ) -> Any:
-
-        base_url = self.rpc_url if is_rpc else self.rest_url
-
-        url = f"{base_url}/{path.lstrip('/')}"
+        Idempotent methods (or ``retry=True``) are retried on network errors and
+        502/503/504; other methods only when the connection was never established.
+        """
 
         headers = {
 
@@ -615,31 +880,61 @@ class SupabaseClient:
 
             headers["Prefer"] = prefer
 
-        try:
-
-            response = await self._client.request(
-
-                method,
-
-                url,
+        extra: Dict[str, Any] = {}
+        if timeout is not None:
+            extra["timeout"] = timeout
+        idempotent = method.upper() in SUPABASE_IDEMPOTENT_METHODS if retry is None else retry
 
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = await self._client.request(
+                    method,
+                    url,
+                    params=params,
+                    json=json_payload,
+                    headers=headers,
+                    **extra,
+                )
+            except httpx.RequestError as exc:
+                self.metrics.record(
+                    table=resource,
+                    method=method,
+                    status=0,
+                    seconds=time.perf_counter() - started,
+                    size=0,
+                    params=params,
+                )
+                retryable = idempotent or isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+                if retryable and attempt < self.max_retries:
+                    await asyncio.sleep(self._retry_delay(attempt))
+                    attempt += 1
+                    continue
+                raise SupabaseError(0, f"Supabase network error: {exc}") from exc
+            self.metrics.record(
+                table=resource,
+                method=method,
+                status=response.status_code,
+                seconds=time.perf_counter() - started,
+                size=len(response.content),
                 params=params,
-
-                json=json_payload,
-
-                headers=headers
-
             )
-
-        except httpx.RequestError as exc:
-
-            raise SupabaseError(0, f"Supabase network error: {exc}") from exc
+            if (
+                idempotent
+                and response.status_code in SUPABASE_RETRY_STATUS_CODES
+                and attempt < self.max_retries
+            ):
+                await asyncio.sleep(self._retry_delay(attempt))
+                attempt += 1
+                continue
+            break
 
         if response.status_code >= 400:
 
             try:
 
-                detail = response.json()
+                detail = json_loads(response.content)
 
                 if isinstance(detail, dict):
 
@@ -655,77 +950,127 @@ class SupabaseClient:
 
             raise SupabaseError(response.status_code, str(message))
 
-        if response.status_code == 204 or not response.content:
-
-            return None
-
-        try:
-
-            return response.json()
-
-        except ValueError:
+        return response
 
-            return None
+    async def request(
 
-    async def select(self, table: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        self,
 
-        query = dict(params or {})
+        method: str,
 
-        query.setdefault("select", "*")
+        path: str,
 
-        result = await self.request("GET", table, params=query)
+        *,
 
-        return result or []
+        params: Optional[Dict[str, Any]] = None,
 
-    async def count(self, table: str, params: Optional[Dict[str, Any]] = None) -> int:
+        json_payload: Optional[Any] = None,
 
-        query = dict(params or {})
+        prefer: Optional[str] = None,
 
-        query.setdefault("select", "id")
+        is_rpc: bool = False,
 
-        query.setdefault("limit", 1)
+        timeout: Optional[float] = None,
 
-        url = f"{self.rest_url}/{table.lstrip('/')}"
+        retry: Optional[bool] = None,
 
-        headers = {
+    ) -> Any:
 
-            "apikey": self.service_key,
+        base_url = self.rpc_url if is_rpc else self.rest_url
 
-            "Authorization": f"Bearer {self.service_key}",
+        url = f"{base_url}/{path.lstrip('/')}"
 
-            "Accept": "application/json",
+        response = await self._send(
+            method,
+            url,
+            resource=f"rpc/{path.lstrip('/')}" if is_rpc else path.lstrip("/"),
+            params=params,
+            json_payload=json_payload,
+            prefer=prefer,
+            timeout=timeout,
+            retry=retry,
+        )
 
-            "Prefer": "count=exact",
+        if response.status_code == 204 or not response.content:
 
-        }
+            return None
 
         try:
 
-            response = await self._client.request("GET", url, params=query, headers=headers)
+            return json_loads(response.content)
 
-        except httpx.RequestError as exc:
+        except ValueError:
 
-            raise SupabaseError(0, f"Supabase network error: {exc}") from exc
+            return None
 
-        if response.status_code >= 400:
+    async def select(self, table: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
 
-            try:
+        query = dict(params or {})
 
-                detail = response.json()
+        query.setdefault("select", "*")
 
-                if isinstance(detail, dict):
+        result = await self.request("GET", table, params=query)
 
-                    message = detail.get("message") or detail.get("error") or detail
+        return result or []
 
-                else:
+    async def select_iter(
+        self,
+        table: str,
+        params: Optional[Dict[str, Any]] = None,
+        page_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield rows page by page so whole-table scans stay in bounded memory.
 
-                    message = detail
+        Without an explicit ``order`` the scan is keyset-paged on ``id`` (which must be
+        selected); with one it falls back to limit/offset over that order.
+        """
+        query = dict(params or {})
+        query.setdefault("select", "*")
+        query.pop("limit", None)
+        offset = int(query.pop("offset", 0) or 0)
+        columns = {column.strip() for column in str(query["select"]).split(",")}
+        keyset = "order" not in query and ("*" in columns or "id" in columns)
+        if keyset:
+            query["order"] = "id.asc"
+        base_and = str(query.pop("and", "") or "").strip("()")
+        if base_and:
+            query["and"] = f"({base_and})"
+        last_id: Optional[str] = None
+        while True:
+            page = dict(query, limit=page_size)
+            if keyset and last_id is not None:
+                conditions = [base_and, f'id.gt."{last_id}"'] if base_and else [f'id.gt."{last_id}"']
+                page["and"] = f"({','.join(conditions)})"
+            elif not keyset:
+                page["offset"] = offset
+            rows = await self.request("GET", table, params=page) or []
+            for row in rows:
+                yield row
+            if len(rows) < page_size:
+                return
+            offset += len(rows)
+            last_id = str(rows[-1].get("id"))
+
+    async def count(
+        self,
+        table: str,
+        params: Optional[Dict[str, Any]] = None,
+        method: str = "exact",
+    ) -> int:
 
-            except ValueError:
+        query = dict(params or {})
 
-                message = response.text or "Unexpected Supabase error"
+        query.setdefault("select", "id")
 
-            raise SupabaseError(response.status_code, str(message))
+        query.setdefault("limit", 1)
+
+        response = await self._send(
+            "GET",
+            f"{self.rest_url}/{table.lstrip('/')}",
+            resource=table.lstrip("/"),
+            params=query,
+            prefer=f"count={method}",
+        )
 
         content_range = response.headers.get("Content-Range") or ""
 
@@ -737,7 +1082,7 @@ class SupabaseClient:
 
         try:
 
-            payload = response.json()
+            payload = json_loads(response.content)
 
         except ValueError:
 
@@ -823,7 +1168,12 @@ class SupabaseClient:
 
         await self.request("DELETE", table, params=filters)
 
-    async def rpc(self, function_name: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    async def rpc(
+        self,
+        function_name: str,
+        params: Optional[Dict[str, Any]] = None,
+        query: Optional[Dict[str, Any]] = None,
+    ) -> Any:
 
         return await self.request(
 
@@ -831,6 +1181,8 @@ class SupabaseClient:
 
             function_name,
 
+            params=query,
+
             json_payload=params or {},
 
             is_rpc=True
@@ -864,16 +1216,65 @@ async def fetch_zhihu_keywords_map(client: SupabaseClient, force: bool = False)
     cache.set(CACHE_NS_ZHIHU_KEYWORDS, data=payload)
     return payload
 
-async def fetch_supabase_count(client: Any, table: str, params: Optional[Dict[str, Any]] = None) -> int:
+COUNT_METHODS = ("exact", "planned", "estimated")
+
+async def fetch_supabase_count(
+    client: Any,
+    table: str,
+    params: Optional[Dict[str, Any]] = None,
+    method: str = "exact",
+) -> int:
     query = dict(params or {})
     query.pop("limit", None)
     query.pop("offset", None)
     if hasattr(client, "count"):
+        if method != "exact":
+            return await client.count(table, query, method=method)
         return await client.count(table, query)
     query["select"] = "id"
     rows = await client.select(table, query)
     return len(rows)
 
+async def iter_supabase_rows(
+    client: Any,
+    table: str,
+    params: Optional[Dict[str, Any]] = None,
+    page_size: int = 1000,
+) -> AsyncIterator[Dict[str, Any]]:
+    if hasattr(client, "select_iter"):
+        async for row in client.select_iter(table, params, page_size=page_size):
+            yield row
+        return
+    for row in await client.select(table, dict(params or {})) or []:
+        yield row
+
+def encode_page_cursor(row: Dict[str, Any], sort_column: str) -> Optional[str]:
+    """Opaque keyset cursor for (sort_column desc, id desc) ordering."""
+    value = row.get(sort_column)
+    row_id = row.get("id")
+    if value is None or row_id is None:
+        return None
+    raw = json.dumps([str(value), str(row_id)], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_page_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    return str(value), str(row_id)
+
+def build_keyset_filter(sort_column: str, cursor: Tuple[str, str]) -> str:
+    """PostgREST ``and`` filter selecting rows after ``cursor`` in (sort_column, id) desc order."""
+    value, row_id = (part.replace('"', "") for part in cursor)
+    return (
+        f'(or({sort_column}.lt."{value}",'
+        f'and({sort_column}.eq."{value}",id.lt."{row_id}")))'
+    )
+
 def parse_cookie_header(cookie_value: str, domain: str) -> List[Dict[str, Any]]:
     items: List[Dict[str, Any]] = []
     if not cookie_value:
@@ -939,7 +1340,9 @@ def extract_zhihu_question_id(raw_value: str) -> str:
 
     return ""
 
-def create_zhihu_job_state(total: int, keyword_id: Optional[str]) -> Dict[str, Any]:
+def create_zhihu_job_state(total: int, keyword_id: Optional[str], persist: bool = True) -> Dict[str, Any]:
+    """创建知乎抓取任务状态；persist=False（如 dry_run）时不写检查点，避免重启后被当作未完成任务续跑"""
+    job_checkpoint_store.schedule_purge(JOB_RETENTION_SECONDS)
     job_id = str(uuid4())
     now = utc_now_iso()
     state = {
@@ -956,6 +1359,9 @@ def create_zhihu_job_state(total: int, keyword_id: Optional[str]) -> Dict[str, A
     }
     with zhihu_job_lock:
         zhihu_job_store[job_id] = state
+    if persist:
+        job_checkpoint_store.save_job(JOB_KIND_ZHIHU_SCRAPE, job_id, state, {"keyword_id": keyword_id})
+    job_event_broker.publish(job_id, state)
     return state
 
 def update_zhihu_job_state(job_id: str, **updates: Any) -> None:
@@ -965,11 +1371,99 @@ def update_zhihu_job_state(job_id: str, **updates: Any) -> None:
             return
         state.update(updates)
         state["updated_at"] = utc_now_iso()
+        snapshot = dict(state)
+    job_checkpoint_store.update_state(job_id, snapshot)
+    job_event_broker.publish(job_id, snapshot)
 
 def get_zhihu_job_state(job_id: str) -> Optional[Dict[str, Any]]:
     with zhihu_job_lock:
         state = zhihu_job_store.get(job_id)
-        return dict(state) if state else None
+        if state:
+            return dict(state)
+    stored = job_checkpoint_store.load_job(job_id)
+    if stored and stored["kind"] == JOB_KIND_ZHIHU_SCRAPE:
+        return stored["state"]
+    return None
+
+def cancel_background_job(job_id: str, kind: Optional[str] = None) -> Dict[str, Any]:
+    record = job_runner.get(job_id)
+    if not record or (kind and record.kind != kind):
+        raise HTTPException(status_code=404, detail="任务不存在")
+    if not job_runner.cancel(job_id):
+        raise HTTPException(status_code=409, detail="任务已结束，无法取消")
+    return {"status": "ok", "job_id": job_id}
+
+def evict_zhihu_job_state(job_id: str) -> None:
+    with zhihu_job_lock:
+        zhihu_job_store.pop(job_id, None)
+    job_event_broker.drop(job_id)
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(str(value).strip()) if value is not None else None
+    except ValueError:
+        return None
+
+def stream_job_events(
+    job_id: str,
+    get_state: Callable[[str], Optional[Dict[str, Any]]],
+    last_event_id: Optional[str],
+) -> StreamingResponse:
+    """以 SSE 推送任务状态：首条为完整快照，之后仅推送变化的字段，空闲时发送心跳"""
+    if not get_state(job_id):
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return StreamingResponse(
+        job_event_broker.stream(
+            job_id,
+            last_event_id=parse_last_event_id(last_event_id),
+            get_state=lambda: get_state(job_id),
+            heartbeat=JOB_EVENTS_HEARTBEAT_SECONDS,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def create_sourcing_ai_job_state(total: int, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    job_checkpoint_store.schedule_purge(JOB_RETENTION_SECONDS)
+    now = utc_now_iso()
+    state = {
+        "id": uuid4().hex,
+        "status": "queued",
+        "total": total,
+        "processed": 0,
+        "success": 0,
+        "failed": 0,
+        "failures": [],
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    with sourcing_ai_job_lock:
+        sourcing_ai_job_store[state["id"]] = dict(state)
+    job_checkpoint_store.save_job(JOB_KIND_SOURCING_AI_BATCH, state["id"], state, params)
+    job_event_broker.publish(state["id"], state)
+    return dict(state)
+
+def update_sourcing_ai_job_state(job_id: str, **updates: Any) -> None:
+    with sourcing_ai_job_lock:
+        state = sourcing_ai_job_store.get(job_id)
+        if not state:
+            return
+        state.update(updates)
+        state["updated_at"] = utc_now_iso()
+        snapshot = dict(state)
+    job_checkpoint_store.update_state(job_id, snapshot)
+    job_event_broker.publish(job_id, snapshot)
+
+def get_sourcing_ai_job_state(job_id: str) -> Optional[Dict[str, Any]]:
+    with sourcing_ai_job_lock:
+        state = sourcing_ai_job_store.get(job_id)
+        if state:
+            return dict(state)
+    stored = job_checkpoint_store.load_job(job_id)
+    if stored and stored["kind"] == JOB_KIND_SOURCING_AI_BATCH:
+        return stored["state"]
+    return None
 
 def chunk_list(values: List[str], size: int) -> List[List[str]]:
     if size <= 0:
@@ -985,8 +1479,11 @@ async def fetch_existing_question_ids(
             {"keyword_id": f"eq.{keyword_id}", "select": "question_id"},
         )
         return [row.get("question_id") for row in rows if row.get("question_id")]
-    rows = await client.select("zhihu_questions", {"select": "id"})
-    return [row.get("id") for row in rows if row.get("id")]
+    return [
+        row.get("id")
+        async for row in iter_supabase_rows(client, "zhihu_questions", {"select": "id"})
+        if row.get("id")
+    ]
 
 async def fetch_existing_questions_map(
     client: "SupabaseClient", question_ids: List[str]
@@ -1015,7 +1512,7 @@ async def ensure_zhihu_browser():
         raise RuntimeError("Playwright is disabled by PLAYWRIGHT_ENABLED")
     if zhihu_browser:
         return zhihu_browser
-    zhihu_playwright = await async_playwright().start()
+    zhihu_playwright = await lazy_import("async_playwright")().start()
     zhihu_browser = await zhihu_playwright.chromium.launch(headless=True)
     return zhihu_browser
 
@@ -1116,7 +1613,7 @@ async def fetch_search_results_via_api(
             results.extend(payload.get("data") or [])
         return results
 
-    async with httpx.AsyncClient(timeout=15.0, headers=headers) as client:
+    async with create_httpx_client(timeout=15.0, headers=headers) as client:
         for offset in offsets:
             params = {**base_params, "offset": offset}
             try:
@@ -1142,7 +1639,7 @@ async def fetch_question_stats_via_api(
     if requester:
         return await requester(question_id, params, headers)
 
-    async with httpx.AsyncClient(timeout=15.0, headers=headers) as client:
+    async with create_httpx_client(timeout=15.0, headers=headers) as client:
         response = await client.get(
             f"https://www.zhihu.com/api/v4/questions/{question_id}", params=params
         )
@@ -1282,6 +1779,15 @@ async def zhihu_scrape_job(
     processed = 0
     success = 0
     failed = 0
+    done_ids: Set[str] = set()
+    if job_id:
+        # 续跑：跳过检查点中已处理的问题，沿用之前的计数
+        done_ids = job_checkpoint_store.done_items(job_id) & set(question_order)
+        if done_ids:
+            previous = get_zhihu_job_state(job_id) or {}
+            processed = len(done_ids)
+            success = min(int(previous.get("success") or 0), processed)
+            failed = processed - success
     if total == 0 and not get_zhihu_search_headers():
         if job_id:
             update_zhihu_job_state(
@@ -1291,10 +1797,19 @@ async def zhihu_scrape_job(
             )
         return
     if job_id:
-        update_zhihu_job_state(job_id, status="running", total=total, processed=0, success=0, failed=0)
+        update_zhihu_job_state(
+            job_id,
+            status="running",
+            total=total,
+            processed=processed,
+            success=success,
+            failed=failed,
+        )
 
     try:
         for qid in question_order:
+            if qid in done_ids:
+                continue
             info = question_info.get(qid) or {}
             existing_row = existing_map.get(qid) or {}
             title = info.get("title") or existing_row.get("title") or ""
@@ -1358,6 +1873,7 @@ async def zhihu_scrape_job(
 
             processed += 1
             if job_id:
+                job_checkpoint_store.mark_items_done(job_id, [qid])
                 update_zhihu_job_state(
                     job_id,
                     processed=processed,
@@ -1380,8 +1896,8 @@ def init_zhihu_scheduler() -> None:
     global zhihu_scheduler
     if zhihu_scheduler:
         return
-    zhihu_scheduler = AsyncIOScheduler(timezone=ZHIHU_TIMEZONE)
-    zhihu_scheduler.add_job(zhihu_scrape_job, CronTrigger(hour=5, minute=0))
+    zhihu_scheduler = lazy_import("AsyncIOScheduler")(timezone=ZHIHU_TIMEZONE)
+    zhihu_scheduler.add_job(zhihu_scrape_job, lazy_import("CronTrigger")(hour=5, minute=0))
     zhihu_scheduler.start()
 
 def decimal_to_float(value: Any) -> Optional[float]:
@@ -1483,7 +1999,9 @@ def derive_uid_prefix(name: Optional[str]) -> str:
 
     try:
 
-        letters = "".join(lazy_pinyin(name, style=Style.FIRST_LETTER))
+        lazy_pinyin, style = lazy_import("lazy_pinyin"), lazy_import("Style")
+
+        letters = "".join(lazy_pinyin(name, style=style.FIRST_LETTER))
 
     except Exception:
 
@@ -1507,27 +2025,120 @@ def derive_uid_prefix(name: Optional[str]) -> str:
 
     return "SP"
 
-@app.on_event("startup")
-
-async def init_supabase_client() -> None:
-
-    global supabase_client
+def build_sourcing_search_text(title: Optional[str]) -> str:
+    """Full pinyin and initials of a title, stored in sourcing_items.search_text."""
+    text = str(title or "").strip()
+    if not text:
+        return ""
+    try:
+        lazy_pinyin, style = lazy_import("lazy_pinyin"), lazy_import("Style")
+        full = "".join(lazy_pinyin(text))
+        initials = "".join(lazy_pinyin(text, style=style.FIRST_LETTER))
+    except Exception:
+        return ""
+    return f"{full} {initials}".lower()
 
-    if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
+def sourcing_search_text_enabled() -> bool:
+    """False while sourcing_items.search_text is known to be missing (2026_02_20 migration not applied)."""
+    return cache.get(CACHE_NS_SOURCING_SEARCH_TEXT_MISSING, ttl=SOURCING_SEARCH_TEXT_MISSING_TTL_SECONDS) is None
 
-        supabase_client = SupabaseClient(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+def mark_sourcing_search_text_missing(exc: "SupabaseError") -> bool:
+    """Remember a PostgREST undefined-column error for search_text; True if ``exc`` was one."""
+    if "search_text" not in str(exc.message):
+        return False
+    if sourcing_search_text_enabled():
+        logger.warning(f"[选品搜索] search_text 列不可用，暂不读写拼音字段: {exc.message}")
+    cache.set(CACHE_NS_SOURCING_SEARCH_TEXT_MISSING, data=True)
+    return True
 
-        logger.info("[Supabase] 已启用")
+def sourcing_search_text_fields(title: Optional[str]) -> Dict[str, str]:
+    """``{"search_text": ...}`` for a sourcing item write, or nothing while the column is missing."""
+    if not sourcing_search_text_enabled():
+        return {}
+    return {"search_text": build_sourcing_search_text(title)}
 
+async def write_sourcing_items(operation: Callable[[Any], Awaitable[Any]], payload: Any) -> Any:
+    """Run a sourcing_items insert/update, retrying without search_text if the column is missing."""
+    try:
+        return await operation(payload)
+    except SupabaseError as exc:
+        if not mark_sourcing_search_text_missing(exc):
+            raise
+    if isinstance(payload, list):
+        payload = [{key: value for key, value in row.items() if key != "search_text"} for row in payload]
     else:
+        payload = {key: value for key, value in payload.items() if key != "search_text"}
+    return await operation(payload)
 
-        logger.info("[Supabase] 未配置，相关模块将退化为本地模式")
-
-    init_zhihu_scheduler()
+def normalize_sourcing_keyword(keyword: Optional[str]) -> Tuple[str, str]:
+    """(text keyword, pinyin keyword) for sourcing search.
 
-@app.on_event("shutdown")
+    The search_sourcing_items RPC derives the pinyin keyword the same way
+    (lowercase, spaces removed) and escapes LIKE wildcards likewise.
+    """
+    safe_keyword = re.sub(r"[%*,()]", "", keyword or "").strip()
+    return safe_keyword, safe_keyword.lower().replace(" ", "")
 
-async def shutdown_supabase_client() -> None:
+def escape_like_pattern(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("_", "\\_")
+
+def build_sourcing_keyword_filter(keyword: Optional[str], *, include_search_text: bool = True) -> Optional[str]:
+    safe_keyword, pinyin_keyword = normalize_sourcing_keyword(keyword)
+    if not safe_keyword:
+        return None
+    text_pattern = escape_like_pattern(safe_keyword)
+    clauses = [f"title.ilike.*{text_pattern}*", f"uid.ilike.*{text_pattern}*"]
+    if include_search_text and pinyin_keyword:
+        clauses.append(f"search_text.ilike.*{escape_like_pattern(pinyin_keyword)}*")
+    return f"({','.join(clauses)})"
+
+async def select_sourcing_items_by_keyword(
+    client: "SupabaseClient", params: Dict[str, Any], keyword: Optional[str]
+) -> List[Dict[str, Any]]:
+    """Select sourcing_items with the keyword filter, dropping search_text if the column is missing."""
+    keyword_filter = build_sourcing_keyword_filter(keyword, include_search_text=sourcing_search_text_enabled())
+    if not keyword_filter:
+        return await client.select("sourcing_items", params=params)
+    try:
+        return await client.select("sourcing_items", params={**params, "or": keyword_filter})
+    except SupabaseError as exc:
+        if not mark_sourcing_search_text_missing(exc):
+            raise
+    keyword_filter = build_sourcing_keyword_filter(keyword, include_search_text=False)
+    return await client.select("sourcing_items", params={**params, "or": keyword_filter})
+
+@app.on_event("startup")
+
+async def init_supabase_client() -> None:
+
+    global supabase_client
+
+    if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
+
+        supabase_client = SupabaseClient(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+
+        logger.info("[Supabase] 已启用")
+
+    else:
+
+        logger.info("[Supabase] 未配置，相关模块将退化为本地模式")
+
+    get_llm_client_registry()
+
+    if LOOP_STALL_MONITOR_ENABLED:
+        loop_stall_monitor.start()
+
+    resume_checkpointed_jobs()
+
+    init_zhihu_scheduler()
+
+@app.on_event("shutdown")
+
+async def shutdown_supabase_client() -> None:
+
+    await job_runner.shutdown()
+
+    await loop_stall_monitor.stop()
 
     if supabase_client:
 
@@ -1541,6 +2152,24 @@ async def shutdown_supabase_client() -> None:
 
         feishu_http_client = None
 
+    global bigmodel_http_client
+
+    if bigmodel_http_client:
+
+        await bigmodel_http_client.aclose()
+
+        bigmodel_http_client = None
+
+    global llm_client_registry
+
+    if llm_client_registry:
+
+        await llm_client_registry.aclose()
+
+        llm_client_registry = None
+
+    job_checkpoint_store.close()
+
     if zhihu_scheduler:
         zhihu_scheduler.shutdown(wait=False)
     await close_zhihu_browser()
@@ -1683,7 +2312,7 @@ async def fetch_wbi_keys(force: bool = False) -> Optional[Dict[str, str]]:
 
     try:
 
-        async with aiohttp.ClientSession() as session:
+        async with create_http_session() as session:
 
             async with session.get(
 
@@ -1809,7 +2438,7 @@ async def fetch_wbi_subtitle_list(
 
         try:
 
-            async with aiohttp.ClientSession() as session:
+            async with create_http_session() as session:
 
                 async with session.get(
 
@@ -1977,6 +2606,7 @@ async def fetch_account_videos_from_bili(
         encode_wbi_params_fn=encode_wbi_params,
         build_bilibili_headers_fn=build_bilibili_headers,
         bilibili_cookie=BILIBILI_COOKIE,
+        session_factory=create_http_session,
     )
 
 async def fetch_account_video_stat(
@@ -1987,6 +2617,7 @@ async def fetch_account_video_stat(
         bvid,
         session=session,
         build_bilibili_headers_fn=build_bilibili_headers,
+        session_factory=create_http_session,
     )
 
 def ensure_bilibili_cookie_file() -> Optional[str]:
@@ -2215,7 +2846,7 @@ async def fetch_jd_page(url: str) -> str:
 
         headers["Cookie"] = JD_COOKIE
 
-    async with aiohttp.ClientSession() as session:
+    async with create_http_session() as session:
 
         async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as resp:
 
@@ -2225,6 +2856,80 @@ async def fetch_jd_page(url: str) -> str:
 
             return await resp.text()
 
+JD_MAIN_IMAGE_CACHE_LIMIT = 2000
+JD_MAIN_IMAGE_BATCH_LIMIT = 50
+JD_MAIN_IMAGE_BATCH_CONCURRENCY = 4
+
+def has_jd_original_image(images: List[str]) -> bool:
+    return any("/n0/" in (img or "") for img in images)
+
+async def _fetch_jd_page_images(url: str) -> List[str]:
+    return extract_jd_images_from_html(await fetch_jd_page(url))
+
+async def fetch_jd_main_image(link: str) -> Dict[str, Any]:
+    """Main image of a JD product, cached per SKU.
+
+    The desktop and mobile pages are fetched concurrently; the first page that
+    yields an original (``/n0/``) image wins and the other request is cancelled.
+    Otherwise mobile images are preferred over desktop ones, as before.
+    """
+    sku = extract_jd_sku_from_url(link)
+
+    if sku:
+        cached = cache.get(CACHE_NS_JD_MAIN_IMAGE, sku, ttl=JD_MAIN_IMAGE_CACHE_TTL_SECONDS)
+        if cached is not None:
+            return cached
+
+    target_url = f"https://item.jd.com/{sku}.html" if sku else link
+
+    if not sku:
+        images = await _fetch_jd_page_images(target_url)
+    else:
+        desktop = asyncio.create_task(_fetch_jd_page_images(target_url))
+        mobile = asyncio.create_task(_fetch_jd_page_images(f"https://item.m.jd.com/product/{sku}.html"))
+        pending = {desktop, mobile}
+        winner: Optional[List[str]] = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.exception() and has_jd_original_image(task.result()):
+                        winner = task.result()
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if winner is not None:
+            images = winner
+        elif not mobile.exception() and mobile.result():
+            images = mobile.result()
+        else:
+            if mobile.exception():
+                logger.info(f"[JD] mobile fetch failed: {mobile.exception()}")
+            if desktop.exception():
+                raise desktop.exception()
+            images = desktop.result()
+
+    best_image = select_best_jd_image(images)
+
+    if not best_image:
+
+        raise HTTPException(status_code=404, detail="未能在页面中找到主图")
+
+    result = {
+        "status": "success",
+        "sku": sku,
+        "source": target_url,
+        "image": best_image,
+        "candidates": images,
+    }
+
+    if sku:
+        cache.set(CACHE_NS_JD_MAIN_IMAGE, sku, result, max_entries=JD_MAIN_IMAGE_CACHE_LIMIT)
+
+    return result
+
 # CORS 配置
 frontend_port = os.getenv("FRONTEND_PORT")
 default_origins = [
@@ -2267,12 +2972,17 @@ for origin in [*default_origins, *configured_origins]:
     seen_origins.add(normalized)
     cors_allow_origins.append(normalized)
 
+app.add_middleware(RequestContextMiddleware, request_metrics=http_request_metrics)
+
+app.add_middleware(CompressionMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_allow_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # ==================== B站 API 代理 ====================
@@ -2287,7 +2997,7 @@ async def handle_bilibili_proxy(url: str):
 
     headers = build_bilibili_headers({"Accept": "application/json"})
 
-    async with aiohttp.ClientSession() as session:
+    async with create_http_session() as session:
         try:
             async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
                 data = await response.json()
@@ -2322,6 +3032,10 @@ class JdImageRequest(BaseModel):
 
     url: str = Field(..., description="京东商品链接")
 
+class JdImageBatchRequest(BaseModel):
+
+    urls: List[str] = Field(default_factory=list, description="京东商品链接列表")
+
 TAOBAO_API_BASE = "https://eco.taobao.com/router/rest"
 
 def _taobao_timestamp() -> str:
@@ -2365,7 +3079,7 @@ def normalize_taobao_commission_rate(value: Any) -> str:
 
 async def taobao_api_request(method: str, params: Dict[str, Any]) -> Dict[str, Any]:
     payload = build_taobao_signed_params(method, params)
-    async with aiohttp.ClientSession() as session:
+    async with create_http_session() as session:
         async with session.post(
             TAOBAO_API_BASE,
             data=payload,
@@ -2451,7 +3165,7 @@ async def resolve_taobao_url(url: str) -> Tuple[str, str]:
     }
 
     try:
-        async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
+        async with create_http_session(timeout=timeout, headers=headers) as session:
             async with session.get(target, allow_redirects=True) as response:
                 resolved_url = str(response.url)
                 page_text = await response.text(errors="ignore")
@@ -2519,7 +3233,7 @@ async def resolve_bilibili_url(url: str):
 
     try:
 
-        async with aiohttp.ClientSession() as session:
+        async with create_http_session() as session:
 
             async with session.get(url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=10)) as response:
 
@@ -2663,7 +3377,7 @@ async def fetch_subtitle_from_official_api(
 
     try:
 
-        async with aiohttp.ClientSession() as session:
+        async with create_http_session() as session:
 
             view_api = "https://api.bilibili.com/x/web-interface/view"
 
@@ -2767,7 +3481,7 @@ async def fetch_subtitle_from_official_api(
 
                 subtitle_url = 'https:' + subtitle_url
 
-            async with aiohttp.ClientSession() as dl_session:
+            async with create_http_session() as dl_session:
 
                 async with dl_session.get(subtitle_url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as resp:
 
@@ -2877,18 +3591,171 @@ class YTDLPLogger:
 
 # ==================== DeepSeek 语义分段 ====================
 
+SUBTITLE_SEGMENT_CHUNK_CHARS = 3000
+SUBTITLE_SEGMENT_OVERLAP_LINES = 2
+SUBTITLE_SEGMENT_CONCURRENCY = 4
+SUBTITLE_SEGMENT_SEAM_MAX_CHARS = 400
+SUBTITLE_SEGMENT_SEAM_MIN_CHARS = 4
+SUBTITLE_SENTENCE_ENDINGS = "。！？!?；;…"
+
+def split_long_subtitle_line(line: str, max_chars: int) -> List[str]:
+    """超长字幕行优先在句末标点处拆开，找不到标点再按长度硬切。"""
+    if len(line) <= max_chars:
+        return [line]
+    pieces: List[str] = []
+    rest = line
+    while len(rest) > max_chars:
+        window = rest[:max_chars]
+        cut = max(window.rfind(mark) for mark in SUBTITLE_SENTENCE_ENDINGS)
+        if cut <= 0:
+            cut = window.rfind(" ")
+        cut = cut + 1 if cut > 0 else max_chars
+        pieces.append(rest[:cut])
+        rest = rest[cut:]
+    if rest:
+        pieces.append(rest)
+    return pieces
+
+def build_subtitle_segment_chunks(
+    lines: List[str],
+    max_chars: int = SUBTITLE_SEGMENT_CHUNK_CHARS,
+    overlap_lines: int = SUBTITLE_SEGMENT_OVERLAP_LINES,
+) -> List[List[str]]:
+    """按字幕事件边界把全文切成若干块，相邻块首尾重叠 overlap_lines 行。"""
+    units: List[str] = []
+    for line in lines:
+        text = str(line or "").strip()
+        if text:
+            units.extend(split_long_subtitle_line(text, max_chars))
+
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    fresh = 0
+    for unit in units:
+        if fresh and size + len(unit) > max_chars:
+            chunks.append(current)
+            keep = min(overlap_lines, len(current) - 1) if overlap_lines > 0 else 0
+            current = current[len(current) - keep:] if keep > 0 else []
+            size = sum(len(item) for item in current)
+            fresh = 0
+        current.append(unit)
+        size += len(unit)
+        fresh += 1
+    if fresh:
+        chunks.append(current)
+    return chunks
+
+def merge_segment_texts(
+    previous: str,
+    current: str,
+    max_overlap: int = SUBTITLE_SEGMENT_SEAM_MAX_CHARS,
+    min_overlap: int = SUBTITLE_SEGMENT_SEAM_MIN_CHARS,
+) -> str:
+    """拼接相邻分块的排版结果，去掉 current 开头与 previous 结尾重复的文字。
+
+    比较时忽略标点和空白（模型会给重叠部分补不同的标点），只返回 current 中需要追加的部分。
+    """
+    if not previous:
+        return current
+    prev_bare = "".join(ch for ch in previous[-max_overlap * 2:] if ch.isalnum())
+    positions = [index for index, ch in enumerate(current) if ch.isalnum()]
+    cur_bare = "".join(current[index] for index in positions)
+    limit = min(len(prev_bare), len(cur_bare), max_overlap)
+    for size in range(limit, min_overlap - 1, -1):
+        if prev_bare.endswith(cur_bare[:size]):
+            rest = current[positions[size - 1] + 1:]
+            return rest.lstrip(" \t" + SUBTITLE_SENTENCE_ENDINGS + "，,、：:")
+    return current
+
+def get_bigmodel_http_client() -> httpx.AsyncClient:
+    global bigmodel_http_client
+    if bigmodel_http_client is None:
+        bigmodel_http_client = create_httpx_client(
+            timeout=BIGMODEL_SEARCH_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=BIGMODEL_SEARCH_CONCURRENCY * 2,
+                max_keepalive_connections=BIGMODEL_SEARCH_CONCURRENCY,
+            ),
+        )
+    return bigmodel_http_client
+
+async def search_bigmodel_product(
+    http_client: httpx.AsyncClient,
+    headers: Dict[str, str],
+    name: str,
+) -> Optional[str]:
+    search_payload = {
+        "search_query": f"{name} 参数",
+        "search_engine": "search_std",
+        "count": 5,
+        "search_intent": False,
+        "content_size": "high",
+    }
+    try:
+        search_resp = await http_client.post(
+            f"{BIGMODEL_API_BASE}/web_search",
+            headers=headers,
+            json=search_payload,
+            timeout=BIGMODEL_SEARCH_TIMEOUT,
+        )
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=f"网络搜索失败: {str(exc)}",
+        )
+    if search_resp.status_code != 200:
+        raise HTTPException(
+            status_code=500,
+            detail=f"网络搜索失败: {search_resp.text[:200]}",
+        )
+    search_data = search_resp.json() or {}
+    items = search_data.get("search_result") or []
+    if not items:
+        return None
+    snippets = []
+    for item in items[:3]:
+        title = str(item.get("title") or "")
+        content = str(item.get("content") or "")
+        link = str(item.get("link") or "")
+        snippets.append(f"- {title} | {content} | {link}".strip())
+    return f"商品：{name}\n" + "\n".join(snippets)
+
+async def search_bigmodel_products(
+    http_client: httpx.AsyncClient,
+    headers: Dict[str, str],
+    product_names: List[str],
+) -> List[str]:
+    """并发检索各商品（受 BIGMODEL_SEARCH_CONCURRENCY 限制），结果按商品顺序返回；任一失败即取消其余请求"""
+    semaphore = asyncio.Semaphore(BIGMODEL_SEARCH_CONCURRENCY)
+
+    async def run(name: str) -> Optional[str]:
+        async with semaphore:
+            return await search_bigmodel_product(http_client, headers, name)
+
+    tasks = [asyncio.create_task(run(name)) for name in product_names]
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    return [line for line in results if line]
+
 async def ai_fill_product_params(
     category_name: str,
     spec_fields: List[Dict[str, Any]],
     product_names: List[str],
-    model_override: Optional[str] = None
+    model_override: Optional[str] = None,
+    force: bool = False,
 ) -> List[Dict[str, str]]:
-    """根据商品名称和预设字段，调用大模型返回参数"""
-    use_deepseek = bool(model_override and "deepseek" in model_override.lower())
-    use_bigmodel = bool(model_override and model_override.lower().startswith("glm-4.7"))
+    """根据商品名称和预设字段，调用大模型返回参数（相同输入命中结果缓存，force=True 时跳过缓存）"""
+    provider = resolve_ai_provider(model_override)
+    use_deepseek = provider == "deepseek"
+    use_bigmodel = provider == "glm"
     deepseek_api_key = DEEPSEEK_API_KEY or os.getenv("DEEPSEEK_API_KEY", "")
     if use_deepseek:
-        if not deepseek_api_key or not deepseek_client:
+        if not deepseek_api_key:
             raise HTTPException(status_code=500, detail="未配置 DeepSeek API 密钥")
     elif use_bigmodel:
         bigmodel_api_key = os.getenv("BIGMODEL_API_KEY") or BIGMODEL_API_KEY
@@ -2917,56 +3784,42 @@ async def ai_fill_product_params(
     products_str = "\n".join(f"- {p}" for p in product_names)
     field_keys = [f.get("key", "") for f in spec_fields if f.get("key")]
 
+    if use_bigmodel:
+        model_name = model_override or "glm-4.7-FlashX"
+    elif use_deepseek:
+        model_name = model_override or (DEEPSEEK_MODEL or "deepseek-chat")
+    else:
+        model_name = model_override or "qwen3-max-2026-01-23"
+    cache_key = make_cache_key(
+        AI_PARAMS_PROMPT_VERSION,
+        model_name,
+        normalize_llm_cache_text(category_name),
+        [
+            [normalize_llm_cache_text(f.get("key")), normalize_llm_cache_text(f.get("example"))]
+            for f in spec_fields
+        ],
+        [normalize_llm_cache_text(name) for name in product_names],
+    )
+    if not force:
+        cached = await llm_result_cache.get(LLM_CACHE_NS_AI_PARAMS, cache_key)
+        if isinstance(cached, list):
+            return [dict(item) for item in cached if isinstance(item, dict)]
+
     prompt = f"""你是资深电商数据专家，擅长通过联网搜索获取最新的商品技术规格，并转化为结构化数据。\n\n**当前品类：** `{category_name}`\n\n**必须检索并填充的\"预设字段\"（示例值）：** `{fields_str}`\n\n\n**任务指令：**\n\n1. **联网搜索**：请针对提供的商品列表，在互联网搜索其官方规格参数、电商详情页或专业测评。商品列表为：\n{products_str}\n\n2. **数据提取**：准确识别并提取与\"预设字段\"对应的真实参数值，不允许推测。\n\n3. **撰写评价**：基于搜索到的产品卖点，撰写 30 字以内的专业、中肯的总结评价。\n\n\n**约束条件（严格遵守）：**\n\n- **真实性**：所有参数必须基于搜索到的客观事实，严禁凭空虚构。若某个字段在全网均无法确认，请保持为空字符串 \"\"。\n\n- **单位统一**：参数值需保留原始单位（如：5000mAh, 65W）。\n- **输出示例格式：** [ {{ \"name\": \"商品全名\", \"评价\": \"评价文案\", \"{field_keys[0]}\": \"真实参数值\", \"{field_keys[1]}\": \"真实参数值\" }} ]\n"""
 
     if use_bigmodel:
-        search_lines: List[str] = []
         headers = {
             "Authorization": f"Bearer {bigmodel_api_key}",
             "Content-Type": "application/json",
         }
-        for name in product_names:
-            query = f"{name} 参数"
-            search_payload = {
-                "search_query": query,
-                "search_engine": "search_std",
-                "count": 5,
-                "search_intent": False,
-                "content_size": "high",
-            }
-            try:
-                search_resp = httpx.post(
-                    "https://open.bigmodel.cn/api/paas/v4/web_search",
-                    headers=headers,
-                    json=search_payload,
-                    timeout=30.0,
-                )
-            except Exception as exc:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"网络搜索失败: {str(exc)}",
-                )
-            if search_resp.status_code != 200:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"网络搜索失败: {search_resp.text[:200]}",
-                )
-            search_data = search_resp.json() or {}
-            items = search_data.get("search_result") or []
-            if items:
-                snippets = []
-                for item in items[:3]:
-                    title = str(item.get("title") or "")
-                    content = str(item.get("content") or "")
-                    link = str(item.get("link") or "")
-                    snippets.append(f"- {title} | {content} | {link}".strip())
-                search_lines.append(f"商品：{name}\n" + "\n".join(snippets))
+        http_client = get_bigmodel_http_client()
+        search_lines = await search_bigmodel_products(http_client, headers, product_names)
 
         if search_lines:
             prompt = f"{prompt}\n\n搜索结果（仅供参考）：\n" + "\n\n".join(search_lines)
 
         chat_payload = {
-            "model": model_override or "glm-4.7-FlashX",
+            "model": model_name,
             "messages": [
                 {"role": "system", "content": "你是商品参数提取助手。"},
                 {"role": "user", "content": prompt},
@@ -2974,11 +3827,11 @@ async def ai_fill_product_params(
             "temperature": 0.2,
         }
         try:
-            chat_resp = httpx.post(
-                "https://open.bigmodel.cn/api/paas/v4/chat/completions",
+            chat_resp = await http_client.post(
+                f"{BIGMODEL_API_BASE}/chat/completions",
                 headers=headers,
                 json=chat_payload,
-                timeout=300.0,
+                timeout=BIGMODEL_CHAT_TIMEOUT,
             )
         except Exception as exc:
             raise HTTPException(
@@ -2993,9 +3846,8 @@ async def ai_fill_product_params(
         chat_data = chat_resp.json() or {}
         choices = chat_data.get("choices") or []
     elif use_deepseek:
-        response = await asyncio.to_thread(
-            deepseek_client.chat.completions.create,
-            model=model_override or (DEEPSEEK_MODEL or "deepseek-chat"),
+        response = await get_llm_client("deepseek").chat.completions.create(
+            model=model_name,
             messages=[
                 {"role": "system", "content": "你是商品参数提取助手。"},
                 {"role": "user", "content": prompt},
@@ -3004,14 +3856,8 @@ async def ai_fill_product_params(
         )
         choices = response.choices or []
     else:
-        dashscope_base_url = os.getenv("DASHSCOPE_BASE_URL") or "https://dashscope.aliyuncs.com/compatible-mode/v1"
-        dashscope_client = OpenAI(
-            api_key=DASHSCOPE_API_KEY,
-            base_url=dashscope_base_url,
-        )
-        response = await asyncio.to_thread(
-            dashscope_client.chat.completions.create,
-            model=model_override or "qwen3-max-2026-01-23",
+        response = await get_llm_client("dashscope").chat.completions.create(
+            model=model_name,
             messages=[{"role": "user", "content": prompt}],
             extra_body={
                 "enable_search": True,
@@ -3093,6 +3939,10 @@ async def ai_fill_product_params(
             if key not in allowed_keys:
                 del item[key]
 
+    # 只缓存覆盖了全部商品的结果，空结果或部分结果交给重试重新请求
+    answered = {normalize_llm_cache_text(item.get("name")) for item in result}
+    if result and all(normalize_llm_cache_text(name) in answered for name in product_names):
+        await llm_result_cache.set(LLM_CACHE_NS_AI_PARAMS, cache_key, [dict(item) for item in result])
     return result
 
 async def fetch_sourcing_items_by_id_list(client: "SupabaseClient", ids: List[str]) -> List[Dict[str, Any]]:
@@ -3116,28 +3966,29 @@ async def fetch_sourcing_items_filtered(
     category_id: Optional[str],
     keyword: str
 ) -> List[Dict[str, Any]]:
-    safe_keyword = keyword.replace("%", "").replace("*", "").strip()
     items: List[Dict[str, Any]] = []
-    offset = 0
+    cursor: Optional[Tuple[str, str]] = None
     limit = 200
     while True:
         params: Dict[str, Any] = {
-            "select": "id,title,uid,category_id,price,remark,spec",
-            "order": "created_at.desc",
+            "select": "id,title,uid,category_id,price,remark,spec,created_at",
+            "order": "created_at.desc,id.desc",
             "limit": limit,
-            "offset": offset,
         }
         if category_id:
             params["category_id"] = f"eq.{category_id}"
-        if safe_keyword:
-            params["or"] = f"(title.ilike.*{safe_keyword}*,uid.ilike.*{safe_keyword}*)"
-        rows = await client.select("sourcing_items", params=params)
+        if cursor:
+            params["and"] = build_keyset_filter("created_at", cursor)
+        rows = await select_sourcing_items_by_keyword(client, params, keyword)
         if not rows:
             break
         items.extend(rows)
         if len(rows) < limit:
             break
-        offset += limit
+        last = rows[-1]
+        if last.get("created_at") is None or last.get("id") is None:
+            break
+        cursor = (str(last["created_at"]), str(last["id"]))
     return items
 
 def match_sourcing_keyword(item: Dict[str, Any], keyword: str) -> bool:
@@ -3207,12 +4058,252 @@ async def resolve_sourcing_ai_batch_items(
     items = [item for item in items if match_sourcing_price(item, price_min, price_max)]
     return items, category_id
 
+# AI 批量补参：按服务商限制并发与请求间隔（跨任务共享），分块大小按提示词长度与失败情况自适应
+
+AI_BATCH_MAX_CHUNK_SIZE = 10
+
+AI_BATCH_PROMPT_CHAR_BUDGET = 600
+
+AI_BATCH_MAX_ATTEMPTS = 3
+
+AI_PROVIDER_CONCURRENCY = {"glm": 2, "deepseek": 4, "dashscope": 3}
+
+AI_PROVIDER_MIN_INTERVAL = {"glm": 0.5, "deepseek": 0.2, "dashscope": 0.3}
+
+def resolve_ai_provider(model_override: Optional[str]) -> str:
+    model = (model_override or "").lower()
+    if "deepseek" in model:
+        return "deepseek"
+    if model.startswith("glm-4.7"):
+        return "glm"
+    return "dashscope"
+
+class AiProviderLimiter:
+    """限制同一服务商的并发数，并保证相邻请求的发起间隔不小于 min_interval"""
+
+    def __init__(self, concurrency: int, min_interval: float) -> None:
+        self.concurrency = max(1, concurrency)
+        self.min_interval = min_interval
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._spacing_lock = asyncio.Lock()
+        self._last_start = 0.0
+
+    async def __aenter__(self) -> "AiProviderLimiter":
+        await self._semaphore.acquire()
+        try:
+            async with self._spacing_lock:
+                wait = self._last_start + self.min_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start = time.monotonic()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._semaphore.release()
+
+ai_provider_limiters: Dict[str, Tuple[Any, AiProviderLimiter]] = {}
+
+def get_ai_provider_limiter(provider: str) -> AiProviderLimiter:
+    loop = asyncio.get_running_loop()
+    cached = ai_provider_limiters.get(provider)
+    if cached and cached[0] is loop:
+        return cached[1]
+    limiter = AiProviderLimiter(
+        AI_PROVIDER_CONCURRENCY.get(provider, 2),
+        AI_PROVIDER_MIN_INTERVAL.get(provider, 0.5),
+    )
+    ai_provider_limiters[provider] = (loop, limiter)
+    return limiter
+
+class AiBatchChunkPlanner:
+    """从待处理队列中切出下一批商品：失败时减半分块，成功后逐步恢复"""
+
+    def __init__(self, max_size: int = AI_BATCH_MAX_CHUNK_SIZE, char_budget: int = AI_BATCH_PROMPT_CHAR_BUDGET) -> None:
+        self.max_size = max(1, max_size)
+        self.size = self.max_size
+        self.char_budget = char_budget
+
+    def take(self, queue: "deque[Dict[str, Any]]") -> List[Dict[str, Any]]:
+        chunk: List[Dict[str, Any]] = []
+        chars = 0
+        while queue:
+            entry = queue[0]
+            limit = min(self.size, entry.get("cap") or self.max_size)
+            length = len(str(entry["item"].get("title") or ""))
+            if chunk and (len(chunk) >= limit or chars + length > self.char_budget):
+                break
+            chunk.append(queue.popleft())
+            chars += length
+            if len(chunk) >= limit:
+                break
+        return chunk
+
+    def record_success(self) -> None:
+        self.size = min(self.max_size, self.size + 1)
+
+    def record_failure(self) -> None:
+        self.size = max(1, self.size // 2)
+
+def build_sourcing_ai_updates(
+    item: Dict[str, Any],
+    ai_item: Dict[str, Any],
+    field_keys: List[str],
+    now: str,
+) -> Optional[Dict[str, Any]]:
+    spec_updates: Dict[str, Any] = {}
+    existing_spec = item.get("spec") or {}
+    for field in field_keys:
+        if not field:
+            continue
+        new_value = str(ai_item.get(field) or "").strip()
+        if not new_value:
+            continue
+        if str(existing_spec.get(field) or "").strip():
+            continue
+        spec_updates[field] = new_value
+    review_text = str(ai_item.get("评价") or "").strip()
+    existing_remark = str(item.get("remark") or "").strip()
+    should_set_remark = bool(review_text) and not existing_remark
+    if not spec_updates and not should_set_remark:
+        return None
+    updates: Dict[str, Any] = {"updated_at": now}
+    if spec_updates:
+        updates["spec"] = normalize_spec_payload({**existing_spec, **spec_updates})
+    if should_set_remark:
+        updates["remark"] = review_text
+    return updates
+
+async def apply_sourcing_ai_updates(
+    client: "SupabaseClient",
+    updates: List[Tuple[str, Dict[str, Any]]],
+) -> Tuple[Set[str], Dict[str, str]]:
+    """批量写回补参结果：整批一次调用 apply_sourcing_ai_updates RPC，只更新已存在的行。
+
+    RPC 未部署（迁移未执行）时退回按相同内容分组 PATCH。
+    返回实际更新到的 id 集合，以及写入失败的 id 与原因。
+    """
+    ids = [str(item_id) for item_id, _ in updates]
+    try:
+        rows = await client.rpc(
+            "apply_sourcing_ai_updates",
+            {"p_updates": [{"id": str(item_id), "fields": payload} for item_id, payload in updates]},
+        )
+    except SupabaseError as exc:
+        if exc.status_code != 404:
+            return set(), {item_id: str(exc.message) for item_id in ids}
+        logger.info(f"[选品补参] 批量写回 RPC 不可用，回退为分组 PATCH: {exc.message}")
+        return await patch_sourcing_ai_update_groups(client, updates)
+    except Exception as exc:
+        return set(), {item_id: str(exc) for item_id in ids}
+    return {str(row.get("id")) for row in rows or [] if isinstance(row, dict)}, {}
+
+async def patch_sourcing_ai_update_groups(
+    client: "SupabaseClient",
+    updates: List[Tuple[str, Dict[str, Any]]],
+) -> Tuple[Set[str], Dict[str, str]]:
+    """相同内容的商品合并为一次 PATCH（id=in.(...)）。"""
+    groups: Dict[str, Tuple[Dict[str, Any], List[str]]] = {}
+    for item_id, payload in updates:
+        signature = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        groups.setdefault(signature, (payload, []))[1].append(str(item_id))
+
+    async def patch_group(payload: Dict[str, Any], ids: List[str]) -> List[Dict[str, Any]]:
+        quoted = ",".join(f"\"{item_id}\"" for item_id in ids)
+        return await client.update(
+            "sourcing_items",
+            payload,
+            {"id": f"in.({quoted})", "select": "id"},
+        )
+
+    group_list = list(groups.values())
+    outcomes = await asyncio.gather(
+        *(patch_group(payload, ids) for payload, ids in group_list),
+        return_exceptions=True,
+    )
+    updated: Set[str] = set()
+    errors: Dict[str, str] = {}
+    for (_, ids), outcome in zip(group_list, outcomes):
+        if isinstance(outcome, BaseException):
+            for item_id in ids:
+                errors[item_id] = str(outcome)
+            continue
+        updated.update(str(row.get("id")) for row in outcome or [] if isinstance(row, dict))
+    return updated, errors
+
+async def process_sourcing_ai_chunk(
+    client: "SupabaseClient",
+    limiter: AiProviderLimiter,
+    chunk: List[Dict[str, Any]],
+    category_name: str,
+    spec_fields_raw: List[Dict[str, Any]],
+    field_keys: List[str],
+    model_override: Optional[str],
+    force: bool,
+) -> Dict[str, Any]:
+    """处理一批商品，返回成功条目、可重试条目（附原因）与不可重试的失败条目"""
+    names = [str(entry["item"].get("title") or "").strip() for entry in chunk]
+    try:
+        async with limiter:
+            results = await ai_fill_product_params(
+                category_name,
+                spec_fields_raw,
+                names,
+                model_override=model_override,
+                force=force,
+            )
+    except Exception as exc:
+        reason = str(getattr(exc, "detail", "") or exc)
+        return {"succeeded": [], "retry": [(entry, reason) for entry in chunk], "failed": [], "llm_failed": True}
+
+    result_map = {
+        str(item.get("name") or "").strip(): item for item in results if isinstance(item, dict)
+    }
+    fallback = results if len(results) == len(chunk) else None
+    now = utc_now_iso()
+    matched: List[Dict[str, Any]] = []
+    pending_updates: List[Tuple[str, Dict[str, Any]]] = []
+    retry: List[Tuple[Dict[str, Any], str]] = []
+    for index, entry in enumerate(chunk):
+        name = names[index]
+        ai_item = result_map.get(name) if name else None
+        if not ai_item and fallback:
+            ai_item = fallback[index] if index < len(fallback) else None
+        if not ai_item or not isinstance(ai_item, dict):
+            retry.append((entry, "AI未返回结果"))
+            continue
+        matched.append(entry)
+        updates = build_sourcing_ai_updates(entry["item"], ai_item, field_keys, now)
+        if updates:
+            pending_updates.append((str(entry["item"].get("id")), updates))
+
+    if not pending_updates:
+        return {"succeeded": matched, "retry": retry, "failed": [], "llm_failed": False}
+
+    updated_ids, errors = await apply_sourcing_ai_updates(client, pending_updates)
+    requested_ids = {item_id for item_id, _ in pending_updates}
+    succeeded: List[Dict[str, Any]] = []
+    failed: List[Tuple[Dict[str, Any], str]] = []
+    for entry in matched:
+        item_id = str(entry["item"].get("id"))
+        if item_id not in requested_ids or item_id in updated_ids:
+            succeeded.append(entry)
+        elif item_id in errors:
+            failed.append((entry, errors[item_id]))
+        else:
+            # 任务运行期间商品已被删除，PATCH 未命中任何行
+            failed.append((entry, "商品不存在"))
+    return {"succeeded": succeeded, "retry": retry, "failed": failed, "llm_failed": False}
+
 async def run_sourcing_ai_batch_job(
     job_id: str,
     items: List[Dict[str, Any]],
     category_name: str,
     spec_fields_raw: List[Dict[str, Any]],
-    model_override: Optional[str]
+    model_override: Optional[str],
+    force: bool = False,
 ) -> None:
     client = ensure_supabase()
     field_keys = [f.get("key") for f in spec_fields_raw if f.get("key")]
@@ -3221,100 +4312,75 @@ async def run_sourcing_ai_batch_job(
     success = 0
     failed = 0
     failures: List[Dict[str, Any]] = []
+    # 续跑：跳过检查点中已处理的商品，沿用之前的计数
+    done_ids = job_checkpoint_store.done_items(job_id)
+    if done_ids:
+        previous = get_sourcing_ai_job_state(job_id) or {}
+        total = max(int(previous.get("total") or 0), total)
+        items = [item for item in items if str(item.get("id")) not in done_ids]
+        processed = len(done_ids)
+        failures = list(previous.get("failures") or [])
+        failed = min(int(previous.get("failed") or 0), processed)
+        success = processed - failed
     update_sourcing_ai_job_state(
         job_id,
         status="running",
         total=total,
-        processed=0,
-        success=0,
-        failed=0,
-        failures=[],
+        processed=processed,
+        success=success,
+        failed=failed,
+        failures=failures[-50:],
     )
+    limiter = get_ai_provider_limiter(resolve_ai_provider(model_override))
+    planner = AiBatchChunkPlanner()
+    queue: "deque[Dict[str, Any]]" = deque({"item": item, "attempt": 1, "cap": None} for item in items)
+    retry_queue: "deque[Dict[str, Any]]" = deque()
+    pending: set = set()
     try:
-        for chunk in chunk_list(items, 10):
-            if not chunk:
-                continue
-            names = [str(item.get("title") or "").strip() for item in chunk]
-            try:
-                results = await ai_fill_product_params(
+        while queue or retry_queue or pending:
+            while len(pending) < limiter.concurrency and (retry_queue or queue):
+                # 失败重试的商品优先处理，使用更小的分块
+                chunk = planner.take(retry_queue if retry_queue else queue)
+                pending.add(asyncio.create_task(process_sourcing_ai_chunk(
+                    client,
+                    limiter,
+                    chunk,
                     category_name,
                     spec_fields_raw,
-                    names,
-                    model_override=model_override,
-                )
-            except Exception as exc:
-                reason = str(exc)
-                for item in chunk:
+                    field_keys,
+                    model_override,
+                    force,
+                )))
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                outcome = task.result()
+                chunk_size = len(outcome["retry"]) + len(outcome["succeeded"]) + len(outcome["failed"])
+                if outcome["llm_failed"] or len(outcome["retry"]) * 2 > chunk_size:
+                    planner.record_failure()
+                else:
+                    planner.record_success()
+                processed += len(outcome["succeeded"])
+                success += len(outcome["succeeded"])
+                exhausted = list(outcome["failed"])
+                retry_entries = outcome["retry"]
+                retry_cap = max(1, len(retry_entries) // 2)
+                for entry, reason in retry_entries:
+                    if entry["attempt"] >= AI_BATCH_MAX_ATTEMPTS:
+                        exhausted.append((entry, reason))
+                        continue
+                    retry_queue.append({"item": entry["item"], "attempt": entry["attempt"] + 1, "cap": retry_cap})
+                for entry, reason in exhausted:
                     processed += 1
                     failed += 1
                     failures.append({
-                        "name": str(item.get("title") or ""),
+                        "name": str(entry["item"].get("title") or ""),
                         "reason": reason,
                     })
-                update_sourcing_ai_job_state(
+                job_checkpoint_store.mark_items_done(
                     job_id,
-                    processed=processed,
-                    success=success,
-                    failed=failed,
-                    failures=failures[-50:],
+                    [entry["item"].get("id") for entry in outcome["succeeded"]]
+                    + [entry["item"].get("id") for entry, _ in exhausted],
                 )
-                continue
-            result_map = {
-                str(item.get("name") or "").strip(): item for item in results if isinstance(item, dict)
-            }
-            fallback = results if len(results) == len(chunk) else None
-            for index, item in enumerate(chunk):
-                name = str(item.get("title") or "").strip()
-                ai_item = result_map.get(name) if name else None
-                if not ai_item and fallback:
-                    ai_item = fallback[index] if index < len(fallback) else None
-                if not ai_item or not isinstance(ai_item, dict):
-                    processed += 1
-                    failed += 1
-                    failures.append({"name": name, "reason": "AI未返回结果"})
-                    update_sourcing_ai_job_state(
-                        job_id,
-                        processed=processed,
-                        success=success,
-                        failed=failed,
-                        failures=failures[-50:],
-                    )
-                    continue
-                spec_updates: Dict[str, Any] = {}
-                existing_spec = item.get("spec") or {}
-                for field in field_keys:
-                    if not field:
-                        continue
-                    new_value = str(ai_item.get(field) or "").strip()
-                    if not new_value:
-                        continue
-                    if str(existing_spec.get(field) or "").strip():
-                        continue
-                    spec_updates[field] = new_value
-                review_text = str(ai_item.get("评价") or "").strip()
-                existing_remark = str(item.get("remark") or "").strip()
-                should_set_remark = bool(review_text) and not existing_remark
-                updates = {
-                    "updated_at": utc_now_iso(),
-                }
-                if spec_updates:
-                    merged_spec = {**existing_spec, **spec_updates}
-                    updates["spec"] = normalize_spec_payload(merged_spec)
-                if should_set_remark:
-                    updates["remark"] = review_text
-                try:
-                    if spec_updates or should_set_remark:
-                        await client.update(
-                            "sourcing_items",
-                            updates,
-                            {"id": f"eq.{item.get('id')}"}
-                        )
-                    processed += 1
-                    success += 1
-                except Exception as exc:
-                    processed += 1
-                    failed += 1
-                    failures.append({"name": name, "reason": str(exc)})
                 update_sourcing_ai_job_state(
                     job_id,
                     processed=processed,
@@ -3329,6 +4395,81 @@ async def run_sourcing_ai_batch_job(
             status="error",
             error=str(exc),
         )
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def resume_sourcing_ai_batch_job(job_id: str, params: Dict[str, Any]) -> None:
+    client = ensure_supabase()
+    item_ids = [str(item_id) for item_id in params.get("item_ids") or []]
+    fetched = await fetch_sourcing_items_by_id_list(client, item_ids)
+    item_map = {str(item.get("id")): item for item in fetched}
+    await run_sourcing_ai_batch_job(
+        job_id,
+        [item_map[item_id] for item_id in item_ids if item_id in item_map],
+        params.get("category_name") or "",
+        params.get("spec_fields") or [],
+        params.get("model"),
+        force=bool(params.get("force")),
+    )
+
+def evict_sourcing_ai_job_state(job_id: str) -> None:
+    with sourcing_ai_job_lock:
+        sourcing_ai_job_store.pop(job_id, None)
+    job_event_broker.drop(job_id)
+
+job_runner.register_kind(
+    JOB_KIND_ZHIHU_SCRAPE,
+    concurrency=JOB_KIND_CONCURRENCY[JOB_KIND_ZHIHU_SCRAPE],
+    on_cancel=lambda job_id: update_zhihu_job_state(job_id, status="cancelled"),
+    on_evict=lambda job_id: evict_zhihu_job_state(job_id),
+    on_error=lambda job_id, error: update_zhihu_job_state(job_id, status="error", error=error),
+)
+
+job_runner.register_kind(
+    JOB_KIND_SOURCING_AI_BATCH,
+    concurrency=JOB_KIND_CONCURRENCY[JOB_KIND_SOURCING_AI_BATCH],
+    on_cancel=lambda job_id: update_sourcing_ai_job_state(job_id, status="cancelled"),
+    on_evict=lambda job_id: evict_sourcing_ai_job_state(job_id),
+    on_error=lambda job_id, error: update_sourcing_ai_job_state(job_id, status="error", error=error),
+)
+
+def submit_zhihu_scrape_job(job_id: str, keyword_id: Optional[str], priority: int = JOB_PRIORITY_USER) -> None:
+    job_runner.submit(
+        JOB_KIND_ZHIHU_SCRAPE,
+        job_id,
+        lambda: zhihu_scrape_job(keyword_id=keyword_id, include_existing=True, job_id=job_id),
+        priority=priority,
+    )
+
+def resume_checkpointed_jobs() -> List[str]:
+    """启动时清理过期任务，并续跑上次未完成的知乎抓取与 AI 批量补参任务"""
+    job_checkpoint_store.purge_finished(JOB_RETENTION_SECONDS)
+    if not supabase_client:
+        return []
+    resumed: List[str] = []
+    for job in job_checkpoint_store.unfinished_jobs():
+        job_id = job["id"]
+        state = dict(job["state"])
+        params = job["params"] or {}
+        if job["kind"] == JOB_KIND_ZHIHU_SCRAPE:
+            with zhihu_job_lock:
+                zhihu_job_store[job_id] = state
+            submit_zhihu_scrape_job(job_id, params.get("keyword_id"), priority=JOB_PRIORITY_RESUMED)
+        elif job["kind"] == JOB_KIND_SOURCING_AI_BATCH:
+            with sourcing_ai_job_lock:
+                sourcing_ai_job_store[job_id] = state
+            job_runner.submit(
+                JOB_KIND_SOURCING_AI_BATCH,
+                job_id,
+                lambda job_id=job_id, params=params: resume_sourcing_ai_batch_job(job_id, params),
+                priority=JOB_PRIORITY_RESUMED,
+            )
+        else:
+            continue
+        logger.info("[任务检查点] 续跑任务 %s (%s)", job_id, job["kind"])
+        resumed.append(job_id)
+    return resumed
 
 def normalize_comment_account(row: Dict[str, Any]) -> Dict[str, Any]:
 
@@ -3534,12 +4675,75 @@ def normalize_scheme(row: Dict[str, Any]) -> Dict[str, Any]:
 
         "items": items,
 
+        "item_count": len(items),
+
+        "version": row.get("version"),
+
         "created_at": row.get("created_at"),
 
         "updated_at": row.get("updated_at")
 
     }
 
+def normalize_scheme_summary(row: Dict[str, Any]) -> Dict[str, Any]:
+    """List-view scheme without the ``items`` array."""
+    item_count = row.get("item_count")
+    if item_count is None:
+        items = row.get("items")
+        item_count = len(items) if isinstance(items, list) else 0
+    return {
+        "id": row.get("id"),
+        "name": row.get("name") or "",
+        "category_id": row.get("category_id") or "",
+        "category_name": row.get("category_name") or "",
+        "remark": row.get("remark") or "",
+        "item_count": int(item_count),
+        "version": row.get("version"),
+        "created_at": row.get("created_at"),
+        "updated_at": row.get("updated_at"),
+    }
+
+def apply_scheme_item_ops(items: List[Any], ops: Sequence[SchemeItemOp]) -> List[Any]:
+    """Apply add/remove/move/patch ops (addressed by item id) to a copy of ``items``."""
+
+    result = list(items)
+
+    def find(item_id: Any) -> int:
+        key = str(item_id or "").strip()
+        for index, entry in enumerate(result):
+            if isinstance(entry, dict) and str(entry.get("id")) == key:
+                return index
+        return -1
+
+    def clamp(index: Optional[int]) -> int:
+        if index is None:
+            return len(result)
+        return max(0, min(int(index), len(result)))
+
+    for op in ops:
+        if op.op == "add":
+            if not isinstance(op.item, dict) or not str(op.item.get("id") or "").strip():
+                raise HTTPException(status_code=400, detail="新增商品缺少 id")
+            if find(op.item.get("id")) >= 0:
+                raise HTTPException(status_code=400, detail="商品已在方案中")
+            result.insert(clamp(op.index), dict(op.item))
+            continue
+        position = find(op.id)
+        if position < 0:
+            raise HTTPException(status_code=404, detail=f"方案商品不存在: {op.id}")
+        if op.op == "remove":
+            result.pop(position)
+        elif op.op == "move":
+            entry = result.pop(position)
+            result.insert(clamp(op.index), entry)
+        else:
+            fields = {key: value for key, value in (op.fields or {}).items() if key != "id"}
+            if not fields:
+                raise HTTPException(status_code=400, detail="没有需要更新的内容")
+            result[position] = {**result[position], **fields}
+
+    return result
+
 def _sanitize_tags(value: Optional[List[Any]]) -> List[str]:
 
     if not value:
@@ -3651,39 +4855,37 @@ async def sync_scheme_item_cover(
     if not item_id:
         return 0
 
-    try:
-        schemes = await client.select("schemes", params={"select": "id,items"})
-    except SupabaseError:
-        return 0
-
     updated = 0
-    for scheme in schemes or []:
-        items = scheme.get("items")
-        if not isinstance(items, list):
-            continue
-        changed = False
-        for entry in items:
-            if not isinstance(entry, dict):
+    try:
+        async for scheme in iter_supabase_rows(client, "schemes", {"select": "id,items"}):
+            items = scheme.get("items")
+            if not isinstance(items, list):
                 continue
-            source_id = entry.get("source_id")
-            entry_id = entry.get("id")
-            if (source_id is not None and str(source_id) == str(item_id)) or (
-                entry_id is not None and str(entry_id) == str(item_id)
-            ):
-                if entry.get("cover_url") != cover_url:
-                    entry["cover_url"] = cover_url
-                changed = True
-        if not changed:
-            continue
-        try:
-            await client.update(
-                "schemes",
-                {"items": items, "updated_at": utc_now_iso()},
-                {"id": f"eq.{scheme.get('id')}"},
-            )
-            updated += 1
-        except SupabaseError:
-            continue
+            changed = False
+            for entry in items:
+                if not isinstance(entry, dict):
+                    continue
+                source_id = entry.get("source_id")
+                entry_id = entry.get("id")
+                if (source_id is not None and str(source_id) == str(item_id)) or (
+                    entry_id is not None and str(entry_id) == str(item_id)
+                ):
+                    if entry.get("cover_url") != cover_url:
+                        entry["cover_url"] = cover_url
+                    changed = True
+            if not changed:
+                continue
+            try:
+                await client.update(
+                    "schemes",
+                    {"items": items, "updated_at": utc_now_iso()},
+                    {"id": f"eq.{scheme.get('id')}"},
+                )
+                updated += 1
+            except SupabaseError:
+                continue
+    except SupabaseError:
+        return updated
 
     return updated
 
@@ -3723,40 +4925,38 @@ async def sync_scheme_item_fields(
     if "spec" in payload and not isinstance(payload.get("spec"), dict):
         payload["spec"] = {}
 
-    try:
-        schemes = await client.select("schemes", params={"select": "id,items"})
-    except SupabaseError:
-        return 0
-
     updated = 0
-    for scheme in schemes or []:
-        items = scheme.get("items")
-        if not isinstance(items, list):
-            continue
-        changed = False
-        for entry in items:
-            if not isinstance(entry, dict):
+    try:
+        async for scheme in iter_supabase_rows(client, "schemes", {"select": "id,items"}):
+            items = scheme.get("items")
+            if not isinstance(items, list):
                 continue
-            source_id = entry.get("source_id")
-            entry_id = entry.get("id")
-            if (source_id is not None and str(source_id) == str(item_id)) or (
-                entry_id is not None and str(entry_id) == str(item_id)
-            ):
-                for key, value in payload.items():
-                    if entry.get(key) != value:
-                        entry[key] = value
-                        changed = True
-        if not changed:
-            continue
-        try:
-            await client.update(
-                "schemes",
-                {"items": items, "updated_at": utc_now_iso()},
-                {"id": f"eq.{scheme.get('id')}"},
-            )
-            updated += 1
-        except SupabaseError:
-            continue
+            changed = False
+            for entry in items:
+                if not isinstance(entry, dict):
+                    continue
+                source_id = entry.get("source_id")
+                entry_id = entry.get("id")
+                if (source_id is not None and str(source_id) == str(item_id)) or (
+                    entry_id is not None and str(entry_id) == str(item_id)
+                ):
+                    for key, value in payload.items():
+                        if entry.get(key) != value:
+                            entry[key] = value
+                            changed = True
+            if not changed:
+                continue
+            try:
+                await client.update(
+                    "schemes",
+                    {"items": items, "updated_at": utc_now_iso()},
+                    {"id": f"eq.{scheme.get('id')}"},
+                )
+                updated += 1
+            except SupabaseError:
+                continue
+    except SupabaseError:
+        return updated
 
     return updated
 
@@ -3877,9 +5077,7 @@ async def fetch_sourcing_categories(include_counts: bool = True) -> List[Dict[st
 
         counts = {}
 
-        rows = await client.select("sourcing_items", params={"select": "category_id"})
-
-        for row in rows:
+        async for row in iter_supabase_rows(client, "sourcing_items", {"select": "id,category_id"}):
 
             category_id = row.get("category_id")
 
@@ -3912,8 +5110,7 @@ async def fetch_sourcing_category_counts(force: bool = False) -> Dict[str, Any]:
     client = ensure_supabase()
     counts: Dict[str, int] = {}
     categories = await client.select("sourcing_categories", params={"select": "id"})
-    rows = await client.select("sourcing_items", params={"select": "category_id"})
-    for row in rows:
+    async for row in iter_supabase_rows(client, "sourcing_items", {"select": "id,category_id"}):
         category_id = row.get("category_id")
         if not category_id:
             continue
@@ -3927,6 +5124,64 @@ async def fetch_sourcing_category_counts(force: bool = False) -> Dict[str, Any]:
     cache.set(CACHE_NS_SOURCING_CATEGORY_COUNT, data=payload)
     return payload
 
+async def search_sourcing_items_ranked(
+    client: "SupabaseClient",
+    *,
+    keyword: str,
+    category_id: Optional[str],
+    limit: int,
+    offset: int,
+    select: str,
+) -> Optional[List[Dict[str, Any]]]:
+    """Relevance-ordered keyword search via the search_sourcing_items RPC.
+
+    Returns None when the RPC is unavailable (migration not applied) so callers can
+    fall back to the plain ilike query.
+    """
+    safe_keyword, _ = normalize_sourcing_keyword(keyword)
+    try:
+        rows = await client.rpc(
+            "search_sourcing_items",
+            {
+                "p_keyword": safe_keyword,
+                "p_category_id": category_id or None,
+                "p_limit": limit,
+                "p_offset": offset,
+            },
+            query={"select": select},
+        )
+    except SupabaseError as exc:
+        logger.info(f"[选品搜索] 排序搜索不可用，回退为模糊匹配: {exc.message}")
+        return None
+    return rows if isinstance(rows, list) else None
+
+async def backfill_sourcing_search_text(batch_size: int = 200) -> Dict[str, int]:
+    """Fill search_text for items written before the search index existed."""
+    client = ensure_supabase()
+    updated = 0
+    while True:
+        rows = await client.select(
+            "sourcing_items",
+            params={"select": "id,title", "search_text": "is.null", "limit": batch_size},
+        )
+        if not rows:
+            break
+        results = await asyncio.gather(
+            *[
+                client.update(
+                    "sourcing_items",
+                    {"search_text": build_sourcing_search_text(row.get("title"))},
+                    {"id": f"eq.{row.get('id')}", "select": "id"},
+                )
+                for row in rows
+            ]
+        )
+        updated += sum(1 for result in results if result)
+        if len(rows) < batch_size:
+            break
+    cache.invalidate(CACHE_NS_SOURCING_ITEMS)
+    return {"updated": updated}
+
 async def fetch_sourcing_items_page(
 
     *,
@@ -3941,6 +5196,7 @@ async def fetch_sourcing_items_page(
 
     fields: str = "list",
     sort: Optional[str] = None,
+    cursor: Optional[str] = None,
 
 ) -> Dict[str, Any]:
 
@@ -3949,7 +5205,7 @@ async def fetch_sourcing_items_page(
     offset = max(0, int(offset or 0))
 
     sort_key = (sort or "").strip()
-    cache_key = (category_id or "", keyword or "", limit, offset, fields, sort_key)
+    cache_key = (category_id or "", keyword or "", limit, offset, fields, sort_key, cursor or "")
 
     cached = cache.get(CACHE_NS_SOURCING_ITEMS, key=cache_key, ttl=CACHE_TTL_SECONDS)
 
@@ -3960,9 +5216,12 @@ async def fetch_sourcing_items_page(
     client = ensure_supabase()
 
     sort_value = sort_key.lower()
-    order_value = "created_at.desc"
+    order_value = "created_at.desc,id.desc"
     if sort_value == "manual":
         order_value = "spec->>_sort_order.asc.nullslast,created_at.desc"
+    # 游标分页仅适用于默认的 created_at 倒序；手动排序仍走 offset
+    keyset = sort_value != "manual"
+    after = decode_page_cursor(cursor) if keyset else None
 
     params: Dict[str, Any] = {
 
@@ -3978,13 +5237,11 @@ async def fetch_sourcing_items_page(
 
         params["category_id"] = f"eq.{category_id}"
 
-    if keyword:
-
-        safe_keyword = keyword.replace("%", "").replace("*", "").strip()
-
-        if safe_keyword:
+    keyword_filter = build_sourcing_keyword_filter(keyword)
 
-            params["or"] = f"(title.ilike.*{safe_keyword}*,uid.ilike.*{safe_keyword}*)"
+    if after:
+        params["and"] = build_keyset_filter("created_at", after)
+        params.pop("offset", None)
 
     if fields == "detail":
 
@@ -3994,12 +5251,29 @@ async def fetch_sourcing_items_page(
 
         params["select"] = SOURCING_LIST_FIELDS
 
-    rows = await client.select("sourcing_items", params=params)
+    rows = None
+    ranked = False
+    if keyword_filter and keyset and not after:
+        rows = await search_sourcing_items_ranked(
+            client,
+            keyword=keyword or "",
+            category_id=category_id,
+            limit=limit + 1,
+            offset=offset,
+            select=params["select"],
+        )
+        ranked = rows is not None
+    if rows is None:
+        rows = await select_sourcing_items_by_keyword(client, params, keyword)
 
     has_more = len(rows) > limit
 
     items = rows[:limit] if has_more else rows
 
+    next_cursor = None
+    if has_more and keyset and not ranked:
+        next_cursor = encode_page_cursor(items[-1], "created_at")
+
     payload = {
 
         "items": items,
@@ -4010,7 +5284,9 @@ async def fetch_sourcing_items_page(
 
         "has_more": has_more,
 
-        "next_offset": offset + len(items)
+        "next_offset": offset + len(items),
+
+        "next_cursor": next_cursor,
 
     }
 
@@ -4049,22 +5325,95 @@ async def fetch_comment_snapshot() -> Dict[str, Any]:
 
     }
 
-async def fetch_blue_link_map_snapshot(product_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+BLUE_LINK_MAP_ENTRY_FIELDS = "id,account_id,category_id,product_id,sku_id,source_link,remark,created_at,updated_at"
+BLUE_LINK_MAP_CATEGORY_FIELDS = "id,account_id,name,color,created_at,updated_at"
 
-    use_cache = not product_ids
-    cached = cache.get(CACHE_NS_BLUE_LINK_MAP, ttl=BLUE_LINK_MAP_CACHE_TTL_SECONDS)
+blue_link_map_last_purge_at = 0.0
 
-    if use_cache and cached is not None:
+
+def parse_sync_version(value: Any) -> Optional[datetime]:
+    text = str(value or "").strip()
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def format_sync_version(value: datetime) -> str:
+    # 以 Z 结尾，避免查询串里的 "+" 被解成空格
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def current_blue_link_map_version() -> str:
+    return format_sync_version(datetime.now(timezone.utc) - timedelta(seconds=BLUE_LINK_MAP_SYNC_SKEW_SECONDS))
+
+
+async def purge_blue_link_map_tombstones() -> None:
+    """Hard-delete tombstones older than the retention window (at most once a day)."""
+    global blue_link_map_last_purge_at
+    if time.time() - blue_link_map_last_purge_at < 86400:
+        return
+    blue_link_map_last_purge_at = time.time()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=BLUE_LINK_MAP_TOMBSTONE_RETENTION_DAYS)
+    try:
+        await ensure_supabase().delete(
+            "blue_link_map_entries",
+            {"deleted_at": f"lt.{format_sync_version(cutoff)}"},
+        )
+    except SupabaseError as exc:
+        logger.info("[蓝链映射] 清理墓碑失败: %s", exc)
+
+
+async def fetch_blue_link_map_snapshot(
+    product_ids: Optional[List[str]] = None,
+    since: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Full blue-link map snapshot, or only the entries changed since ``since``.
+
+    Every payload carries a ``version``; passing it back as ``since`` returns the
+    entries written after it plus ``deleted_entry_ids`` for soft-deleted ones,
+    including the entries of a deleted category. Accounts and categories are small
+    and always sent in full.
+    A ``since`` older than the tombstone retention falls back to a full snapshot
+    (``mode == "full"``).
+    """
+    since_at = None
+    if since:
+        since_at = parse_sync_version(since)
+        if since_at is None:
+            raise HTTPException(status_code=400, detail="无效的同步版本")
+        retention = timedelta(days=BLUE_LINK_MAP_TOMBSTONE_RETENTION_DAYS)
+        if since_at < datetime.now(timezone.utc) - retention:
+            since_at = None
+
+    use_cache = not product_ids and since_at is None
+    cached = cache.get(CACHE_NS_BLUE_LINK_MAP, ttl=BLUE_LINK_MAP_CACHE_TTL_SECONDS) if use_cache else None
+
+    if cached is not None:
 
         return cached
 
     client = ensure_supabase()
+    version = current_blue_link_map_version()
 
     cleaned_ids = [str(pid).strip() for pid in (product_ids or []) if str(pid).strip()]
-    entries_params = {
-        "order": "updated_at.desc",
-        "select": "id,account_id,category_id,product_id,sku_id,source_link,remark,created_at,updated_at"
-    }
+    if since_at is None:
+        entries_params = {
+            "order": "updated_at.desc",
+            "select": BLUE_LINK_MAP_ENTRY_FIELDS,
+            "deleted_at": "is.null",
+        }
+    else:
+        entries_params = {
+            "order": "updated_at.desc",
+            "select": f"{BLUE_LINK_MAP_ENTRY_FIELDS},deleted_at",
+            "updated_at": f"gte.{format_sync_version(since_at)}",
+        }
     if cleaned_ids:
         entries_params["product_id"] = f"in.({','.join(cleaned_ids)})"
 
@@ -4082,7 +5431,7 @@ async def fetch_blue_link_map_snapshot(product_ids: Optional[List[str]] = None)
             "blue_link_map_categories",
             params={
                 "order": "created_at.asc",
-                "select": "id,account_id,name,color,created_at"
+                "select": BLUE_LINK_MAP_CATEGORY_FIELDS
             }
         ),
         entries_task,
@@ -4090,20 +5439,79 @@ async def fetch_blue_link_map_snapshot(product_ids: Optional[List[str]] = None)
 
     payload = {
 
+        "mode": "full" if since_at is None else "delta",
+
+        "version": version,
+
         "accounts": [normalize_comment_account(item) for item in accounts],
 
         "categories": [normalize_blue_link_map_category(item) for item in categories],
 
-        "entries": [normalize_blue_link_map_entry(item) for item in entries],
+        "entries": [normalize_blue_link_map_entry(item) for item in entries if not item.get("deleted_at")],
 
     }
 
+    if since_at is not None:
+        payload["deleted_entry_ids"] = [str(item.get("id")) for item in entries if item.get("deleted_at")]
+
     if use_cache:
         cache.set(CACHE_NS_BLUE_LINK_MAP, data=payload)
+        await purge_blue_link_map_tombstones()
 
     return payload
 
-async def fetch_benchmark_snapshot(mode: str = "full") -> Dict[str, Any]:
+
+def patch_blue_link_map_cache(
+    *,
+    entries: Sequence[Dict[str, Any]] = (),
+    removed_entry_ids: Iterable[Any] = (),
+    categories: Sequence[Dict[str, Any]] = (),
+    removed_category_ids: Iterable[Any] = (),
+) -> None:
+    """Apply a write to the cached full snapshot instead of dropping it.
+
+    A new payload object replaces the old one (keeping its age) so responses
+    memoized against the previous object are not reused. Its ``version`` is left
+    alone: the patched rows are newer than it and will also show up in deltas.
+    """
+    cached = cache.get(CACHE_NS_BLUE_LINK_MAP, ttl=BLUE_LINK_MAP_CACHE_TTL_SECONDS)
+    if cached is None:
+        return
+    removed_entries = {str(item) for item in removed_entry_ids}
+    removed_categories = {str(item) for item in removed_category_ids}
+    changed_entries = {str(row.get("id")): normalize_blue_link_map_entry(row) for row in entries if row.get("id")}
+    changed_categories = {
+        str(row.get("id")): normalize_blue_link_map_category(row) for row in categories if row.get("id")
+    }
+
+    next_entries = list(changed_entries.values()) + [
+        entry
+        for entry in cached["entries"]
+        if str(entry.get("id")) not in changed_entries
+        and str(entry.get("id")) not in removed_entries
+        and str(entry.get("category_id")) not in removed_categories
+    ]
+    next_categories = []
+    for category in cached["categories"]:
+        category_id = str(category.get("id"))
+        if category_id in removed_categories:
+            continue
+        next_categories.append(changed_categories.pop(category_id, category))
+    next_categories.extend(changed_categories.values())
+
+    cache.replace(
+        CACHE_NS_BLUE_LINK_MAP,
+        data={**cached, "categories": next_categories, "entries": next_entries},
+    )
+
+BENCHMARK_PAGE_MAX_LIMIT = 200
+
+
+async def fetch_benchmark_categories() -> List[Dict[str, Any]]:
+    """Sourcing categories as shown on the benchmark page, cached on their own TTL."""
+    cached = cache.get(CACHE_NS_BENCHMARK_CATEGORIES, ttl=BENCHMARK_CATEGORIES_CACHE_TTL_SECONDS)
+    if cached is not None:
+        return cached
 
     categories = await fetch_sourcing_categories(include_counts=False)
 
@@ -4122,33 +5530,79 @@ async def fetch_benchmark_snapshot(mode: str = "full") -> Dict[str, Any]:
 
     ]
 
+    cache.set(CACHE_NS_BENCHMARK_CATEGORIES, data=normalized_categories)
+    return normalized_categories
+
+def build_benchmark_keyword_filter(keyword: Optional[str]) -> Optional[str]:
+    safe_keyword = re.sub(r"[%*,()]", "", keyword or "").strip()
+    if not safe_keyword:
+        return None
+    return f"(title.ilike.*{safe_keyword}*,author.ilike.*{safe_keyword}*)"
+
+async def fetch_benchmark_snapshot(
+    mode: str = "full",
+    *,
+    category_id: Optional[str] = None,
+    keyword: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Benchmark categories plus entries, newest first.
+
+    ``category_id`` and ``keyword`` filter in PostgREST. Passing ``limit`` or
+    ``cursor`` returns a single keyset page with a ``pagination`` block; without
+    them every matching entry is returned, as before.
+    """
+
+    normalized_categories = await fetch_benchmark_categories()
+
     client = ensure_supabase()
 
+    params: Dict[str, Any] = {"order": "created_at.desc,id.desc"}
+
     if mode == "pick":
+        # created_at 只用于生成翻页游标，返回前去掉
+        params["select"] = "id,category_id,title,link,author,created_at"
 
-        entries = await client.select(
+    if category_id:
+        params["category_id"] = f"eq.{category_id}"
 
-            "benchmark_entries",
+    keyword_filter = build_benchmark_keyword_filter(keyword)
+    if keyword_filter:
+        params["or"] = keyword_filter
 
-            params={
+    def present(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if mode == "pick":
+            return [{key: value for key, value in row.items() if key != "created_at"} for row in rows]
+        return [normalize_benchmark_entry(item) for item in rows]
 
-                "order": "created_at.desc",
+    if limit is None and not cursor:
 
-                "select": "id,category_id,title,link,author"
+        entries = [row async for row in iter_supabase_rows(client, "benchmark_entries", params)]
 
-            }
+        return {"categories": normalized_categories, "entries": present(entries)}
 
-        )
+    page_limit = max(1, min(int(limit or 50), BENCHMARK_PAGE_MAX_LIMIT))
+    after = decode_page_cursor(cursor)
+    if after:
+        params["and"] = build_keyset_filter("created_at", after)
+    params["limit"] = page_limit + 1
 
-        return {"categories": normalized_categories, "entries": entries}
-
-    entries = await client.select("benchmark_entries", params={"order": "created_at.desc"})
+    rows = await client.select("benchmark_entries", params)
+    has_more = len(rows) > page_limit
+    rows = rows[:page_limit]
 
     return {
 
         "categories": normalized_categories,
 
-        "entries": [normalize_benchmark_entry(item) for item in entries]
+        "entries": present(rows),
+
+        "pagination": {
+            "limit": page_limit,
+            "has_more": has_more,
+            "next_cursor": encode_page_cursor(rows[-1], "created_at") if has_more and rows else None,
+        },
 
     }
 
@@ -4180,7 +5634,7 @@ async def delete_old_cover(cover_url: str):
 
         }
 
-        async with httpx.AsyncClient() as http_client:
+        async with create_httpx_client() as http_client:
 
             await http_client.delete(delete_url, headers=headers)
 
@@ -4222,7 +5676,7 @@ async def sync_account_videos_for_account(
             stat = await fetch_account_video_stat(bvid, session=session)
         return build_account_video_payload(account_id, item, stat)
 
-    async with aiohttp.ClientSession() as session:
+    async with create_http_session() as session:
         results = await asyncio.gather(
             *(build_row(item, session) for item in vlist),
             return_exceptions=False,
@@ -4258,6 +5712,18 @@ def _normalize_pub_time(value: Optional[Any]) -> Optional[str]:
 
     return None
 
+async def render_metrics() -> str:
+    caches = [("memory", namespace, stats) for namespace, stats in cache.stats().items()]
+    caches.extend(("llm", namespace, stats) for namespace, stats in (await llm_result_cache.stats()).items())
+    return render_prometheus(
+        http=http_request_metrics.snapshot(),
+        supabase=supabase_metrics.snapshot(),
+        caches=caches,
+        jobs=job_runner.stats(),
+        loop=loop_stall_monitor.snapshot() if loop_stall_monitor.running else None,
+        outbound=outbound_request_metrics.snapshot(),
+    )
+
 try:
     from backend.api import (
         sourcing,
@@ -4271,6 +5737,8 @@ try:
         blue_link_map,
         direct_plans,
         benchmark_accounts,
+        jobs,
+        metrics,
     )
 except Exception:
     from api import (  # type: ignore
@@ -4285,6 +5753,8 @@ except Exception:
         blue_link_map,
         direct_plans,
         benchmark_accounts,
+        jobs,
+        metrics,
     )
 
 app.include_router(sourcing.router)
@@ -4298,6 +5768,8 @@ app.include_router(benchmark.router)
 app.include_router(blue_link_map.router)
 app.include_router(direct_plans.router)
 app.include_router(benchmark_accounts.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
 
 try:
     from backend.api.blue_link_map import (
@@ -4324,4 +5796,5 @@ async def health_check():
             "deepseek": bool(DEEPSEEK_API_KEY),
             "dashscope": bool(DASHSCOPE_API_KEY),
         },
+        "llm_cache": await llm_result_cache.stats(),
     }
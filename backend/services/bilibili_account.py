@@ -10,7 +10,6 @@ from uuid import uuid4
 
 import aiohttp
 from fastapi import HTTPException
-from playwright.async_api import async_playwright
 from zoneinfo import ZoneInfo
 
 logger = logging.getLogger(__name__)
@@ -151,6 +150,8 @@ async def build_bilibili_runtime_cookie(
 async def fetch_bilibili_runtime_cookie_from_space_page(mid: str) -> Optional[str]:
     target_url = f"https://space.bilibili.com/{mid}/upload/video"
     try:
+        from playwright.async_api import async_playwright
+
         async with async_playwright() as playwright:
             browser = await playwright.chromium.launch(headless=True)
             context = await browser.new_context(
@@ -190,6 +191,8 @@ async def fetch_account_videos_from_space_page(
     target_url = f"https://space.bilibili.com/{mid}/upload/video{query}"
 
     try:
+        from playwright.async_api import async_playwright
+
         async with async_playwright() as playwright:
             browser = await playwright.chromium.launch(headless=True)
             context = await browser.new_context(
@@ -291,6 +294,7 @@ async def fetch_account_videos_from_bili(
     build_bilibili_headers_fn: BuildHeadersFn,
     bilibili_cookie: str,
     playwright_enabled: bool = True,
+    session_factory: Callable[[], aiohttp.ClientSession] = aiohttp.ClientSession,
 ) -> List[Dict[str, Any]]:
     keys = await fetch_wbi_keys_fn()
     if not keys:
@@ -348,7 +352,7 @@ async def fetch_account_videos_from_bili(
                         headers["Cookie"] = runtime_cookie
                 return await request(session)
 
-            async with aiohttp.ClientSession() as local_session:
+            async with session_factory() as local_session:
                 if not headers.get("Cookie"):
                     runtime_cookie = await build_bilibili_runtime_cookie(
                         local_session,
@@ -379,7 +383,7 @@ async def fetch_account_videos_from_bili(
                     keys = await fetch_wbi_keys_fn(force=True) or keys
                     if session:
                         return await request(session, dm_img_inter=BILIBILI_DM_IMG_INTER)
-                    async with aiohttp.ClientSession() as local_session:
+                    async with session_factory() as local_session:
                         return await request(local_session, dm_img_inter=BILIBILI_DM_IMG_INTER)
                 except Exception as exc:
                     last_error = exc
@@ -406,6 +410,7 @@ async def fetch_account_video_stat(
     session: Optional[aiohttp.ClientSession] = None,
     *,
     build_bilibili_headers_fn: BuildHeadersFn,
+    session_factory: Callable[[], aiohttp.ClientSession] = aiohttp.ClientSession,
 ) -> Optional[Dict[str, Any]]:
     if not bvid:
         return None
@@ -430,7 +435,7 @@ async def fetch_account_video_stat(
                     ) as resp:
                         data = await resp.json()
                 else:
-                    async with aiohttp.ClientSession() as local_session:
+                    async with session_factory() as local_session:
                         async with local_session.get(
                             url,
                             headers=headers,
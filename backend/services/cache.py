@@ -14,18 +14,24 @@ class CacheManager:
     def __init__(self) -> None:
         self._store: Dict[str, Dict[Hashable, CacheEntry]] = {}
         self._lock = threading.RLock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _bump(self, namespace: str, counter: str) -> None:
+        bucket = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        bucket[counter] += 1
 
     def get(self, namespace: str, key: Hashable = "payload", ttl: Optional[float] = None) -> Optional[Any]:
         with self._lock:
             bucket = self._store.get(namespace)
-            if not bucket:
-                return None
-            entry = bucket.get(key)
+            entry = bucket.get(key) if bucket else None
             if not entry:
+                self._bump(namespace, "misses")
                 return None
             if ttl is not None and time.time() - entry.timestamp >= ttl:
                 bucket.pop(key, None)
+                self._bump(namespace, "misses")
                 return None
+            self._bump(namespace, "hits")
             return entry.data
 
     def set(
@@ -43,6 +49,16 @@ class CacheManager:
                 oldest_key = min(bucket.items(), key=lambda item: item[1].timestamp)[0]
                 bucket.pop(oldest_key, None)
 
+    def replace(self, namespace: str, key: Hashable = "payload", data: Any = None) -> bool:
+        """Swap the data of a live entry, keeping its age; False when there is no entry."""
+        with self._lock:
+            bucket = self._store.get(namespace)
+            entry = bucket.get(key) if bucket else None
+            if not entry:
+                return False
+            bucket[key] = CacheEntry(timestamp=entry.timestamp, data=data)
+            return True
+
     def invalidate(self, namespace: str, key: Optional[Hashable] = None) -> None:
         with self._lock:
             if key is None:
@@ -55,5 +71,16 @@ class CacheManager:
             if not bucket:
                 self._store.pop(namespace, None)
 
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            namespaces = sorted(set(self._stats) | set(self._store))
+            return {
+                namespace: {
+                    **self._stats.get(namespace, {"hits": 0, "misses": 0}),
+                    "entries": len(self._store.get(namespace) or {}),
+                }
+                for namespace in namespaces
+            }
+
 
 cache = CacheManager()
@@ -0,0 +1,118 @@
+import gzip
+from typing import Any, List, MutableMapping, Optional, Sequence, Tuple
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # brotli 为可选依赖，缺失时只提供 gzip
+    brotli = None
+
+DEFAULT_EXCLUDED_MEDIA_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip")
+
+
+def parse_accept_encoding(value: str) -> List[str]:
+    """Encodings the client accepts (q > 0), in header order."""
+    accepted: List[str] = []
+    for part in value.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, raw = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.append(token)
+    return accepted
+
+
+class CompressionMiddleware:
+    """Compress single-body responses with brotli (when installed) or gzip.
+
+    Streaming responses (``more_body``) and excluded media types such as SSE pass
+    through untouched, so event streams keep flushing immediately.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        excluded_media_types: Sequence[str] = DEFAULT_EXCLUDED_MEDIA_TYPES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_media_types = tuple(excluded_media_types)
+
+    def _choose(self, scope: MutableMapping[str, Any]) -> Optional[str]:
+        header = ""
+        for key, value in scope.get("headers") or []:
+            if key == b"accept-encoding":
+                header = value.decode("latin-1")
+                break
+        accepted = parse_accept_encoding(header)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: MutableMapping[str, Any], receive: Any, send: Any) -> None:
+        encoding = self._choose(scope) if scope.get("type") == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[MutableMapping[str, Any]] = None
+        passthrough = False
+
+        async def send_wrapper(message: MutableMapping[str, Any]) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough or start is None:
+                await send(message)
+                return
+            body = message.get("body") or b""
+            headers: List[Tuple[bytes, bytes]] = list(start.get("headers") or [])
+            names = {key.lower(): value for key, value in headers}
+            media_type = names.get(b"content-type", b"").decode("latin-1")
+            if (
+                message.get("more_body")
+                or len(body) < self.minimum_size
+                or b"content-encoding" in names
+                or any(media_type.startswith(excluded) for excluded in self.excluded_media_types)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            compressed = self._compress(encoding, body)
+            headers = [(key, value) for key, value in headers if key.lower() != b"content-length"]
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            vary = names.get(b"vary")
+            if vary is None:
+                headers.append((b"vary", b"Accept-Encoding"))
+            elif b"accept-encoding" not in vary.lower():
+                headers = [(key, value) for key, value in headers if key.lower() != b"vary"]
+                headers.append((b"vary", vary + b", Accept-Encoding"))
+            start["headers"] = headers
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson 可选：缺失时退回标准库 json
+    orjson = None
+
+
+def dump_json(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so ``W/"x"`` matches ``"x"``."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ConditionalJSON:
+    """Serialize state snapshots once and answer ``If-None-Match`` with 304.
+
+    The serialized body and its ETag are memoized per key together with the payload
+    object they came from. Snapshot fetchers hand back the very object stored in
+    ``CacheManager`` until it expires or is invalidated, so a cache hit skips both
+    serialization and hashing; any new payload object is re-hashed.
+    """
+
+    def __init__(self, *, max_entries: int = 64) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[Hashable, Tuple[Any, bytes, str]]" = OrderedDict()
+
+    def render(self, key: Hashable, payload: Any) -> Tuple[bytes, str]:
+        with self._lock:
+            memo = self._memo.get(key)
+            if memo is not None and memo[0] is payload:
+                self._memo.move_to_end(key)
+                return memo[1], memo[2]
+        body = dump_json(payload)
+        etag = compute_etag(body)
+        with self._lock:
+            self._memo[key] = (payload, body, etag)
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return body, etag
+
+    def respond(self, key: Hashable, payload: Any, if_none_match: Optional[str]) -> Response:
+        body, etag = self.render(key, payload)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
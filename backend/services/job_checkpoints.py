@@ -0,0 +1,282 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+UNFINISHED_JOB_STATUSES = ("queued", "running")
+
+
+class JobCheckpointStore:
+    """SQLite-backed job state and per-item checkpoints.
+
+    The connection is opened lazily so importing the app never touches the disk.
+    Writes are queued to a single writer thread, so callers on the event loop never
+    serialize state or wait on a commit. State updates are coalesced per job and
+    written at most once per ``state_interval`` seconds; a finished (non-running)
+    state is written right away. Reads flush the queue first.
+    """
+
+    def __init__(self, path: Path, *, state_interval: float = 0.5) -> None:
+        self.path = Path(path)
+        self.state_interval = state_interval
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cond = threading.Condition()
+        self._ops: List[Tuple[str, Tuple[Any, ...]]] = []
+        self._pending_states: Dict[str, Dict[str, Any]] = {}
+        self._due: Dict[str, float] = {}
+        self._last_written: Dict[str, float] = {}
+        self._writing = False
+        self._closing = False
+        self._writer: Optional[threading.Thread] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    params TEXT NOT NULL DEFAULT '{}',
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_items (
+                    job_id TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    PRIMARY KEY (job_id, item_key)
+                )
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _enqueue(self, op: str, args: Tuple[Any, ...]) -> None:
+        with self._cond:
+            self._ops.append((op, args))
+            self._start_writer()
+            self._cond.notify_all()
+
+    def _start_writer(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            self._closing = False
+            self._writer = threading.Thread(target=self._run_writer, name="job-checkpoint-writer", daemon=True)
+            self._writer.start()
+
+    def _run_writer(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due_ids = [job_id for job_id, at in self._due.items() if at <= now or self._closing]
+                    if self._ops or due_ids or self._closing:
+                        break
+                    timeout = min(self._due.values()) - now if self._due else None
+                    self._cond.wait(timeout)
+                ops, self._ops = self._ops, []
+                states = [(job_id, self._pending_states.pop(job_id)) for job_id in due_ids]
+                for job_id in due_ids:
+                    self._due.pop(job_id, None)
+                if not ops and not states:
+                    self._cond.notify_all()
+                    return
+                self._writing = True
+            try:
+                self._write_batch(ops, states)
+            finally:
+                with self._cond:
+                    now = time.monotonic()
+                    for job_id, state in states:
+                        if str(state.get("status") or "") in UNFINISHED_JOB_STATUSES:
+                            self._last_written[job_id] = now
+                        else:
+                            self._last_written.pop(job_id, None)
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write_batch(
+        self,
+        ops: List[Tuple[str, Tuple[Any, ...]]],
+        states: List[Tuple[str, Dict[str, Any]]],
+    ) -> None:
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("BEGIN")
+                for op, args in ops:
+                    if op == "save_job":
+                        kind, job_id, state, params, saved_at = args
+                        conn.execute(
+                            "INSERT INTO jobs (id, kind, status, state, params, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                            "ON CONFLICT(id) DO UPDATE SET status = excluded.status, state = excluded.state, "
+                            "updated_at = excluded.updated_at",
+                            (
+                                job_id,
+                                kind,
+                                str(state.get("status") or ""),
+                                json.dumps(state, ensure_ascii=False, default=str),
+                                json.dumps(params or {}, ensure_ascii=False, default=str),
+                                saved_at,
+                            ),
+                        )
+                    elif op == "mark_items_done":
+                        conn.executemany("INSERT OR IGNORE INTO job_items (job_id, item_key) VALUES (?, ?)", args[0])
+                    elif op == "purge":
+                        self._purge(conn, args[0])
+                for job_id, state in states:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, state = ?, updated_at = ? WHERE id = ?",
+                        (
+                            str(state.get("status") or ""),
+                            json.dumps(state, ensure_ascii=False, default=str),
+                            time.time(),
+                            job_id,
+                        ),
+                    )
+                conn.execute("COMMIT")
+            except Exception as exc:
+                logger.info("[任务检查点] 写入失败: %s", exc)
+                try:
+                    if self._conn is not None and self._conn.in_transaction:
+                        self._conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write everything queued, including throttled state updates, and wait for it."""
+        with self._cond:
+            if self._writer is None or not self._writer.is_alive():
+                return not self._ops and not self._due
+            for job_id in self._due:
+                self._due[job_id] = 0.0
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: not self._ops and not self._due and not self._writing, timeout=timeout
+            )
+
+    def save_job(
+        self,
+        kind: str,
+        job_id: str,
+        state: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self._enqueue("save_job", (kind, job_id, dict(state), params, time.time()))
+
+    def update_state(self, job_id: str, state: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        finished = str(state.get("status") or "") not in UNFINISHED_JOB_STATUSES
+        with self._cond:
+            due = now if finished else max(now, self._last_written.get(job_id, 0.0) + self.state_interval)
+            self._pending_states[job_id] = state
+            self._due[job_id] = min(self._due.get(job_id, due), due)
+            self._start_writer()
+            self._cond.notify_all()
+
+    def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self.flush()
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT kind, state, params FROM jobs WHERE id = ?", (job_id,)
+                ).fetchone()
+            except sqlite3.Error as exc:
+                logger.info("[任务检查点] 读取失败: %s", exc)
+                return None
+        if not row:
+            return None
+        return {"kind": row[0], "state": json.loads(row[1]), "params": json.loads(row[2])}
+
+    def unfinished_jobs(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        placeholders = ",".join("?" for _ in UNFINISHED_JOB_STATUSES)
+        sql = f"SELECT id, kind, state, params FROM jobs WHERE status IN ({placeholders})"
+        args: List[Any] = list(UNFINISHED_JOB_STATUSES)
+        if kind:
+            sql += " AND kind = ?"
+            args.append(kind)
+        self.flush()
+        with self._lock:
+            try:
+                rows = self._connect().execute(sql + " ORDER BY updated_at", args).fetchall()
+            except sqlite3.Error as exc:
+                logger.info("[任务检查点] 读取失败: %s", exc)
+                return []
+        return [
+            {"id": row[0], "kind": row[1], "state": json.loads(row[2]), "params": json.loads(row[3])}
+            for row in rows
+        ]
+
+    def mark_items_done(self, job_id: str, item_keys: Iterable[Any]) -> None:
+        rows = [(job_id, str(key)) for key in item_keys if key is not None and str(key)]
+        if rows:
+            self._enqueue("mark_items_done", (rows,))
+
+    def done_items(self, job_id: str) -> Set[str]:
+        self.flush()
+        with self._lock:
+            try:
+                rows = self._connect().execute(
+                    "SELECT item_key FROM job_items WHERE job_id = ?", (job_id,)
+                ).fetchall()
+            except sqlite3.Error as exc:
+                logger.info("[任务检查点] 读取进度失败: %s", exc)
+                return set()
+        return {row[0] for row in rows}
+
+    def schedule_purge(self, retention_seconds: float) -> None:
+        """purge_finished on the writer thread, for callers on the event loop."""
+        self._enqueue("purge", (retention_seconds,))
+
+    def purge_finished(self, retention_seconds: float) -> int:
+        self.flush()
+        with self._lock:
+            try:
+                ids = self._purge(self._connect(), retention_seconds)
+            except sqlite3.Error as exc:
+                logger.info("[任务检查点] 清理失败: %s", exc)
+                return 0
+        return len(ids)
+
+    def _purge(self, conn: sqlite3.Connection, retention_seconds: float) -> List[str]:
+        cutoff = time.time() - retention_seconds
+        placeholders = ",".join("?" for _ in UNFINISHED_JOB_STATUSES)
+        ids = [
+            row[0]
+            for row in conn.execute(
+                f"SELECT id FROM jobs WHERE status NOT IN ({placeholders}) AND updated_at < ?",
+                (*UNFINISHED_JOB_STATUSES, cutoff),
+            ).fetchall()
+        ]
+        for job_id in ids:
+            conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return ids
+
+    def close(self) -> None:
+        with self._cond:
+            writer = self._writer
+            self._closing = True
+            self._cond.notify_all()
+        if writer is not None:
+            writer.join(timeout=5)
+        with self._cond:
+            self._writer = None
+            self._closing = False
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+FINISHED_EVENT_STATUSES = ("done", "error", "cancelled")
+
+Subscriber = Tuple[asyncio.AbstractEventLoop, "asyncio.Queue[Tuple[int, str, Dict[str, Any]]]"]
+
+
+@dataclass
+class _Channel:
+    seq: int = 0
+    state: Dict[str, Any] = field(default_factory=dict)
+    history: Deque[Tuple[int, str, Dict[str, Any]]] = field(default_factory=deque)
+    subscribers: Set[Subscriber] = field(default_factory=set)
+
+
+def format_sse(event_id: int, event: str, data: Dict[str, Any]) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+
+class JobEventBroker:
+    """Fan-out of job state changes as Server-Sent Events.
+
+    Each publish is diffed against the previous state once and only the changed keys
+    are pushed, so the cost does not grow with the number of watchers. A short
+    history per job lets clients resume with ``Last-Event-ID``; anything older gets
+    a full snapshot instead.
+    """
+
+    def __init__(self, history: int = 200) -> None:
+        self.history = history
+        self._lock = threading.RLock()
+        self._channels: Dict[str, _Channel] = {}
+
+    def publish(self, job_id: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            channel = self._channels.setdefault(job_id, _Channel(history=deque(maxlen=self.history)))
+            if channel.seq == 0:
+                event, data = "snapshot", dict(state)
+            else:
+                event = "update"
+                data = {key: value for key, value in state.items() if channel.state.get(key) != value}
+                if not data:
+                    return
+            channel.seq += 1
+            channel.state = dict(state)
+            item = (channel.seq, event, data)
+            channel.history.append(item)
+            subscribers = list(channel.subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                continue
+
+    def drop(self, job_id: str) -> None:
+        with self._lock:
+            self._channels.pop(job_id, None)
+
+    def subscriber_count(self, job_id: str) -> int:
+        with self._lock:
+            channel = self._channels.get(job_id)
+            return len(channel.subscribers) if channel else 0
+
+    def _attach(
+        self,
+        job_id: str,
+        last_event_id: Optional[int],
+        fallback_state: Dict[str, Any],
+        subscriber: Subscriber,
+    ) -> Tuple[List[Tuple[int, str, Dict[str, Any]]], Dict[str, Any]]:
+        with self._lock:
+            channel = self._channels.setdefault(job_id, _Channel(history=deque(maxlen=self.history)))
+            channel.subscribers.add(subscriber)
+            if (
+                last_event_id is not None
+                and channel.history
+                and channel.history[0][0] <= last_event_id + 1
+                and last_event_id <= channel.seq
+            ):
+                replay = [item for item in channel.history if item[0] > last_event_id]
+                return replay, dict(channel.state or fallback_state)
+            current = dict(channel.state or fallback_state)
+            return [(channel.seq, "snapshot", current)], current
+
+    def _detach(self, job_id: str, subscriber: Subscriber) -> None:
+        with self._lock:
+            channel = self._channels.get(job_id)
+            if channel:
+                channel.subscribers.discard(subscriber)
+                if not channel.subscribers and channel.seq == 0:
+                    self._channels.pop(job_id, None)
+
+    async def stream(
+        self,
+        job_id: str,
+        *,
+        last_event_id: Optional[int],
+        get_state: Callable[[], Optional[Dict[str, Any]]],
+        heartbeat: float,
+    ) -> AsyncIterator[str]:
+        queue: "asyncio.Queue[Tuple[int, str, Dict[str, Any]]]" = asyncio.Queue()
+        subscriber: Subscriber = (asyncio.get_running_loop(), queue)
+        replay, current = self._attach(job_id, last_event_id, get_state() or {}, subscriber)
+        try:
+            yield "retry: 3000\n\n"
+            # 客户端已收到最后一条事件：任务已结束时直接关闭，不再进入心跳等待
+            if not replay and current.get("status") in FINISHED_EVENT_STATUSES:
+                return
+            for event_id, event, data in replay:
+                yield format_sse(event_id, event, data)
+                if data.get("status") in FINISHED_EVENT_STATUSES:
+                    return
+            while True:
+                try:
+                    event_id, event, data = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_sse(event_id, event, data)
+                if data.get("status") in FINISHED_EVENT_STATUSES:
+                    return
+        finally:
+            self._detach(job_id, subscriber)
@@ -0,0 +1,217 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_ERROR = "error"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_JOB_STATUSES = (JOB_DONE, JOB_ERROR, JOB_CANCELLED)
+
+
+@dataclass
+class JobKind:
+    name: str
+    concurrency: int = 1
+    on_cancel: Optional[Callable[[str], None]] = None
+    on_evict: Optional[Callable[[str], None]] = None
+    on_error: Optional[Callable[[str, str], None]] = None
+
+
+@dataclass
+class JobRecord:
+    id: str
+    kind: str
+    priority: int
+    factory: Callable[[], Awaitable[Any]]
+    status: str = JOB_QUEUED
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    task: Optional["asyncio.Task[Any]"] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = time.time()
+        started = self.started_at
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "priority": self.priority,
+            "status": self.status,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": started,
+            "finished_at": self.finished_at,
+            "wait_seconds": round((started or now) - self.submitted_at, 3),
+            "run_seconds": round((self.finished_at or now) - started, 3) if started else None,
+        }
+
+
+class JobRunner:
+    """Background job scheduler: per-kind priority queues and concurrency caps.
+
+    Lower ``priority`` runs first; jobs of equal priority run in submission order.
+    Finished jobs are kept for ``ttl`` seconds and evicted whenever a job is submitted,
+    listed or finishes, which also lets each kind drop its own progress state through
+    ``on_evict``. ``on_error`` receives the error of a job that raised, so the kind can
+    mark its own (persisted) state failed.
+    """
+
+    def __init__(self, *, ttl: float) -> None:
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._kinds: Dict[str, JobKind] = {}
+        self._jobs: Dict[str, JobRecord] = {}
+        self._queues: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._running: Dict[str, int] = {}
+        self._seq = itertools.count()
+
+    def register_kind(
+        self,
+        name: str,
+        *,
+        concurrency: int = 1,
+        on_cancel: Optional[Callable[[str], None]] = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+        on_error: Optional[Callable[[str, str], None]] = None,
+    ) -> None:
+        with self._lock:
+            self._kinds[name] = JobKind(name, max(1, concurrency), on_cancel, on_evict, on_error)
+            self._queues.setdefault(name, [])
+            self._running.setdefault(name, 0)
+
+    def submit(
+        self,
+        kind: str,
+        job_id: str,
+        factory: Callable[[], Awaitable[Any]],
+        *,
+        priority: int = 0,
+    ) -> JobRecord:
+        if kind not in self._kinds:
+            raise KeyError(f"unknown job kind: {kind}")
+        self.evict_expired()
+        record = JobRecord(id=job_id, kind=kind, priority=priority, factory=factory)
+        with self._lock:
+            self._jobs[job_id] = record
+            heapq.heappush(self._queues[kind], (priority, next(self._seq), job_id))
+        self._dispatch(kind)
+        return record
+
+    def _dispatch(self, kind: str) -> None:
+        with self._lock:
+            spec = self._kinds[kind]
+            queue = self._queues[kind]
+            while queue and self._running[kind] < spec.concurrency:
+                _, _, job_id = heapq.heappop(queue)
+                record = self._jobs.get(job_id)
+                if not record or record.status != JOB_QUEUED:
+                    continue
+                record.status = JOB_RUNNING
+                record.started_at = time.time()
+                self._running[kind] += 1
+                record.task = asyncio.get_running_loop().create_task(self._run(record))
+
+    async def _run(self, record: JobRecord) -> None:
+        try:
+            await record.factory()
+        except asyncio.CancelledError:
+            record.status = JOB_CANCELLED
+        except Exception as exc:
+            logger.info("[任务] %s(%s) 执行失败: %s", record.kind, record.id, exc)
+            record.status = JOB_ERROR
+            record.error = str(exc)
+            on_error = self._kinds[record.kind].on_error
+            if on_error:
+                try:
+                    on_error(record.id, record.error)
+                except Exception as callback_exc:
+                    logger.info("[任务] %s(%s) 错误回调失败: %s", record.kind, record.id, callback_exc)
+        else:
+            record.status = JOB_DONE
+        finally:
+            record.finished_at = time.time()
+            with self._lock:
+                self._running[record.kind] -= 1
+            self._dispatch(record.kind)
+            self.evict_expired()
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if not record or record.status in FINISHED_JOB_STATUSES:
+                return False
+            spec = self._kinds[record.kind]
+            if record.status == JOB_QUEUED:
+                record.status = JOB_CANCELLED
+                record.finished_at = time.time()
+            elif record.task:
+                record.task.cancel()
+        if spec.on_cancel:
+            spec.on_cancel(job_id)
+        return True
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        self.evict_expired()
+        with self._lock:
+            records = [r for r in self._jobs.values() if not kind or r.kind == kind]
+        records.sort(key=lambda r: r.submitted_at, reverse=True)
+        return [record.to_dict() for record in records]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result: Dict[str, Dict[str, Any]] = {}
+            for name, spec in self._kinds.items():
+                records = [r for r in self._jobs.values() if r.kind == name]
+                waits = [r.started_at - r.submitted_at for r in records if r.started_at]
+                runs = [r.finished_at - r.started_at for r in records if r.started_at and r.finished_at]
+                counts: Dict[str, int] = {}
+                for record in records:
+                    counts[record.status] = counts.get(record.status, 0) + 1
+                result[name] = {
+                    "concurrency": spec.concurrency,
+                    "running": self._running.get(name, 0),
+                    "queued": counts.get(JOB_QUEUED, 0),
+                    "counts": counts,
+                    "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else None,
+                    "avg_run_seconds": round(sum(runs) / len(runs), 3) if runs else None,
+                }
+            return result
+
+    def evict_expired(self) -> int:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [
+                record
+                for record in self._jobs.values()
+                if record.status in FINISHED_JOB_STATUSES and (record.finished_at or 0) < cutoff
+            ]
+            for record in expired:
+                self._jobs.pop(record.id, None)
+        for record in expired:
+            spec = self._kinds.get(record.kind)
+            if spec and spec.on_evict:
+                spec.on_evict(record.id)
+        return len(expired)
+
+    async def shutdown(self) -> None:
+        with self._lock:
+            tasks = [r.task for r in self._jobs.values() if r.task and not r.task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_FORMAT_VERSION = 1
+
+
+def make_cache_key(*parts: Any) -> str:
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LlmResultCache:
+    """Content-addressed cache for model outputs, persisted as one JSON file per entry.
+
+    Entries live under ``root/<namespace>/<key>.json``. A small in-memory LRU sits in
+    front and is the only part touched on the event loop; disk reads, writes and
+    eviction run in worker threads.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        ttl: float,
+        max_entries: int,
+        memory_entries: int = 256,
+    ) -> None:
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._index: Dict[str, Dict[str, float]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _bump(self, namespace: str, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            bucket = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "writes": 0, "evictions": 0})
+            bucket[counter] += amount
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / f"{key}.json"
+
+    def _remember(self, namespace: str, key: str, timestamp: float, data: Any) -> None:
+        with self._lock:
+            self._memory[(namespace, key)] = (timestamp, data)
+            self._memory.move_to_end((namespace, key))
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _forget(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._memory.pop((namespace, key), None)
+
+    # ---- disk side: only called from worker threads ----
+
+    def _load_index(self, namespace: str) -> Dict[str, float]:
+        index = self._index.get(namespace)
+        if index is not None:
+            return index
+        index = {}
+        folder = self.root / namespace
+        if folder.exists():
+            for path in folder.glob("*.json"):
+                try:
+                    index[path.stem] = path.stat().st_mtime
+                except OSError:
+                    continue
+        self._index[namespace] = index
+        return index
+
+    def _unlink(self, namespace: str, key: str) -> None:
+        self._load_index(namespace).pop(key, None)
+        try:
+            self._path(namespace, key).unlink()
+        except OSError:
+            pass
+
+    def _read_disk(self, namespace: str, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        with self._disk_lock:
+            path = self._path(namespace, key)
+            if not path.exists():
+                return None
+            try:
+                wrapped = json.loads(path.read_text(encoding="utf-8"))
+            except Exception as exc:
+                logger.info("[LLM缓存] 读取失败: %s", exc)
+                self._unlink(namespace, key)
+                return None
+            timestamp = float(wrapped.get("timestamp") or 0) if isinstance(wrapped, dict) else 0.0
+            if (
+                not isinstance(wrapped, dict)
+                or wrapped.get("_v") != LLM_CACHE_FORMAT_VERSION
+                or now - timestamp >= self.ttl
+            ):
+                self._unlink(namespace, key)
+                return None
+            return timestamp, wrapped.get("payload")
+
+    def _write_disk(self, namespace: str, key: str, payload: str, now: float) -> Optional[list]:
+        with self._disk_lock:
+            path = self._path(namespace, key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_text(payload, encoding="utf-8")
+                tmp_path.replace(path)
+            except Exception as exc:
+                logger.info("[LLM缓存] 写入失败: %s", exc)
+                return None
+            index = self._load_index(namespace)
+            index[key] = now
+            evicted = []
+            overflow = len(index) - self.max_entries
+            if overflow > 0:
+                for old_key, _ in sorted(index.items(), key=lambda item: item[1])[:overflow]:
+                    self._unlink(namespace, old_key)
+                    evicted.append(old_key)
+            return evicted
+
+    def _entry_counts(self, namespaces: list) -> Dict[str, int]:
+        with self._disk_lock:
+            return {namespace: len(self._load_index(namespace)) for namespace in namespaces}
+
+    # ---- public async API ----
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get((namespace, key))
+            if cached is not None and now - cached[0] < self.ttl:
+                self._memory.move_to_end((namespace, key))
+        if cached is not None:
+            if now - cached[0] < self.ttl:
+                self._bump(namespace, "hits")
+                return cached[1]
+            self._forget(namespace, key)
+
+        loaded = await asyncio.to_thread(self._read_disk, namespace, key, now)
+        if loaded is None:
+            self._bump(namespace, "misses")
+            return None
+        timestamp, data = loaded
+        self._remember(namespace, key, timestamp, data)
+        self._bump(namespace, "hits")
+        return data
+
+    async def set(self, namespace: str, key: str, data: Any) -> None:
+        now = time.time()
+        try:
+            payload = json.dumps(
+                {"_v": LLM_CACHE_FORMAT_VERSION, "timestamp": now, "payload": data},
+                ensure_ascii=False,
+            )
+        except (TypeError, ValueError) as exc:
+            logger.info("[LLM缓存] 序列化失败: %s", exc)
+            return
+        evicted = await asyncio.to_thread(self._write_disk, namespace, key, payload, now)
+        if evicted is None:
+            return
+        self._remember(namespace, key, now, data)
+        self._bump(namespace, "writes")
+        for old_key in evicted:
+            self._forget(namespace, old_key)
+        if evicted:
+            self._bump(namespace, "evictions", len(evicted))
+
+    async def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            snapshot = {namespace: dict(bucket) for namespace, bucket in self._stats.items()}
+        namespaces = sorted(set(snapshot) | set(self._index))
+        counts = await asyncio.to_thread(self._entry_counts, namespaces)
+        result: Dict[str, Dict[str, int]] = {}
+        for namespace in namespaces:
+            bucket = snapshot.get(namespace) or {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+            bucket["entries"] = counts.get(namespace, 0)
+            result[namespace] = bucket
+        return result
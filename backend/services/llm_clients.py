@@ -0,0 +1,73 @@
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import httpx
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+class LlmClientRegistry:
+    """Async OpenAI-compatible clients, one per (base_url, api_key).
+
+    Clients that point at the same base URL share a single ``httpx.AsyncClient``
+    so concurrent calls reuse pooled connections instead of reconnecting. When
+    ``outbound_metrics`` is given, their traffic is recorded per target host.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float,
+        max_retries: int,
+        max_connections: int = 20,
+        outbound_metrics: Optional[Any] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self.outbound_metrics = outbound_metrics
+        self._lock = threading.RLock()
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self._clients: Dict[Tuple[str, str], "AsyncOpenAI"] = {}
+
+    def _http_client(self, base_url: str) -> httpx.AsyncClient:
+        http_client = self._http_clients.get(base_url)
+        if http_client is None or http_client.is_closed:
+            transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            if self.outbound_metrics is not None:
+                transport = self.outbound_metrics.httpx_transport(transport)
+            http_client = httpx.AsyncClient(timeout=self.timeout, transport=transport)
+            self._http_clients[base_url] = http_client
+        return http_client
+
+    def client(self, *, api_key: str, base_url: str) -> "AsyncOpenAI":
+        from openai import AsyncOpenAI
+
+        base_url = base_url.rstrip("/")
+        with self._lock:
+            cached = self._clients.get((base_url, api_key))
+            if cached is not None:
+                return cached
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=self.timeout,
+                max_retries=self.max_retries,
+                http_client=self._http_client(base_url),
+            )
+            self._clients[(base_url, api_key)] = client
+            return client
+
+    async def aclose(self) -> None:
+        with self._lock:
+            http_clients = list(self._http_clients.values())
+            self._http_clients.clear()
+            self._clients.clear()
+        for http_client in http_clients:
+            await http_client.aclose()
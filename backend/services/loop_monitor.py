@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+try:
+    from backend.services.metrics import Histogram
+except Exception:
+    from services.metrics import Histogram  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _blame_frame(stack: List[traceback.FrameSummary]) -> traceback.FrameSummary:
+    """Innermost frame from our own code, falling back to the innermost frame overall."""
+    for frame in reversed(stack):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(_BACKEND_ROOT) and "site-packages" not in filename and frame.filename != __file__:
+            return frame
+    return stack[-1]
+
+
+class LoopStallMonitor:
+    """Samples event-loop lag and blames stalls on the code that was running.
+
+    A heartbeat coroutine sleeps ``interval`` seconds and measures how late it wakes
+    up. A watchdog thread notices when the heartbeat is overdue by ``threshold`` and
+    captures the loop thread's stack while the stall is still happening; when the
+    heartbeat resumes, the stall is recorded against that stack.
+    """
+
+    def __init__(self, *, threshold: float, interval: float = 0.05, recent: int = 20) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._lag = Histogram(LAG_BUCKETS)
+        self._max_lag = 0.0
+        self._stalls = 0
+        self._offenders: Dict[str, Dict[str, Any]] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=recent)
+        self._last_tick = 0.0
+        self._pending: Optional[Tuple[float, str, str]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-stall-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            tick = self._last_tick
+            self._last_tick = now
+            self._observe(lag, tick)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            tick = self._last_tick
+            if time.monotonic() - tick < self.interval + self.threshold:
+                continue
+            pending = self._pending
+            if pending and pending[0] == tick:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id or 0)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            if not stack:
+                continue
+            blamed = _blame_frame(stack)
+            location = f"{os.path.relpath(blamed.filename, _BACKEND_ROOT)}:{blamed.lineno} in {blamed.name}"
+            self._pending = (tick, location, "".join(traceback.format_list(stack[-8:])))
+
+    def _observe(self, lag: float, tick: float) -> None:
+        stalled = lag >= self.threshold
+        location, stack = "unknown", ""
+        if stalled:
+            pending = self._pending
+            if pending and pending[0] == tick:
+                _, location, stack = pending
+            self._pending = None
+        with self._lock:
+            self._lag.observe(lag)
+            self._max_lag = max(self._max_lag, lag)
+            if not stalled:
+                return
+            self._stalls += 1
+            offender = self._offenders.setdefault(location, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            offender["count"] += 1
+            offender["total_seconds"] += lag
+            offender["max_seconds"] = max(offender["max_seconds"], lag)
+            self._recent.append({"at": time.time(), "seconds": round(lag, 3), "location": location})
+        logger.warning("[事件循环] 阻塞 %.3fs，位置: %s\n%s", lag, location, stack)
+
+    def snapshot(self, top: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            offenders = sorted(self._offenders.items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+            return {
+                "enabled": self.running,
+                "threshold_seconds": self.threshold,
+                "max_lag_seconds": round(self._max_lag, 4),
+                "lag": self._lag.snapshot(),
+                "stalls": self._stalls,
+                "top_offenders": [
+                    {
+                        "location": location,
+                        "count": stats["count"],
+                        "total_seconds": round(stats["total_seconds"], 3),
+                        "max_seconds": round(stats["max_seconds"], 3),
+                    }
+                    for location, stats in offenders[:top]
+                ],
+                "recent": list(self._recent),
+            }
@@ -0,0 +1,491 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterable, List, MutableMapping, Optional, Sequence, Tuple
+
+import aiohttp
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULT_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# 请求内累计的 Supabase 耗时/次数，写入 scope 供 Server-Timing 使用
+SCOPE_DB_TIMING_KEY = "metrics.db_timing"
+
+# 当前 HTTP 请求的 ASGI scope；路由匹配后 FastAPI 会在其中写入 "route"
+request_scope: ContextVar[Optional[MutableMapping[str, Any]]] = ContextVar("request_scope", default=None)
+
+
+def current_route() -> str:
+    """Route template of the request being served, ``background`` outside requests."""
+    scope = request_scope.get()
+    if scope is None:
+        return "background"
+    return route_of(scope)
+
+
+def route_of(scope: MutableMapping[str, Any]) -> str:
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+def add_db_timing(seconds: float) -> None:
+    scope = request_scope.get()
+    if scope is None:
+        return
+    timing = scope.setdefault(SCOPE_DB_TIMING_KEY, [0, 0.0])
+    timing[0] += 1
+    timing[1] += seconds
+
+
+class RequestContextMiddleware:
+    """Pure ASGI middleware that exposes the request scope to code running under it.
+
+    With ``request_metrics`` it also records per-route counts, latency and response
+    size, and adds a ``Server-Timing`` header (total and Supabase time so far).
+    """
+
+    def __init__(self, app: Any, request_metrics: Optional["HttpRequestMetrics"] = None) -> None:
+        self.app = app
+        self.request_metrics = request_metrics
+
+    async def __call__(self, scope: MutableMapping[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+        token = request_scope.set(scope)
+        metrics = self.request_metrics
+        if metrics is None:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                request_scope.reset(token)
+            return
+
+        method = scope.get("method", "GET")
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: MutableMapping[str, Any]) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                timing = f"app;dur={elapsed_ms:.1f}"
+                db_count, db_seconds = scope.get(SCOPE_DB_TIMING_KEY) or (0, 0.0)
+                if db_count:
+                    timing += f', db;dur={db_seconds * 1000:.1f};desc="supabase x{db_count}"'
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode("latin-1"))]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body") or b"")
+            await send(message)
+
+        metrics.started(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.finished(
+                route=route_of(scope),
+                method=method,
+                status=status,
+                seconds=time.perf_counter() - started,
+                size=size,
+            )
+            request_scope.reset(token)
+
+
+class Histogram:
+    """Fixed-bucket histogram; not thread-safe on its own, callers hold their lock."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative: List[Tuple[str, int]] = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            cumulative.append((repr(bound), running))
+        cumulative.append(("+Inf", self.count))
+        return {"buckets": cumulative, "count": self.count, "sum": round(self.sum, 6)}
+
+
+class HttpRequestMetrics:
+    """Per-route request counts, latency and response-size histograms, in-flight gauge."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = {}
+        self._counts: Dict[Tuple[str, str, int], int] = {}
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._sizes: Dict[Tuple[str, str], Histogram] = {}
+
+    def started(self, method: str) -> None:
+        with self._lock:
+            self._in_flight[method] = self._in_flight.get(method, 0) + 1
+
+    def finished(self, *, route: str, method: str, status: int, seconds: float, size: int) -> None:
+        with self._lock:
+            self._in_flight[method] = max(0, self._in_flight.get(method, 0) - 1)
+            key = (route, method, status)
+            self._counts[key] = self._counts.get(key, 0) + 1
+            latency = self._latency.get((route, method))
+            if latency is None:
+                latency = self._latency[(route, method)] = Histogram()
+                self._sizes[(route, method)] = Histogram(DEFAULT_SIZE_BUCKETS)
+            latency.observe(seconds)
+            self._sizes[(route, method)].observe(size)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": dict(self._in_flight),
+                "requests": [
+                    {"route": route, "method": method, "status": status, "count": count}
+                    for (route, method, status), count in sorted(self._counts.items())
+                ],
+                "latency": {key: hist.snapshot() for key, hist in sorted(self._latency.items())},
+                "sizes": {key: hist.snapshot() for key, hist in sorted(self._sizes.items())},
+            }
+
+
+class SupabaseQueryMetrics:
+    """Per-table PostgREST request stats, per-route fan-out and a slow-query log."""
+
+    def __init__(self, *, slow_threshold: float, slow_log_size: int = 50) -> None:
+        self.slow_threshold = slow_threshold
+        self._lock = threading.Lock()
+        self._tables: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._routes: Dict[Tuple[str, str, str], int] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=slow_log_size)
+
+    def record(
+        self,
+        *,
+        table: str,
+        method: str,
+        status: int,
+        seconds: float,
+        size: int,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        route = current_route()
+        add_db_timing(seconds)
+        with self._lock:
+            bucket = self._tables.get((table, method))
+            if bucket is None:
+                bucket = {"requests": 0, "errors": 0, "bytes": 0, "latency": Histogram()}
+                self._tables[(table, method)] = bucket
+            bucket["requests"] += 1
+            bucket["bytes"] += size
+            if status == 0 or status >= 400:
+                bucket["errors"] += 1
+            bucket["latency"].observe(seconds)
+            key = (route, table, method)
+            self._routes[key] = self._routes.get(key, 0) + 1
+            slow = seconds >= self.slow_threshold
+            if slow:
+                # 只记录过滤字段名，不记录取值（可能含关键词、id 等业务数据）
+                entry = {
+                    "table": table,
+                    "method": method,
+                    "route": route,
+                    "status": status,
+                    "seconds": round(seconds, 3),
+                    "filter_keys": sorted(str(key) for key in (params or {})),
+                }
+                self._slow.append(entry)
+        if slow:
+            logger.warning(
+                "[Supabase] 慢查询 %.3fs %s %s (%s) filters=%s",
+                seconds,
+                method,
+                table,
+                route,
+                ",".join(entry["filter_keys"]),
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            tables = [
+                {
+                    "table": table,
+                    "method": method,
+                    "requests": bucket["requests"],
+                    "errors": bucket["errors"],
+                    "error_rate": round(bucket["errors"] / bucket["requests"], 4) if bucket["requests"] else 0.0,
+                    "bytes": bucket["bytes"],
+                    "latency": bucket["latency"].snapshot(),
+                }
+                for (table, method), bucket in sorted(self._tables.items())
+            ]
+            routes = [
+                {"route": route, "table": table, "method": method, "requests": count}
+                for (route, table, method), count in sorted(self._routes.items())
+            ]
+            slow = list(self._slow)
+        return {
+            "slow_threshold_seconds": self.slow_threshold,
+            "tables": tables,
+            "routes": routes,
+            "slow_queries": slow,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self._routes.clear()
+            self._slow.clear()
+
+
+class _InstrumentedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: "OutboundRequestMetrics") -> None:
+        self._transport = transport
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            self._metrics.record(
+                host=request.url.host, method=request.method, status=0, seconds=time.perf_counter() - started
+            )
+            raise
+        self._metrics.record(
+            host=request.url.host,
+            method=request.method,
+            status=response.status_code,
+            seconds=time.perf_counter() - started,
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class OutboundRequestMetrics:
+    """Outbound HTTP request counts, errors and latency by target host and method.
+
+    Attach it to httpx clients with ``httpx_transport()`` and to aiohttp sessions with
+    ``aiohttp_trace_config()``. Requests that fail without a response count as
+    errors with status 0. Latency runs until the response headers arrive.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._trace_config: Optional[aiohttp.TraceConfig] = None
+
+    def record(self, *, host: Optional[str], method: str, status: int, seconds: float) -> None:
+        key = (host or "unknown", method.upper())
+        with self._lock:
+            bucket = self._hosts.get(key)
+            if bucket is None:
+                bucket = self._hosts[key] = {"requests": 0, "errors": 0, "latency": Histogram()}
+            bucket["requests"] += 1
+            if status == 0 or status >= 400:
+                bucket["errors"] += 1
+            bucket["latency"].observe(seconds)
+
+    def httpx_transport(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncBaseTransport:
+        return _InstrumentedTransport(transport or httpx.AsyncHTTPTransport(), self)
+
+    def aiohttp_trace_config(self) -> aiohttp.TraceConfig:
+        if self._trace_config is not None:
+            return self._trace_config
+
+        async def on_request_start(session: Any, context: Any, params: Any) -> None:
+            context.started = time.perf_counter()
+
+        async def on_request_end(session: Any, context: Any, params: Any) -> None:
+            self.record(
+                host=params.url.host,
+                method=params.method,
+                status=params.response.status,
+                seconds=time.perf_counter() - context.started,
+            )
+
+        async def on_request_exception(session: Any, context: Any, params: Any) -> None:
+            self.record(
+                host=params.url.host,
+                method=params.method,
+                status=0,
+                seconds=time.perf_counter() - context.started,
+            )
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        self._trace_config = trace_config
+        return trace_config
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = [
+                {
+                    "host": host,
+                    "method": method,
+                    "requests": bucket["requests"],
+                    "errors": bucket["errors"],
+                    "error_rate": round(bucket["errors"] / bucket["requests"], 4) if bucket["requests"] else 0.0,
+                    "latency": bucket["latency"].snapshot(),
+                }
+                for (host, method), bucket in sorted(self._hosts.items())
+            ]
+        return {"hosts": hosts}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class PrometheusWriter:
+    """Builds the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> None:
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, labels: Optional[Dict[str, Any]], value: Any) -> None:
+        if labels:
+            rendered = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+            self._lines.append(f"{name}{{{rendered}}} {value}")
+        else:
+            self._lines.append(f"{name} {value}")
+
+    def histogram(self, name: str, labels: Dict[str, Any], snapshot: Dict[str, Any]) -> None:
+        for bound, count in snapshot["buckets"]:
+            self.sample(f"{name}_bucket", {**labels, "le": bound}, count)
+        self.sample(f"{name}_sum", labels, snapshot["sum"])
+        self.sample(f"{name}_count", labels, snapshot["count"])
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+
+def render_prometheus(
+    *,
+    http: Dict[str, Any],
+    supabase: Dict[str, Any],
+    caches: Iterable[Tuple[str, str, Dict[str, int]]] = (),
+    jobs: Optional[Dict[str, Dict[str, Any]]] = None,
+    loop: Optional[Dict[str, Any]] = None,
+    outbound: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Render request, Supabase, outbound HTTP, cache and job-queue metrics.
+
+    ``caches`` yields ``(cache_name, namespace, {"hits", "misses", "entries", ...})``.
+    """
+    out = PrometheusWriter()
+
+    out.family("http_requests_total", "counter", "HTTP requests by route, method and status.")
+    for row in http["requests"]:
+        out.sample(
+            "http_requests_total",
+            {"route": row["route"], "method": row["method"], "status": row["status"]},
+            row["count"],
+        )
+    out.family("http_requests_in_flight", "gauge", "HTTP requests currently being served.")
+    for method, value in sorted(http["in_flight"].items()):
+        out.sample("http_requests_in_flight", {"method": method}, value)
+    out.family("http_request_duration_seconds", "histogram", "HTTP request latency.")
+    for (route, method), snapshot in http["latency"].items():
+        out.histogram("http_request_duration_seconds", {"route": route, "method": method}, snapshot)
+    out.family("http_response_size_bytes", "histogram", "HTTP response body size.")
+    for (route, method), snapshot in http["sizes"].items():
+        out.histogram("http_response_size_bytes", {"route": route, "method": method}, snapshot)
+
+    out.family("supabase_requests_total", "counter", "Outbound Supabase requests by table and method.")
+    for row in supabase["tables"]:
+        out.sample("supabase_requests_total", {"table": row["table"], "method": row["method"]}, row["requests"])
+    out.family("supabase_request_errors_total", "counter", "Failed outbound Supabase requests.")
+    for row in supabase["tables"]:
+        out.sample("supabase_request_errors_total", {"table": row["table"], "method": row["method"]}, row["errors"])
+    out.family("supabase_response_bytes_total", "counter", "Supabase response bytes received.")
+    for row in supabase["tables"]:
+        out.sample("supabase_response_bytes_total", {"table": row["table"], "method": row["method"]}, row["bytes"])
+    out.family("supabase_request_duration_seconds", "histogram", "Outbound Supabase request latency.")
+    for row in supabase["tables"]:
+        out.histogram("supabase_request_duration_seconds", {"table": row["table"], "method": row["method"]}, row["latency"])
+    out.family("supabase_route_requests_total", "counter", "Supabase requests attributed to the originating route.")
+    for row in supabase["routes"]:
+        out.sample(
+            "supabase_route_requests_total",
+            {"route": row["route"], "table": row["table"], "method": row["method"]},
+            row["requests"],
+        )
+
+    if outbound is not None:
+        out.family("outbound_requests_total", "counter", "Outbound HTTP requests by target host and method.")
+        for row in outbound["hosts"]:
+            out.sample("outbound_requests_total", {"host": row["host"], "method": row["method"]}, row["requests"])
+        out.family("outbound_request_errors_total", "counter", "Outbound HTTP requests that failed or returned >= 400.")
+        for row in outbound["hosts"]:
+            out.sample("outbound_request_errors_total", {"host": row["host"], "method": row["method"]}, row["errors"])
+        out.family("outbound_request_duration_seconds", "histogram", "Outbound HTTP request latency.")
+        for row in outbound["hosts"]:
+            out.histogram(
+                "outbound_request_duration_seconds", {"host": row["host"], "method": row["method"]}, row["latency"]
+            )
+
+    cache_rows = list(caches)
+    for field, kind, help_text in (
+        ("hits", "counter", "Cache hits."),
+        ("misses", "counter", "Cache misses."),
+        ("entries", "gauge", "Cached entries."),
+    ):
+        out.family(f"cache_{field}" + ("_total" if kind == "counter" else ""), kind, help_text)
+        for cache_name, namespace, stats in cache_rows:
+            if field in stats:
+                out.sample(
+                    f"cache_{field}" + ("_total" if kind == "counter" else ""),
+                    {"cache": cache_name, "namespace": namespace},
+                    stats[field],
+                )
+
+    if jobs is not None:
+        out.family("jobs_running", "gauge", "Background jobs running per kind.")
+        for kind, stats in sorted(jobs.items()):
+            out.sample("jobs_running", {"kind": kind}, stats.get("running", 0))
+        out.family("jobs_queued", "gauge", "Background jobs waiting per kind.")
+        for kind, stats in sorted(jobs.items()):
+            out.sample("jobs_queued", {"kind": kind}, stats.get("queued", 0))
+        out.family("jobs_tracked", "gauge", "Tracked background jobs per kind and status.")
+        for kind, stats in sorted(jobs.items()):
+            for status, count in sorted((stats.get("counts") or {}).items()):
+                out.sample("jobs_tracked", {"kind": kind, "status": status}, count)
+
+    if loop is not None:
+        out.family("event_loop_lag_seconds", "histogram", "Event-loop wake-up lag.")
+        out.histogram("event_loop_lag_seconds", {}, loop["lag"])
+        out.family("event_loop_stalls_total", "counter", "Event-loop stalls over the threshold.")
+        out.sample("event_loop_stalls_total", None, loop["stalls"])
+        out.family("event_loop_stall_seconds_total", "counter", "Stall time by blamed code location.")
+        for offender in loop["top_offenders"]:
+            out.sample("event_loop_stall_seconds_total", {"location": offender["location"]}, offender["total_seconds"])
+
+    return out.render()
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_result_cache(tmp_path, monkeypatch):
+    """避免测试读写 downloads/llm-cache 中的真实缓存。"""
+    cache = core.LlmResultCache(
+        tmp_path / "llm-cache",
+        ttl=core.LLM_CACHE_TTL_SECONDS,
+        max_entries=core.LLM_CACHE_MAX_ENTRIES,
+    )
+    monkeypatch.setattr(core, "llm_result_cache", cache)
+    yield cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_job_checkpoint_store(tmp_path, monkeypatch):
+    """避免测试读写 downloads/jobs.sqlite3 中的真实任务检查点。"""
+    store = core.JobCheckpointStore(tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(core, "job_checkpoint_store", store)
+    yield store
+    store.close()
@@ -15,7 +15,7 @@ class DummyChat:
         self.called_kwargs = None
         self.completions = self
 
-    def create(self, **kwargs):
+    async def create(self, **kwargs):
         self.called_kwargs = kwargs
         return SimpleNamespace(
             choices=[
@@ -34,10 +34,10 @@ class DummyClient:
 
 
 class AiFillParamsTests(unittest.TestCase):
-    @patch.object(main, "OpenAI")
-    def test_ai_fill_uses_qwen3_max_with_forced_search(self, openai_mock):
+    @patch.object(main, "get_llm_client")
+    def test_ai_fill_uses_qwen3_max_with_forced_search(self, get_client):
         dummy_client = DummyClient()
-        openai_mock.return_value = dummy_client
+        get_client.return_value = dummy_client
 
         spec_fields = [
             {"key": "佩戴方式", "example": "耳夹式/入耳式/半入耳式"},
@@ -51,6 +51,7 @@ class AiFillParamsTests(unittest.TestCase):
         with patch.dict("os.environ", {"DASHSCOPE_API_KEY": "test"}):
             asyncio.run(main.ai_fill_product_params("蓝牙耳机", spec_fields, ["P"]))
 
+        get_client.assert_called_with("dashscope")
         called_kwargs = dummy_client.chat.called_kwargs or {}
         self.assertEqual(called_kwargs.get("model"), "qwen3-max-2026-01-23")
         extra_body = called_kwargs.get("extra_body") or {}
@@ -2,7 +2,7 @@ import sys
 import asyncio
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 import unittest
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
@@ -11,9 +11,9 @@ import main
 
 
 class AiFillParamsGlmTests(unittest.TestCase):
-    @patch("main.httpx.post")
+    @patch.object(main, "get_bigmodel_http_client")
     @patch.object(main, "Generation")
-    def test_ai_fill_uses_bigmodel_web_search_with_glm(self, generation_mock, httpx_post):
+    def test_ai_fill_uses_bigmodel_web_search_with_glm(self, generation_mock, get_client):
         generation_mock.call.side_effect = AssertionError("DashScope should not be used for GLM")
 
         web_search_response = SimpleNamespace(
@@ -42,7 +42,8 @@ class AiFillParamsGlmTests(unittest.TestCase):
                 ]
             },
         )
-        httpx_post.side_effect = [web_search_response, chat_response]
+        httpx_post = AsyncMock(side_effect=[web_search_response, chat_response])
+        get_client.return_value = SimpleNamespace(post=httpx_post)
 
         spec_fields = [
             {"key": "wear", "example": "clip/in-ear/semi-in-ear"},
@@ -69,9 +70,9 @@ class AiFillParamsGlmTests(unittest.TestCase):
         chat_call = httpx_post.call_args_list[1]
         self.assertIn("/chat/completions", chat_call.args[0])
 
-    @patch("main.httpx.post")
+    @patch.object(main, "get_bigmodel_http_client")
     @patch.object(main, "Generation")
-    def test_ai_fill_reports_chat_timeout(self, generation_mock, httpx_post):
+    def test_ai_fill_reports_chat_timeout(self, generation_mock, get_client):
         generation_mock.call.side_effect = AssertionError("DashScope should not be used for GLM")
 
         web_search_response = SimpleNamespace(
@@ -87,10 +88,11 @@ class AiFillParamsGlmTests(unittest.TestCase):
             },
         )
 
-        httpx_post.side_effect = [
+        httpx_post = AsyncMock(side_effect=[
             web_search_response,
             main.httpx.ReadTimeout("timeout"),
-        ]
+        ])
+        get_client.return_value = SimpleNamespace(post=httpx_post)
 
         spec_fields = [
             {"key": "wear", "example": "clip/in-ear/semi-in-ear"},
@@ -110,6 +112,45 @@ class AiFillParamsGlmTests(unittest.TestCase):
 
         self.assertIn("GLM调用失败", str(ctx.exception.detail))
 
+    @patch.object(main, "get_bigmodel_http_client")
+    @patch.object(main, "Generation")
+    def test_ai_fill_searches_products_concurrently_in_order(self, generation_mock, get_client):
+        generation_mock.call.side_effect = AssertionError("DashScope should not be used for GLM")
+        in_flight = {"current": 0, "peak": 0}
+        chat_payloads = []
+
+        async def fake_post(url, headers=None, json=None, timeout=None):
+            if url.endswith("/web_search"):
+                in_flight["current"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+                await asyncio.sleep(0.01)
+                in_flight["current"] -= 1
+                name = json["search_query"].split(" ")[0]
+                return SimpleNamespace(
+                    status_code=200,
+                    json=lambda: {"search_result": [{"title": name, "content": "c", "link": ""}]},
+                )
+            chat_payloads.append(json)
+            return SimpleNamespace(
+                status_code=200,
+                json=lambda: {"choices": [{"message": {"content": '[{"name":"P0","wear":"","weight":""}]'}}]},
+            )
+
+        get_client.return_value = SimpleNamespace(post=fake_post)
+        names = [f"P{i}" for i in range(10)]
+        spec_fields = [{"key": "wear", "example": ""}, {"key": "weight", "example": ""}]
+
+        with patch.dict("os.environ", {"BIGMODEL_API_KEY": "test"}):
+            asyncio.run(
+                main.ai_fill_product_params("bluetooth headset", spec_fields, names, model_override="glm-4.7-FlashX")
+            )
+
+        self.assertGreater(in_flight["peak"], 1)
+        self.assertLessEqual(in_flight["peak"], main.BIGMODEL_SEARCH_CONCURRENCY)
+        prompt = chat_payloads[0]["messages"][1]["content"]
+        positions = [prompt.index(f"商品：{name}\n") for name in names]
+        self.assertEqual(positions, sorted(positions))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,7 +2,7 @@ import sys
 import asyncio
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 import unittest
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
@@ -27,7 +27,7 @@ class AiFillParamsModelOverrideTests(unittest.TestCase):
         deepseek_client = SimpleNamespace(
             chat=SimpleNamespace(
                 completions=SimpleNamespace(
-                    create=lambda **kwargs: deepseek_response
+                    create=AsyncMock(return_value=deepseek_response)
                 )
             )
         )
@@ -42,8 +42,8 @@ class AiFillParamsModelOverrideTests(unittest.TestCase):
         ]
 
         with patch.dict("os.environ", {"DEEPSEEK_API_KEY": "test"}), patch.object(
-            main, "deepseek_client", deepseek_client
-        ):
+            main, "get_llm_client", return_value=deepseek_client
+        ) as get_client:
             asyncio.run(
                 main.ai_fill_product_params(
                     "蓝牙耳机",
@@ -53,6 +53,9 @@ class AiFillParamsModelOverrideTests(unittest.TestCase):
                 )
             )
 
+        get_client.assert_called_with("deepseek")
+        deepseek_client.chat.completions.create.assert_awaited_once()
+
 
 if __name__ == "__main__":
     unittest.main()
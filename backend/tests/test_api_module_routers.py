@@ -12,6 +12,8 @@ MODULES = [
     "backend.api.benchmark",
     "backend.api.blue_link_map",
     "backend.api.direct_plans",
+    "backend.api.jobs",
+    "backend.api.metrics",
 ]
 
 
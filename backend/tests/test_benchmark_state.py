@@ -0,0 +1,91 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+
+
+class FakeSupabase:
+    def __init__(self, entries):
+        self.entries = entries
+        self.selects = []
+
+    async def select(self, table, params=None):
+        self.selects.append((table, dict(params or {})))
+        if table == "sourcing_categories":
+            return [{"id": "cat-1", "name": "耳机", "sort_order": 1}]
+        limit = (params or {}).get("limit")
+        return self.entries[:limit] if limit else list(self.entries)
+
+
+def entry(index):
+    return {"id": f"e{index}", "category_id": "cat-1", "title": f"视频{index}", "created_at": f"2026-02-0{index}T00:00:00Z"}
+
+
+class BenchmarkStateTests(unittest.TestCase):
+    def setUp(self):
+        core.cache.invalidate(core.CACHE_NS_BENCHMARK_CATEGORIES)
+
+    def tearDown(self):
+        core.cache.invalidate(core.CACHE_NS_BENCHMARK_CATEGORIES)
+
+    def entry_selects(self, client):
+        return [params for table, params in client.selects if table == "benchmark_entries"]
+
+    def test_page_applies_filters_and_returns_cursor(self):
+        client = FakeSupabase([entry(3), entry(2), entry(1)])
+        with patch.object(core, "ensure_supabase", return_value=client):
+            payload = asyncio.run(
+                core.fetch_benchmark_snapshot(category_id="cat-1", keyword="耳机,(x)", limit=2)
+            )
+        params = self.entry_selects(client)[0]
+        self.assertEqual(params["category_id"], "eq.cat-1")
+        self.assertEqual(params["or"], "(title.ilike.*耳机x*,author.ilike.*耳机x*)")
+        self.assertEqual(params["limit"], 3)
+        self.assertEqual([item["id"] for item in payload["entries"]], ["e3", "e2"])
+        self.assertTrue(payload["pagination"]["has_more"])
+        self.assertEqual(
+            core.decode_page_cursor(payload["pagination"]["next_cursor"]),
+            ("2026-02-02T00:00:00Z", "e2"),
+        )
+
+    def test_cursor_adds_keyset_filter(self):
+        client = FakeSupabase([entry(1)])
+        cursor = core.encode_page_cursor(entry(2), "created_at")
+        with patch.object(core, "ensure_supabase", return_value=client):
+            payload = asyncio.run(core.fetch_benchmark_snapshot(mode="pick", cursor=cursor))
+        params = self.entry_selects(client)[0]
+        self.assertEqual(params["and"], core.build_keyset_filter("created_at", ("2026-02-02T00:00:00Z", "e2")))
+        self.assertEqual(params["select"], "id,category_id,title,link,author,created_at")
+        self.assertFalse(payload["pagination"]["has_more"])
+        self.assertIsNone(payload["pagination"]["next_cursor"])
+
+    def test_pick_page_returns_cursor_without_created_at(self):
+        client = FakeSupabase([entry(3), entry(2), entry(1)])
+        with patch.object(core, "ensure_supabase", return_value=client):
+            payload = asyncio.run(core.fetch_benchmark_snapshot(mode="pick", limit=2))
+        self.assertTrue(payload["pagination"]["has_more"])
+        self.assertEqual(
+            core.decode_page_cursor(payload["pagination"]["next_cursor"]),
+            ("2026-02-02T00:00:00Z", "e2"),
+        )
+        self.assertNotIn("created_at", payload["entries"][0])
+
+    def test_unpaged_request_returns_everything_and_caches_categories(self):
+        client = FakeSupabase([entry(2), entry(1)])
+        with patch.object(core, "ensure_supabase", return_value=client):
+            first = asyncio.run(core.fetch_benchmark_snapshot())
+            asyncio.run(core.fetch_benchmark_snapshot())
+        self.assertNotIn("pagination", first)
+        self.assertEqual(len(first["entries"]), 2)
+        self.assertEqual(first["categories"][0]["name"], "耳机")
+        category_reads = [table for table, _ in client.selects if table == "sourcing_categories"]
+        self.assertEqual(len(category_reads), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
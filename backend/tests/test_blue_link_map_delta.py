@@ -0,0 +1,128 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+from fastapi import HTTPException
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from backend.api import blue_link_map
+
+
+class FakeSupabase:
+    def __init__(self, entries):
+        self.entries = entries
+        self.calls = []
+        self.updates = []
+        self.deletes = []
+
+    async def select(self, table, params=None):
+        self.calls.append((table, dict(params or {})))
+        if table == "comment_accounts":
+            return [{"id": "acc-1", "name": "账号"}]
+        if table == "blue_link_map_categories":
+            return [{"id": "cat-1", "account_id": "acc-1", "name": "分类"}]
+        if table == "blue_link_map_entries" and "id" in (params or {}):
+            return [row for row in self.entries if f"eq.{row['id']}" == params["id"]]
+        return list(self.entries)
+
+    async def update(self, table, payload, filters):
+        self.updates.append((table, payload, filters))
+        if "id" in filters:
+            return [{"id": filters["id"][3:], **payload}]
+        return [
+            {"id": row["id"], **payload}
+            for row in self.entries
+            if f"eq.{row['category_id']}" == filters.get("category_id")
+        ]
+
+    async def delete(self, table, filters):
+        self.deletes.append((table, filters))
+
+
+def entry(entry_id, **extra):
+    return {"id": entry_id, "account_id": "acc-1", "category_id": "cat-1", "source_link": "https://u.jd.com/x", **extra}
+
+
+class BlueLinkMapDeltaTests(unittest.TestCase):
+    def setUp(self):
+        core.cache.invalidate(core.CACHE_NS_BLUE_LINK_MAP)
+
+    def tearDown(self):
+        core.cache.invalidate(core.CACHE_NS_BLUE_LINK_MAP)
+
+    def test_full_snapshot_excludes_tombstones_and_carries_version(self):
+        client = FakeSupabase([entry("e1")])
+        with patch.object(core, "ensure_supabase", return_value=client):
+            payload = asyncio.run(core.fetch_blue_link_map_snapshot())
+        self.assertEqual(payload["mode"], "full")
+        self.assertTrue(payload["version"].endswith("Z"))
+        params = dict(client.calls)["blue_link_map_entries"]
+        self.assertEqual(params["deleted_at"], "is.null")
+
+    def test_delta_returns_changed_entries_and_deleted_ids(self):
+        client = FakeSupabase([entry("e1"), entry("e2", deleted_at="2026-10-01T00:00:00Z")])
+        since = core.format_sync_version(core.datetime.now(core.timezone.utc))
+        with patch.object(core, "ensure_supabase", return_value=client):
+            payload = asyncio.run(core.fetch_blue_link_map_snapshot(since=since))
+        self.assertEqual(payload["mode"], "delta")
+        self.assertEqual([item["id"] for item in payload["entries"]], ["e1"])
+        self.assertEqual(payload["deleted_entry_ids"], ["e2"])
+        params = dict(client.calls)["blue_link_map_entries"]
+        self.assertEqual(params["updated_at"], f"gte.{since}")
+        self.assertIsNone(core.cache.get(core.CACHE_NS_BLUE_LINK_MAP))
+
+    def test_stale_since_falls_back_to_full_and_invalid_since_is_rejected(self):
+        client = FakeSupabase([entry("e1")])
+        with patch.object(core, "ensure_supabase", return_value=client):
+            payload = asyncio.run(core.fetch_blue_link_map_snapshot(since="2000-01-01T00:00:00Z"))
+            self.assertEqual(payload["mode"], "full")
+            with self.assertRaises(HTTPException) as ctx:
+                asyncio.run(core.fetch_blue_link_map_snapshot(since="yesterday"))
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_writes_patch_cached_snapshot(self):
+        client = FakeSupabase([entry("e1"), entry("e2")])
+        with patch.object(core, "ensure_supabase", return_value=client):
+            before = asyncio.run(core.fetch_blue_link_map_snapshot())
+            asyncio.run(blue_link_map.delete_blue_link_map_entry("e1"))
+            after_delete = asyncio.run(core.fetch_blue_link_map_snapshot())
+        self.assertEqual(client.updates[0][2], {"id": "eq.e1", "deleted_at": "is.null"})
+        self.assertIsNotNone(client.updates[0][1]["deleted_at"])
+        self.assertIsNot(after_delete, before)
+        self.assertEqual([item["id"] for item in after_delete["entries"]], ["e2"])
+        self.assertEqual(after_delete["version"], before["version"])
+
+        core.patch_blue_link_map_cache(
+            entries=[entry("e3")],
+            categories=[{"id": "cat-2", "name": "新分类"}],
+        )
+        patched = core.cache.get(core.CACHE_NS_BLUE_LINK_MAP)
+        self.assertEqual([item["id"] for item in patched["entries"]], ["e3", "e2"])
+        self.assertEqual([item["id"] for item in patched["categories"]], ["cat-1", "cat-2"])
+
+        core.patch_blue_link_map_cache(removed_category_ids=["cat-1"])
+        patched = core.cache.get(core.CACHE_NS_BLUE_LINK_MAP)
+        self.assertEqual(patched["entries"], [])
+        self.assertEqual([item["id"] for item in patched["categories"]], ["cat-2"])
+
+    def test_category_delete_tombstones_its_entries(self):
+        client = FakeSupabase([entry("e1"), entry("e2", category_id="cat-2")])
+        with patch.object(core, "ensure_supabase", return_value=client):
+            asyncio.run(core.fetch_blue_link_map_snapshot())
+            asyncio.run(blue_link_map.delete_blue_link_map_category("cat-1"))
+        table, payload, filters = client.updates[0]
+        self.assertEqual(table, "blue_link_map_entries")
+        self.assertEqual(filters, {"category_id": "eq.cat-1", "deleted_at": "is.null"})
+        self.assertIsNotNone(payload["deleted_at"])
+        self.assertIn(("blue_link_map_categories", {"id": "eq.cat-1"}), client.deletes)
+        self.assertNotIn("category_id", {key for table, filters in client.deletes for key in filters})
+        patched = core.cache.get(core.CACHE_NS_BLUE_LINK_MAP)
+        self.assertEqual([item["id"] for item in patched["entries"]], ["e2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
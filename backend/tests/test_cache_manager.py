@@ -29,3 +29,23 @@ def test_cache_max_entries_evicts_oldest():
     assert manager.get("ns", key="a") is None
     assert manager.get("ns", key="b") == 2
     assert manager.get("ns", key="c") == 3
+
+
+def test_cache_stats_count_hits_and_misses():
+    manager = CacheManager()
+    manager.set("ns", data=1)
+    manager.get("ns")
+    manager.get("ns", key="missing")
+
+    assert manager.stats() == {"ns": {"hits": 1, "misses": 1, "entries": 1}}
+
+
+def test_cache_replace_keeps_entry_age():
+    manager = CacheManager()
+    assert manager.replace("ns", data=1) is False
+    manager.set("ns", data=1)
+    time.sleep(0.02)
+    assert manager.replace("ns", data=2) is True
+
+    assert manager.get("ns", ttl=0.5) == 2
+    assert manager.get("ns", ttl=0.01) is None
@@ -0,0 +1,46 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# 冷启动预算（秒）；较慢的机器可通过环境变量放宽
+COLD_IMPORT_BUDGET_SECONDS = float(os.getenv("BACKEND_COLD_IMPORT_BUDGET", "2.5"))
+
+HEAVY_MODULES = ("apscheduler", "dashscope", "openai", "PIL", "playwright", "pypinyin", "yt_dlp")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import backend.core
+elapsed = time.perf_counter() - started
+heavy = sorted(name for name in {heavy} if name in sys.modules)
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+def run_probe():
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(heavy=repr(HEAVY_MODULES))],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_cold_import_skips_heavy_dependencies_and_stays_within_budget():
+    report = run_probe()
+    assert report["heavy"] == []
+    assert report["elapsed"] < COLD_IMPORT_BUDGET_SECONDS, report
+
+
+def test_lazy_attributes_still_resolve():
+    import core
+
+    assert core.lazy_import("lazy_pinyin") is core.lazy_pinyin
+    assert core.derive_uid_prefix("小米") == "XM"
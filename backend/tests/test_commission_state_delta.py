@@ -0,0 +1,87 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+from fastapi import HTTPException
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.api import commission
+
+
+class FakeSupabase:
+    def __init__(self, items, version=5, stale_write=False):
+        self.row = {"id": "default", "items": items, "version": version}
+        self.stale_write = stale_write
+        self.updates = []
+
+    async def select(self, table, params=None):
+        return [dict(self.row)]
+
+    async def update(self, table, payload, filters):
+        self.updates.append((payload, filters))
+        if self.stale_write:
+            return []
+        self.row = {**self.row, **payload, "version": self.row["version"] + 1}
+        return [dict(self.row)]
+
+
+def delta(**kwargs):
+    return commission.CommissionStateDelta(**kwargs)
+
+
+class ApplyCommissionStateDeltaTests(unittest.TestCase):
+    def test_upsert_remove_and_order(self):
+        items = [{"id": "a", "title": "A"}, {"id": "b", "title": "B"}, {"id": "c", "title": "C"}]
+        result = commission.apply_commission_state_delta(
+            items,
+            delta(
+                version=1,
+                upsert=[{"id": "b", "title": "B2"}, {"id": "d", "title": "D"}],
+                remove=["c"],
+                order=["d", "missing", "b"],
+            ),
+        )
+        self.assertEqual([item["id"] for item in result], ["d", "b", "a"])
+        self.assertEqual(result[1]["title"], "B2")
+
+    def test_upsert_without_id_is_rejected(self):
+        with self.assertRaises(HTTPException) as ctx:
+            commission.apply_commission_state_delta([], delta(version=1, upsert=[{"title": "x"}]))
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+class PatchCommissionStateTests(unittest.TestCase):
+    def run_patch(self, client, payload):
+        with patch.object(commission, "ensure_supabase", return_value=client):
+            return asyncio.run(commission.patch_commission_state(payload))
+
+    def test_patch_applies_delta_with_version_precondition(self):
+        client = FakeSupabase([{"id": "a"}, {"id": "b"}])
+        result = self.run_patch(client, delta(version=5, remove=["a"]))
+        payload, filters = client.updates[0]
+        self.assertEqual(filters, {"id": "eq.default", "version": "eq.5"})
+        self.assertEqual(payload["items"], [{"id": "b"}])
+        self.assertEqual(result, {"version": 6, "item_count": 1})
+
+    def test_stale_version_conflicts(self):
+        with self.assertRaises(HTTPException) as ctx:
+            self.run_patch(FakeSupabase([]), delta(version=4))
+        self.assertEqual(ctx.exception.status_code, 409)
+        with self.assertRaises(HTTPException) as ctx:
+            self.run_patch(FakeSupabase([], stale_write=True), delta(version=5))
+        self.assertEqual(ctx.exception.status_code, 409)
+
+    def test_patch_enforces_item_limit(self):
+        client = FakeSupabase([])
+        upsert = [{"id": str(index)} for index in range(commission.MAX_COMMISSION_STATE_ITEMS + 1)]
+        with self.assertRaises(HTTPException) as ctx:
+            self.run_patch(client, delta(version=5, upsert=upsert))
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertEqual(client.updates, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
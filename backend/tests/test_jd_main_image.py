@@ -0,0 +1,75 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from backend.api import commission
+
+DESKTOP_HTML = 'imageList: ["//img14.360buyimg.com/n5/jfs/t1/desktop.jpg"]'
+MOBILE_HTML = 'imageList: ["//img14.360buyimg.com/n0/jfs/t1/mobile.jpg"]'
+
+
+def fake_pages(delays, pages, calls):
+    async def fetch(url):
+        calls.append(url)
+        kind = "mobile" if "item.m.jd.com" in url else "desktop"
+        await asyncio.sleep(delays.get(kind, 0))
+        page = pages[kind]
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+    return fetch
+
+
+class JdMainImageTests(unittest.TestCase):
+    def setUp(self):
+        core.cache.invalidate(core.CACHE_NS_JD_MAIN_IMAGE)
+
+    def tearDown(self):
+        core.cache.invalidate(core.CACHE_NS_JD_MAIN_IMAGE)
+
+    def run_fetch(self, link, delays, pages, calls):
+        with patch.object(core, "fetch_jd_page", fake_pages(delays, pages, calls)):
+            return asyncio.run(core.fetch_jd_main_image(link))
+
+    def test_pages_are_raced_and_original_image_wins(self):
+        calls = []
+        pages = {"desktop": DESKTOP_HTML, "mobile": MOBILE_HTML}
+        result = self.run_fetch("https://item.jd.com/100012345.html", {"desktop": 0.3}, pages, calls)
+        self.assertEqual(result["image"], "https://img14.360buyimg.com/n0/jfs/t1/mobile.jpg")
+        self.assertEqual(len(calls), 2)
+
+        cached = self.run_fetch("https://item.jd.com/100012345.html", {}, pages, calls)
+        self.assertIs(cached, result)
+        self.assertEqual(len(calls), 2)
+
+    def test_desktop_images_used_when_mobile_fails(self):
+        pages = {"desktop": DESKTOP_HTML, "mobile": RuntimeError("blocked")}
+        result = self.run_fetch("https://item.jd.com/100012345.html", {}, pages, [])
+        self.assertEqual(result["image"], "https://img14.360buyimg.com/n0/jfs/t1/desktop.jpg")
+
+    def test_batch_reports_per_link_results(self):
+        async def fake_main_image(link):
+            if "bad" in link:
+                raise core.HTTPException(status_code=404, detail="未能在页面中找到主图")
+            return {"status": "success", "image": "img"}
+
+        request = core.JdImageBatchRequest(urls=["https://item.jd.com/1.html", " ", "bad", "https://item.jd.com/1.html"])
+        with patch.object(core, "fetch_jd_main_image", fake_main_image):
+            payload = asyncio.run(commission.jd_main_image_batch(request))
+        self.assertEqual(
+            payload["results"],
+            [
+                {"url": "https://item.jd.com/1.html", "status": "success", "image": "img"},
+                {"url": "bad", "status": "error", "detail": "未能在页面中找到主图"},
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+
+
+class JobCheckpointStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = core.JobCheckpointStore(Path(self.tmp.name) / "jobs.sqlite3")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_state_params_and_items_round_trip(self):
+        self.store.save_job("kind", "j1", {"status": "running", "processed": 1}, {"item_ids": ["a", "b"]})
+        self.store.mark_items_done("j1", ["a", "a", None])
+
+        loaded = self.store.load_job("j1")
+        self.assertEqual(loaded["state"]["processed"], 1)
+        self.assertEqual(loaded["params"], {"item_ids": ["a", "b"]})
+        self.assertEqual(self.store.done_items("j1"), {"a"})
+        self.assertEqual([job["id"] for job in self.store.unfinished_jobs()], ["j1"])
+
+        self.store.update_state("j1", {"status": "done"})
+        self.assertEqual(self.store.unfinished_jobs(), [])
+
+    def test_purge_removes_only_expired_finished_jobs(self):
+        self.store.save_job("kind", "old", {"status": "done"})
+        self.store.save_job("kind", "running", {"status": "running"})
+        self.store.mark_items_done("old", ["x"])
+
+        with patch("time.time", return_value=time.time() + 100):
+            self.assertEqual(self.store.purge_finished(50), 1)
+
+        self.assertIsNone(self.store.load_job("old"))
+        self.assertEqual(self.store.done_items("old"), set())
+        self.assertIsNotNone(self.store.load_job("running"))
+
+    def _stored_state(self, store, job_id, predicate, timeout=2.0):
+        """Poll the database directly (without flushing) until ``predicate`` holds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with store._lock:
+                row = store._connect().execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            state = json.loads(row[0]) if row else None
+            if (state is not None and predicate(state)) or time.monotonic() > deadline:
+                return state
+            time.sleep(0.01)
+
+    def test_state_updates_are_throttled_but_finished_state_is_immediate(self):
+        store = core.JobCheckpointStore(Path(self.tmp.name) / "throttled.sqlite3", state_interval=60)
+        try:
+            store.save_job("kind", "j1", {"status": "queued"})
+            store.update_state("j1", {"status": "running", "processed": 1})
+            self.assertEqual(self._stored_state(store, "j1", lambda s: s.get("processed") == 1)["processed"], 1)
+
+            store.update_state("j1", {"status": "running", "processed": 2})
+            store.update_state("j1", {"status": "running", "processed": 3})
+            time.sleep(0.1)
+            self.assertEqual(self._stored_state(store, "j1", lambda s: True, timeout=0)["processed"], 1)
+
+            store.update_state("j1", {"status": "done", "processed": 4})
+            stored = self._stored_state(store, "j1", lambda s: s.get("status") == "done")
+            self.assertEqual((stored["status"], stored["processed"]), ("done", 4))
+        finally:
+            store.close()
+
+    def test_close_writes_pending_state(self):
+        store = core.JobCheckpointStore(Path(self.tmp.name) / "close.sqlite3", state_interval=60)
+        store.save_job("kind", "j1", {"status": "queued"})
+        store.update_state("j1", {"status": "running", "processed": 1})
+        store.update_state("j1", {"status": "running", "processed": 2})
+        store.close()
+        self.assertEqual(store.load_job("j1")["state"]["processed"], 2)
+        store.close()
+
+
+class FakeSupabase:
+    async def rpc(self, function_name, params=None, query=None):
+        return [{"id": row["id"]} for row in params["p_updates"]]
+
+    async def update(self, table, payload, filters):
+        ids = [value.strip('"') for value in filters["id"][len("in.("):-1].split(",")]
+        return [{"id": item_id} for item_id in ids]
+
+
+class JobResumeTests(unittest.TestCase):
+    def test_job_state_survives_memory_loss(self):
+        state = core.create_zhihu_job_state(total=3, keyword_id="k1")
+        core.update_zhihu_job_state(state["id"], status="running", processed=2)
+        with core.zhihu_job_lock:
+            core.zhihu_job_store.pop(state["id"])
+
+        restored = core.get_zhihu_job_state(state["id"])
+        self.assertEqual(restored["processed"], 2)
+        self.assertEqual(restored["status"], "running")
+
+    def test_ai_batch_resume_skips_checkpointed_items(self):
+        items = [{"id": f"id{i}", "title": f"商品{i}", "spec": {}, "remark": ""} for i in range(4)]
+        state = core.create_sourcing_ai_job_state(total=4, params={"item_ids": [item["id"] for item in items]})
+        job_id = state["id"]
+        core.update_sourcing_ai_job_state(job_id, status="running", processed=2, success=2)
+        core.job_checkpoint_store.mark_items_done(job_id, ["id0", "id1"])
+        calls = []
+
+        async def fake_fill(category, fields, names, model_override=None, force=False):
+            calls.extend(names)
+            return [{"name": name, "重量": "5g"} for name in names]
+
+        with patch.object(core, "ensure_supabase", return_value=FakeSupabase()), patch.object(
+            core, "ai_fill_product_params", fake_fill
+        ), patch.dict(core.AI_PROVIDER_MIN_INTERVAL, {"dashscope": 0}):
+            asyncio.run(core.run_sourcing_ai_batch_job(job_id, items, "耳机", [{"key": "重量"}], None))
+
+        final = core.get_sourcing_ai_job_state(job_id)
+        self.assertEqual(sorted(calls), ["商品2", "商品3"])
+        self.assertEqual((final["status"], final["processed"], final["success"]), ("done", 4, 4))
+        self.assertEqual(core.job_checkpoint_store.done_items(job_id), {f"id{i}" for i in range(4)})
+        core.sourcing_ai_job_store.pop(job_id, None)
+
+    def test_zhihu_resume_skips_checkpointed_questions(self):
+        state = core.create_zhihu_job_state(total=0, keyword_id=None)
+        job_id = state["id"]
+        core.job_checkpoint_store.mark_items_done(job_id, ["1"])
+        core.update_zhihu_job_state(job_id, status="running", processed=1, success=1)
+        detail_calls = []
+
+        class FakeClient:
+            async def select(self, table, params=None):
+                if table == "zhihu_keywords":
+                    return [{"id": "k1", "name": "kw1"}]
+                return []
+
+            async def request(self, *args, **kwargs):
+                return []
+
+            async def delete(self, table, filters):
+                return []
+
+        async def search_fetcher(keyword):
+            return [
+                {"object": {"type": "question", "question": {"id": qid, "title": str(qid)}}}
+                for qid in (1, 2)
+            ]
+
+        async def detail_fetcher(qid):
+            detail_calls.append(qid)
+            return {"visit_count": 1, "answer_count": 1}
+
+        asyncio.run(core.zhihu_scrape_job(
+            client=FakeClient(),
+            search_fetcher=search_fetcher,
+            detail_fetcher=detail_fetcher,
+            today=date(2026, 2, 5),
+            job_id=job_id,
+        ))
+
+        final = core.get_zhihu_job_state(job_id)
+        self.assertEqual(detail_calls, ["2"])
+        self.assertEqual((final["status"], final["processed"], final["success"]), ("done", 2, 2))
+        core.zhihu_job_store.pop(job_id, None)
+
+    def test_failed_resume_is_marked_error_and_not_resumed_again(self):
+        core.job_checkpoint_store.save_job(
+            core.JOB_KIND_SOURCING_AI_BATCH,
+            "s1",
+            {"id": "s1", "status": "running"},
+            {"item_ids": ["a"]},
+        )
+
+        async def run():
+            core.resume_checkpointed_jobs()
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+        def missing_supabase():
+            raise core.HTTPException(status_code=500, detail="Supabase 未配置")
+
+        with patch.object(core, "supabase_client", object()), patch.object(core, "ensure_supabase", missing_supabase):
+            asyncio.run(run())
+
+        self.assertEqual(core.get_sourcing_ai_job_state("s1")["status"], "error")
+        self.assertEqual(core.job_checkpoint_store.load_job("s1")["state"]["status"], "error")
+        self.assertEqual(core.job_checkpoint_store.unfinished_jobs(), [])
+        core.sourcing_ai_job_store.pop("s1", None)
+
+    def test_dry_run_scrape_is_not_checkpointed(self):
+        from backend.api import zhihu
+
+        result = asyncio.run(zhihu.run_zhihu_scrape(None, dry_run=True))
+
+        self.assertEqual(result["status"], "queued")
+        self.assertIsNone(core.job_checkpoint_store.load_job(result["job_id"]))
+        self.assertEqual(core.job_checkpoint_store.unfinished_jobs(), [])
+        core.zhihu_job_store.pop(result["job_id"], None)
+
+    def test_startup_resumes_unfinished_jobs(self):
+        core.job_checkpoint_store.save_job(
+            core.JOB_KIND_ZHIHU_SCRAPE, "z1", {"id": "z1", "status": "running"}, {"keyword_id": "k1"}
+        )
+        core.job_checkpoint_store.save_job(core.JOB_KIND_ZHIHU_SCRAPE, "z2", {"id": "z2", "status": "done"})
+        started = []
+
+        async def fake_scrape(**kwargs):
+            started.append(kwargs)
+
+        async def run():
+            resumed = core.resume_checkpointed_jobs()
+            await asyncio.sleep(0)
+            return resumed
+
+        with patch.object(core, "supabase_client", object()), patch.object(core, "zhihu_scrape_job", fake_scrape):
+            resumed = asyncio.run(run())
+
+        self.assertEqual(resumed, ["z1"])
+        self.assertEqual(started, [{"keyword_id": "k1", "include_existing": True, "job_id": "z1"}])
+        self.assertEqual(core.get_zhihu_job_state("z1")["status"], "running")
+        core.zhihu_job_store.pop("z1", None)
+
+
+if __name__ == "__main__":
+    unittest.main()
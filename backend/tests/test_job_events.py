@@ -0,0 +1,106 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from backend.api import sourcing
+
+
+def parse_events(chunks):
+    events = []
+    for chunk in chunks:
+        if not chunk.startswith("id:"):
+            continue
+        fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class JobEventBrokerTests(unittest.IsolatedAsyncioTestCase):
+    async def _collect(self, broker, job_id, last_event_id=None, heartbeat=5.0, state=None):
+        return [
+            chunk
+            async for chunk in broker.stream(
+                job_id,
+                last_event_id=last_event_id,
+                get_state=lambda: state,
+                heartbeat=heartbeat,
+            )
+        ]
+
+    async def test_updates_carry_only_changed_fields_and_stream_ends_when_finished(self):
+        broker = core.JobEventBroker()
+        broker.publish("j", {"status": "running", "processed": 0, "failures": []})
+
+        async def produce():
+            await asyncio.sleep(0)
+            broker.publish("j", {"status": "running", "processed": 0, "failures": []})
+            broker.publish("j", {"status": "running", "processed": 1, "failures": []})
+            broker.publish("j", {"status": "done", "processed": 2, "failures": []})
+
+        producer = asyncio.create_task(produce())
+        events = parse_events(await self._collect(broker, "j"))
+        await producer
+
+        self.assertEqual(events[0], (1, "snapshot", {"status": "running", "processed": 0, "failures": []}))
+        self.assertEqual(events[1:], [(2, "update", {"processed": 1}), (3, "update", {"status": "done", "processed": 2})])
+        self.assertEqual(broker.subscriber_count("j"), 0)
+
+    async def test_reconnect_replays_missed_events_or_falls_back_to_snapshot(self):
+        broker = core.JobEventBroker(history=2)
+        for processed in range(4):
+            broker.publish("j", {"status": "running", "processed": processed})
+        broker.publish("j", {"status": "done", "processed": 4})
+
+        replayed = parse_events(await self._collect(broker, "j", last_event_id=3))
+        self.assertEqual([event_id for event_id, _, _ in replayed], [4, 5])
+
+        stale = parse_events(await self._collect(broker, "j", last_event_id=1))
+        self.assertEqual(stale, [(5, "snapshot", {"status": "done", "processed": 4})])
+
+        self.assertEqual(await self._collect(broker, "j", last_event_id=5), ["retry: 3000\n\n"])
+
+    async def test_idle_stream_sends_heartbeats(self):
+        broker = core.JobEventBroker()
+        broker.publish("j", {"status": "running"})
+        stream = broker.stream("j", last_event_id=1, get_state=lambda: {"status": "running"}, heartbeat=0.01)
+        chunks = [await stream.__anext__() for _ in range(2)]
+        await stream.aclose()
+        self.assertEqual(chunks[1], ": heartbeat\n\n")
+        self.assertEqual(broker.subscriber_count("j"), 0)
+
+
+class JobEventRouteTests(unittest.IsolatedAsyncioTestCase):
+    async def test_ai_batch_events_route_streams_state_changes(self):
+        state = core.create_sourcing_ai_job_state(total=2)
+        job_id = state["id"]
+        response = await sourcing.ai_batch_events(job_id, last_event_id=None)
+        self.assertEqual(response.media_type, "text/event-stream")
+
+        async def produce():
+            await asyncio.sleep(0)
+            core.update_sourcing_ai_job_state(job_id, status="running", processed=1)
+            core.update_sourcing_ai_job_state(job_id, status="done", processed=2)
+
+        producer = asyncio.create_task(produce())
+        events = parse_events([chunk async for chunk in response.body_iterator])
+        await producer
+
+        self.assertEqual(events[0][1], "snapshot")
+        self.assertEqual(events[-1][2]["status"], "done")
+        self.assertEqual(events[-1][2]["processed"], 2)
+        core.sourcing_ai_job_store.pop(job_id, None)
+
+    async def test_unknown_job_is_404(self):
+        with self.assertRaises(core.HTTPException) as ctx:
+            await sourcing.ai_batch_events("missing", last_event_id=None)
+        self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
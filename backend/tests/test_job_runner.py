@@ -0,0 +1,136 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from backend.api import jobs
+
+
+class JobRunnerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_priority_order_and_concurrency_cap(self):
+        runner = core.JobRunner(ttl=60)
+        runner.register_kind("k", concurrency=1)
+        order = []
+        gate = asyncio.Event()
+
+        def job(name, wait=False):
+            async def run():
+                order.append(name)
+                if wait:
+                    await gate.wait()
+            return run
+
+        runner.submit("k", "first", job("first", wait=True))
+        runner.submit("k", "low", job("low"), priority=5)
+        runner.submit("k", "high", job("high"), priority=1)
+        await asyncio.sleep(0)
+        self.assertEqual(runner.stats()["k"]["running"], 1)
+        self.assertEqual(runner.get("low").status, "queued")
+
+        gate.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        self.assertEqual(order, ["first", "high", "low"])
+        self.assertTrue(all(item["status"] == "done" for item in runner.list("k")))
+
+    async def test_cancel_queued_and_running_jobs(self):
+        cancelled = []
+        runner = core.JobRunner(ttl=60)
+        runner.register_kind("k", concurrency=1, on_cancel=cancelled.append)
+
+        async def forever():
+            await asyncio.Event().wait()
+
+        runner.submit("k", "a", forever)
+        runner.submit("k", "b", forever)
+        await asyncio.sleep(0)
+
+        self.assertTrue(runner.cancel("b"))
+        self.assertTrue(runner.cancel("a"))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        self.assertEqual(runner.get("a").status, "cancelled")
+        self.assertEqual(runner.get("b").status, "cancelled")
+        self.assertEqual(cancelled, ["b", "a"])
+        self.assertFalse(runner.cancel("a"))
+
+    async def test_finished_jobs_are_evicted_after_ttl(self):
+        evicted = []
+        runner = core.JobRunner(ttl=10)
+        runner.register_kind("k", on_evict=evicted.append)
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        runner.submit("k", "a", fail)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertEqual(runner.get("a").error, "boom")
+
+        with patch("time.time", return_value=time.time() + 20):
+            self.assertEqual(runner.list(), [])
+        self.assertEqual(evicted, ["a"])
+
+    async def test_finishing_job_evicts_expired_ones(self):
+        evicted = []
+        runner = core.JobRunner(ttl=10)
+        runner.register_kind("k", concurrency=2, on_evict=evicted.append)
+        release = asyncio.Event()
+
+        async def quick():
+            return None
+
+        async def slow():
+            await release.wait()
+
+        runner.submit("k", "a", quick)
+        runner.submit("k", "b", slow)
+        await asyncio.sleep(0)
+        runner.get("a").finished_at = time.time() - 20
+
+        release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertEqual(runner.get("b").status, "done")
+        self.assertIsNone(runner.get("a"))
+        self.assertEqual(evicted, ["a"])
+
+
+class JobRoutesTests(unittest.IsolatedAsyncioTestCase):
+    async def test_cancel_route_marks_sourcing_job_cancelled(self):
+        state = core.create_sourcing_ai_job_state(total=1)
+        job_id = state["id"]
+
+        async def forever():
+            await asyncio.Event().wait()
+
+        core.job_runner.submit(core.JOB_KIND_SOURCING_AI_BATCH, job_id, forever)
+        await asyncio.sleep(0)
+
+        listing = await jobs.list_jobs(kind=core.JOB_KIND_SOURCING_AI_BATCH)
+        self.assertIn(job_id, [item["id"] for item in listing["jobs"]])
+        self.assertIn(core.JOB_KIND_ZHIHU_SCRAPE, listing["stats"])
+
+        result = await jobs.cancel_job(job_id)
+        await asyncio.sleep(0)
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(core.get_sourcing_ai_job_state(job_id)["status"], "cancelled")
+        self.assertEqual(core.job_checkpoint_store.unfinished_jobs(), [])
+
+        with self.assertRaises(core.HTTPException) as ctx:
+            await jobs.cancel_job(job_id)
+        self.assertEqual(ctx.exception.status_code, 409)
+        with self.assertRaises(core.HTTPException) as ctx:
+            await jobs.cancel_job("missing")
+        self.assertEqual(ctx.exception.status_code, 404)
+        core.sourcing_ai_job_store.pop(job_id, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.select_calls = []
+
+    async def select(self, table, params=None):
+        self.select_calls.append(dict(params or {}))
+        return self.rows[: int(params.get("limit") or len(self.rows))]
+
+
+class KeysetPaginationTests(unittest.TestCase):
+    def setUp(self):
+        core.cache.invalidate(core.CACHE_NS_SOURCING_ITEMS)
+
+    def test_cursor_round_trip(self):
+        cursor = core.encode_page_cursor({"id": "i-2", "created_at": "2026-02-01T00:00:00+00:00"}, "created_at")
+        self.assertEqual(core.decode_page_cursor(cursor), ("2026-02-01T00:00:00+00:00", "i-2"))
+        self.assertIsNone(core.encode_page_cursor({"id": "i-2"}, "created_at"))
+
+    def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(core.HTTPException) as ctx:
+            core.decode_page_cursor("not-a-cursor")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_keyset_filter(self):
+        self.assertEqual(
+            core.build_keyset_filter("created_at", ("2026-02-01", "i-2")),
+            '(or(created_at.lt."2026-02-01",and(created_at.eq."2026-02-01",id.lt."i-2")))',
+        )
+
+    def test_sourcing_page_returns_and_accepts_cursor(self):
+        rows = [{"id": f"i-{n}", "created_at": f"2026-02-0{9 - n}"} for n in range(3)]
+        client = FakeSupabase(rows)
+        with patch.object(core, "ensure_supabase", return_value=client):
+            first = asyncio.run(core.fetch_sourcing_items_page(limit=2))
+            self.assertTrue(first["has_more"])
+            self.assertEqual(core.decode_page_cursor(first["next_cursor"]), ("2026-02-08", "i-1"))
+
+            asyncio.run(core.fetch_sourcing_items_page(limit=2, cursor=first["next_cursor"]))
+        params = client.select_calls[-1]
+        self.assertNotIn("offset", params)
+        self.assertEqual(params["order"], "created_at.desc,id.desc")
+        self.assertIn('id.lt."i-1"', params["and"])
+
+    def test_manual_sort_has_no_cursor(self):
+        rows = [{"id": f"i-{n}", "created_at": "2026-02-01"} for n in range(3)]
+        with patch.object(core, "ensure_supabase", return_value=FakeSupabase(rows)):
+            page = asyncio.run(core.fetch_sourcing_items_page(limit=2, sort="manual", cursor="ignored"))
+        self.assertTrue(page["has_more"])
+        self.assertIsNone(page["next_cursor"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+
+
+class LlmClientRegistryTests(unittest.TestCase):
+    def test_clients_are_reused_and_share_pool_per_base_url(self):
+        registry = core.LlmClientRegistry(timeout=5, max_retries=1)
+
+        first = registry.client(api_key="a", base_url="https://example.com/v1/")
+        again = registry.client(api_key="a", base_url="https://example.com/v1")
+        other_key = registry.client(api_key="b", base_url="https://example.com/v1")
+        other_host = registry.client(api_key="a", base_url="https://other.example.com/v1")
+
+        self.assertIs(first, again)
+        self.assertIsNot(first, other_key)
+        self.assertEqual(len(registry._http_clients), 2)
+        self.assertEqual(first.max_retries, 1)
+
+        http_clients = list(registry._http_clients.values())
+        asyncio.run(registry.aclose())
+        self.assertTrue(all(client.is_closed for client in http_clients))
+        self.assertIsNot(registry.client(api_key="a", base_url="https://example.com/v1"), first)
+        self.assertIsNotNone(other_host)
+
+    def test_get_llm_client_requires_api_key(self):
+        with patch.object(core, "DASHSCOPE_API_KEY", None), patch.dict("os.environ", {"DASHSCOPE_API_KEY": ""}):
+            with self.assertRaises(core.HTTPException):
+                core.get_llm_client("dashscope")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from backend.api import video
+
+
+class LlmResultCacheTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_is_stable_and_content_addressed(self):
+        self.assertEqual(core.make_cache_key(1, "m", ["a"]), core.make_cache_key(1, "m", ["a"]))
+        self.assertNotEqual(core.make_cache_key(1, "m", ["a"]), core.make_cache_key(2, "m", ["a"]))
+
+    async def test_entries_persist_across_instances(self):
+        cache = core.LlmResultCache(self.root, ttl=60, max_entries=10)
+        await cache.set("ns", "k", {"value": 1})
+
+        reloaded = core.LlmResultCache(self.root, ttl=60, max_entries=10)
+        self.assertEqual(await reloaded.get("ns", "k"), {"value": 1})
+        stats = await reloaded.stats()
+        self.assertEqual(stats["ns"]["hits"], 1)
+        self.assertEqual(stats["ns"]["entries"], 1)
+
+    async def test_expired_entries_are_misses(self):
+        cache = core.LlmResultCache(self.root, ttl=60, max_entries=10)
+        await cache.set("ns", "k", "v")
+        with patch("time.time", return_value=time.time() + 120):
+            self.assertIsNone(await cache.get("ns", "k"))
+        self.assertFalse((self.root / "ns" / "k.json").exists())
+
+    async def test_oldest_entries_are_evicted(self):
+        cache = core.LlmResultCache(self.root, ttl=60, max_entries=2)
+        for index in range(3):
+            with patch("time.time", return_value=1000.0 + index):
+                await cache.set("ns", f"k{index}", index)
+
+        stats = (await cache.stats())["ns"]
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertFalse((self.root / "ns" / "k0.json").exists())
+
+    async def test_disk_access_runs_off_the_event_loop(self):
+        cache = core.LlmResultCache(self.root, ttl=60, max_entries=10)
+        calls = []
+        original = asyncio.to_thread
+
+        async def tracking_to_thread(func, *args, **kwargs):
+            calls.append(func.__name__)
+            return await original(func, *args, **kwargs)
+
+        with patch("asyncio.to_thread", tracking_to_thread):
+            await cache.set("ns", "k", "v")
+            await core.LlmResultCache(self.root, ttl=60, max_entries=10).get("ns", "k")
+        self.assertEqual(calls, ["_write_disk", "_read_disk"])
+
+
+class LlmResultCacheUsageTests(unittest.TestCase):
+    def test_segment_chunks_are_served_from_cache(self):
+        calls = []
+
+        async def fake_completion(text):
+            calls.append(text)
+            return text + "。"
+
+        events = [{"content": f"第{i}句"} for i in range(5)]
+        with patch.object(video, "DEEPSEEK_API_KEY", "test"), patch.object(
+            video, "request_segment_completion", fake_completion
+        ):
+            first = asyncio.run(video.segment_subtitle({"events": events}))
+            second = asyncio.run(video.segment_subtitle({"events": events}))
+            asyncio.run(video.segment_subtitle({"events": events, "force": True}))
+
+        self.assertEqual(first["text"], second["text"])
+        self.assertEqual(len(calls), 2)
+
+    def test_ai_fill_reuses_cached_results_unless_forced(self):
+        calls = []
+
+        async def run(force=False):
+            return await core.ai_fill_product_params(
+                "耳机",
+                [{"key": "续航", "example": "30小时"}, {"key": "重量", "example": "5g"}],
+                ["耳机A"],
+                model_override="deepseek",
+                force=force,
+            )
+
+        async def fake_create(**kwargs):
+            calls.append(kwargs)
+            content = '[{"name": "耳机A", "续航": "40小时", "重量": "4g"}]'
+            message = type("Message", (), {"content": content})()
+            choice = type("Choice", (), {"message": message})()
+            return type("Response", (), {"choices": [choice]})()
+
+        client = type("Client", (), {})()
+        client.chat = type("Chat", (), {})()
+        client.chat.completions = type("Completions", (), {"create": staticmethod(fake_create)})()
+
+        with patch.object(core, "get_llm_client", return_value=client), patch.object(core, "DEEPSEEK_API_KEY", "test"):
+            first = asyncio.run(run())
+            first[0]["续航"] = "changed"
+            second = asyncio.run(run())
+            asyncio.run(run(force=True))
+
+        self.assertEqual(second[0]["续航"], "40小时")
+        self.assertEqual(len(calls), 2)
+
+    def test_ai_fill_does_not_cache_empty_or_partial_results(self):
+        answers = [[], [{"name": "耳机A", "续航": "40小时", "重量": "4g"}]]
+        calls = []
+
+        async def fake_create(**kwargs):
+            calls.append(kwargs)
+            content = json.dumps(answers[min(len(calls), 2) - 1], ensure_ascii=False)
+            message = type("Message", (), {"content": content})()
+            choice = type("Choice", (), {"message": message})()
+            return type("Response", (), {"choices": [choice]})()
+
+        client = type("Client", (), {})()
+        client.chat = type("Chat", (), {})()
+        client.chat.completions = type("Completions", (), {"create": staticmethod(fake_create)})()
+
+        async def run(names):
+            return await core.ai_fill_product_params(
+                "耳机",
+                [{"key": "续航", "example": "30小时"}, {"key": "重量", "example": "5g"}],
+                names,
+                model_override="deepseek",
+            )
+
+        with patch.object(core, "get_llm_client", return_value=client), patch.object(core, "DEEPSEEK_API_KEY", "test"):
+            self.assertEqual(asyncio.run(run(["耳机A"])), [])
+            asyncio.run(run(["耳机A", "耳机B"]))
+            asyncio.run(run(["耳机A", "耳机B"]))
+            self.assertEqual(asyncio.run(run(["耳机A"]))[0]["续航"], "40小时")
+
+        self.assertEqual(len(calls), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from services.loop_monitor import LoopStallMonitor
+
+
+def blocking_handler():
+    time.sleep(0.3)
+
+
+class LoopStallMonitorTests(unittest.TestCase):
+    def test_stall_is_blamed_on_blocking_code(self):
+        monitor = LoopStallMonitor(threshold=0.1, interval=0.02)
+
+        async def run():
+            monitor.start()
+            await asyncio.sleep(0.05)
+            blocking_handler()
+            await asyncio.sleep(0.1)
+            await monitor.stop()
+
+        with self.assertLogs("services.loop_monitor", level="WARNING"):
+            asyncio.run(run())
+        snapshot = monitor.snapshot()
+        self.assertFalse(snapshot["enabled"])
+        self.assertEqual(snapshot["stalls"], 1)
+        self.assertGreaterEqual(snapshot["max_lag_seconds"], 0.2)
+        offender = snapshot["top_offenders"][0]
+        self.assertIn("test_loop_monitor.py", offender["location"])
+        self.assertIn("blocking_handler", offender["location"])
+
+    def test_quiet_loop_records_lag_without_stalls(self):
+        monitor = LoopStallMonitor(threshold=0.5, interval=0.01)
+
+        async def run():
+            monitor.start()
+            await asyncio.sleep(0.1)
+            await monitor.stop()
+
+        asyncio.run(run())
+        snapshot = monitor.snapshot()
+        self.assertEqual(snapshot["stalls"], 0)
+        self.assertGreater(snapshot["lag"]["count"], 0)
+
+    def test_monitor_is_not_running_before_startup(self):
+        self.assertFalse(core.loop_stall_monitor.running)
+        self.assertFalse(core.loop_stall_monitor.snapshot()["enabled"])
+
+
+if __name__ == "__main__":
+    unittest.main()
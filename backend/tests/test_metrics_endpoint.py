@@ -0,0 +1,71 @@
+import asyncio
+import sys
+from pathlib import Path
+import unittest
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from services.metrics import HttpRequestMetrics, RequestContextMiddleware, SupabaseQueryMetrics
+
+
+async def get(app, path):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+
+class MetricsMiddlewareTests(unittest.TestCase):
+    def test_records_route_latency_size_and_server_timing(self):
+        request_metrics = HttpRequestMetrics()
+        db_metrics = SupabaseQueryMetrics(slow_threshold=60)
+        app = FastAPI()
+        app.add_middleware(RequestContextMiddleware, request_metrics=request_metrics)
+
+        @app.get("/items/{item_id}")
+        async def read_item(item_id: str):
+            db_metrics.record(table="sourcing_items", method="GET", status=200, seconds=0.02, size=1)
+            return {"id": item_id}
+
+        response = asyncio.run(get(app, "/items/7"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("app;dur=", response.headers["server-timing"])
+        self.assertIn('db;dur=20.0;desc="supabase x1"', response.headers["server-timing"])
+
+        snapshot = request_metrics.snapshot()
+        self.assertEqual(
+            snapshot["requests"],
+            [{"route": "/items/{item_id}", "method": "GET", "status": 200, "count": 1}],
+        )
+        self.assertEqual(snapshot["in_flight"], {"GET": 0})
+        self.assertEqual(snapshot["sizes"][("/items/{item_id}", "GET")]["sum"], len(response.content))
+
+    def test_unmatched_routes_share_one_label(self):
+        request_metrics = HttpRequestMetrics()
+        app = FastAPI()
+        app.add_middleware(RequestContextMiddleware, request_metrics=request_metrics)
+        asyncio.run(get(app, "/nope/1"))
+        asyncio.run(get(app, "/nope/2"))
+        self.assertEqual(request_metrics.snapshot()["requests"][0]["route"], "unmatched")
+        self.assertEqual(request_metrics.snapshot()["requests"][0]["count"], 2)
+
+
+class MetricsEndpointTests(unittest.TestCase):
+    def test_prometheus_endpoint(self):
+        response = asyncio.run(get(core.app, "/api/metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        body = response.text
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertIn('jobs_running{kind="zhihu_scrape"} 0', body)
+        self.assertIn("# TYPE cache_hits_total counter", body)
+
+        again = asyncio.run(get(core.app, "/api/metrics")).text
+        self.assertIn('http_requests_total{route="/api/metrics",method="GET",status="200"}', again)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import sys
+from pathlib import Path
+import unittest
+
+import aiohttp
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from services.llm_clients import LlmClientRegistry
+from services.metrics import HttpRequestMetrics, OutboundRequestMetrics, SupabaseQueryMetrics, render_prometheus
+
+
+class OutboundRequestMetricsTests(unittest.TestCase):
+    def test_httpx_transport_records_by_host(self):
+        metrics = OutboundRequestMetrics()
+
+        def handler(request):
+            if request.url.host == "down.example.com":
+                raise httpx.ConnectError("refused", request=request)
+            if request.url.path == "/missing":
+                return httpx.Response(404)
+            return httpx.Response(200, json={"ok": True})
+
+        async def run():
+            transport = metrics.httpx_transport(httpx.MockTransport(handler))
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.get("https://api.example.com/ok")
+                await client.get("https://api.example.com/missing")
+                await client.post("https://api.example.com/ok")
+                with self.assertRaises(httpx.ConnectError):
+                    await client.get("https://down.example.com/ok")
+
+        asyncio.run(run())
+        rows = {(row["host"], row["method"]): row for row in metrics.snapshot()["hosts"]}
+        self.assertEqual(rows[("api.example.com", "GET")]["requests"], 2)
+        self.assertEqual(rows[("api.example.com", "GET")]["errors"], 1)
+        self.assertEqual(rows[("api.example.com", "POST")]["errors"], 0)
+        self.assertEqual(rows[("down.example.com", "GET")]["errors"], 1)
+
+        text = render_prometheus(
+            http=HttpRequestMetrics().snapshot(),
+            supabase=SupabaseQueryMetrics(slow_threshold=60).snapshot(),
+            outbound=metrics.snapshot(),
+        )
+        self.assertIn('outbound_requests_total{host="api.example.com",method="GET"} 2', text)
+        self.assertIn('outbound_request_errors_total{host="down.example.com",method="GET"} 1', text)
+        self.assertIn("outbound_request_duration_seconds_bucket", text)
+
+    def test_aiohttp_trace_config_records_failed_connections(self):
+        metrics = OutboundRequestMetrics()
+
+        async def run():
+            async with aiohttp.ClientSession(trace_configs=[metrics.aiohttp_trace_config()]) as session:
+                with self.assertRaises(aiohttp.ClientError):
+                    await session.get("http://127.0.0.1:1/", timeout=aiohttp.ClientTimeout(total=2))
+
+        asyncio.run(run())
+        rows = metrics.snapshot()["hosts"]
+        self.assertEqual([(row["host"], row["method"], row["errors"]) for row in rows], [("127.0.0.1", "GET", 1)])
+
+    def test_llm_registry_uses_instrumented_transport(self):
+        metrics = OutboundRequestMetrics()
+        registry = LlmClientRegistry(timeout=5, max_retries=0, outbound_metrics=metrics)
+        http_client = registry._http_client("https://llm.example.com/v1")
+        self.assertIs(http_client._transport._metrics, metrics)
+        asyncio.run(http_client.aclose())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import gzip
+import sys
+from pathlib import Path
+import unittest
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from services.compression import CompressionMiddleware, parse_accept_encoding
+
+
+async def get(app, path, **headers):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+def build_app():
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/big")
+    async def big():
+        return {"items": [{"id": index, "title": "商品"} for index in range(50)]}
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            yield "data: " + "x" * 500 + "\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+class CompressionMiddlewareTests(unittest.TestCase):
+    def test_large_body_is_gzipped(self):
+        response = asyncio.run(get(build_app(), "/big", **{"accept-encoding": "gzip"}))
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+        self.assertEqual(len(response.json()["items"]), 50)
+
+    def test_small_body_and_event_stream_untouched(self):
+        app = build_app()
+        small = asyncio.run(get(app, "/small", **{"accept-encoding": "gzip"}))
+        self.assertNotIn("content-encoding", small.headers)
+        self.assertEqual(small.json(), {"ok": True})
+        stream = asyncio.run(get(app, "/stream", **{"accept-encoding": "gzip"}))
+        self.assertNotIn("content-encoding", stream.headers)
+        self.assertTrue(stream.text.startswith("data: "))
+
+    def test_identity_when_client_does_not_accept_gzip(self):
+        response = asyncio.run(get(build_app(), "/big", **{"accept-encoding": "gzip;q=0, identity"}))
+        self.assertNotIn("content-encoding", response.headers)
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(parse_accept_encoding("br;q=0, GZIP;q=0.5, deflate"), ["gzip", "deflate"])
+        self.assertEqual(parse_accept_encoding(""), [])
+
+    def test_gzip_round_trip(self):
+        middleware = CompressionMiddleware(None)
+        self.assertEqual(gzip.decompress(middleware._compress("gzip", b"abc")), b"abc")
+
+
+class FastJsonTests(unittest.TestCase):
+    def test_app_defaults_to_orjson_response(self):
+        self.assertIs(core.app.router.default_response_class, ORJSONResponse)
+
+    def test_json_loads_accepts_bytes(self):
+        self.assertEqual(core.json_loads(b'[{"id": "1", "title": "\xe5\x95\x86"}]'), [{"id": "1", "title": "商"}])
+        with self.assertRaises(ValueError):
+            core.json_loads(b"")
+
+    def test_supabase_request_decodes_response_body(self):
+        def handler(request):
+            return httpx.Response(200, content=b'[{"id": "a"}]')
+
+        client = core.SupabaseClient("http://supabase.test", "key")
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        rows = asyncio.run(client.select("sourcing_items", {"select": "id"}))
+        self.assertEqual(rows, [{"id": "a"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
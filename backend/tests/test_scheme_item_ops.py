@@ -0,0 +1,90 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+from fastapi import HTTPException
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from backend.api import schemes
+
+
+def ops(*items):
+    return [core.SchemeItemOp(**item) for item in items]
+
+
+class ApplySchemeItemOpsTests(unittest.TestCase):
+    def setUp(self):
+        self.items = [{"id": "a", "price": 1}, {"id": "b"}, {"id": "c"}]
+
+    def test_add_remove_move_patch(self):
+        result = core.apply_scheme_item_ops(
+            self.items,
+            ops(
+                {"op": "add", "item": {"id": "d"}, "index": 1},
+                {"op": "remove", "id": "b"},
+                {"op": "move", "id": "c", "index": 0},
+                {"op": "patch", "id": "a", "fields": {"price": 2, "id": "x"}},
+            ),
+        )
+        self.assertEqual([item["id"] for item in result], ["c", "a", "d"])
+        self.assertEqual(result[1]["price"], 2)
+        self.assertEqual(self.items[0]["price"], 1)
+
+    def test_invalid_ops_are_rejected(self):
+        with self.assertRaises(HTTPException) as ctx:
+            core.apply_scheme_item_ops(self.items, ops({"op": "remove", "id": "missing"}))
+        self.assertEqual(ctx.exception.status_code, 404)
+        with self.assertRaises(HTTPException) as ctx:
+            core.apply_scheme_item_ops(self.items, ops({"op": "add", "item": {"id": "a"}}))
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+class FakeSupabase:
+    def __init__(self, version=3, stale_write=False):
+        self.row = {"id": "s1", "items": [{"id": "a"}, {"id": "b"}], "version": version}
+        self.stale_write = stale_write
+        self.updates = []
+
+    async def select(self, table, params=None):
+        return [dict(self.row)]
+
+    async def update(self, table, payload, filters):
+        self.updates.append((payload, filters))
+        if self.stale_write:
+            return []
+        self.row = {**self.row, **payload, "version": self.row["version"] + 1}
+        return [dict(self.row)]
+
+
+class PatchSchemeItemsRouteTests(unittest.TestCase):
+    def run_patch(self, client, version, *items):
+        payload = core.SchemeItemOpsPayload(version=version, ops=ops(*items))
+        with patch.object(schemes, "ensure_supabase", return_value=client):
+            return asyncio.run(schemes.patch_scheme_items("s1", payload))
+
+    def test_patch_writes_with_version_precondition(self):
+        client = FakeSupabase()
+        result = self.run_patch(client, 3, {"op": "remove", "id": "a"})
+        payload, filters = client.updates[0]
+        self.assertEqual(filters, {"id": "eq.s1", "version": "eq.3"})
+        self.assertEqual(payload["items"], [{"id": "b"}])
+        self.assertEqual(result["version"], 4)
+        self.assertEqual(result["item_count"], 1)
+
+    def test_version_mismatch_returns_conflict(self):
+        with self.assertRaises(HTTPException) as ctx:
+            self.run_patch(FakeSupabase(), 2, {"op": "remove", "id": "a"})
+        self.assertEqual(ctx.exception.status_code, 409)
+
+        client = FakeSupabase(stale_write=True)
+        with self.assertRaises(HTTPException) as ctx:
+            self.run_patch(client, 3, {"op": "remove", "id": "a"})
+        self.assertEqual(ctx.exception.status_code, 409)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from backend.api import schemes
+
+
+class FakeSupabase:
+    def __init__(self, missing_item_count=False):
+        self.missing_item_count = missing_item_count
+        self.selects = []
+
+    async def select(self, table, params=None):
+        self.selects.append(dict(params or {}))
+        if self.missing_item_count and "item_count" in params["select"]:
+            raise core.SupabaseError(400, "column schemes.item_count does not exist")
+        row = {"id": "s1", "name": "方案", "category_id": "c1", "created_at": "2026-02-01T00:00:00Z"}
+        if "item_count" in params["select"]:
+            row["item_count"] = 3
+        else:
+            row["items"] = [{"id": "a"}, {"id": "b"}]
+        return [row]
+
+
+class SchemeSummaryTests(unittest.TestCase):
+    def test_summary_selects_item_count_without_items(self):
+        client = FakeSupabase()
+        with patch.object(schemes, "ensure_supabase", return_value=client):
+            payload = asyncio.run(schemes.list_schemes(fields="summary"))
+        self.assertNotIn("items", client.selects[0]["select"].split(","))
+        self.assertEqual(payload["schemes"][0]["item_count"], 3)
+        self.assertNotIn("items", payload["schemes"][0])
+
+    def test_summary_counts_items_when_column_is_missing(self):
+        client = FakeSupabase(missing_item_count=True)
+        with patch.object(schemes, "ensure_supabase", return_value=client):
+            payload = asyncio.run(schemes.list_schemes(category_id="c1", fields="summary"))
+        self.assertEqual(len(client.selects), 2)
+        self.assertEqual(client.selects[1]["category_id"], "eq.c1")
+        self.assertEqual(payload["schemes"][0]["item_count"], 2)
+        self.assertNotIn("items", payload["schemes"][0])
+
+    def test_full_listing_keeps_items(self):
+        client = FakeSupabase()
+        with patch.object(schemes, "ensure_supabase", return_value=client):
+            payload = asyncio.run(schemes.list_schemes())
+        self.assertEqual(len(payload["schemes"][0]["items"]), 2)
+        self.assertEqual(payload["schemes"][0]["item_count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
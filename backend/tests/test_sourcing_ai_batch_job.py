@@ -0,0 +1,147 @@
+import asyncio
+import sys
+from collections import deque
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+
+
+class FakeSupabase:
+    def __init__(self, existing_ids=None, rpc_missing=False):
+        self.updates = []
+        self.rpc_calls = []
+        self.existing_ids = existing_ids
+        self.rpc_missing = rpc_missing
+
+    async def rpc(self, function_name, params=None, query=None):
+        if self.rpc_missing:
+            raise core.SupabaseError(404, "Could not find the function public.apply_sourcing_ai_updates")
+        self.rpc_calls.append((function_name, params["p_updates"]))
+        return [
+            {"id": row["id"]}
+            for row in params["p_updates"]
+            if self.existing_ids is None or row["id"] in self.existing_ids
+        ]
+
+    async def update(self, table, payload, filters):
+        ids = [value.strip('"') for value in filters["id"][len("in.("):-1].split(",")]
+        self.updates.append((table, payload, ids))
+        return [{"id": item_id} for item_id in ids if self.existing_ids is None or item_id in self.existing_ids]
+
+    async def upsert(self, *args, **kwargs):
+        raise AssertionError("AI batch must not upsert sourcing_items")
+
+
+class SourcingAiBatchJobTests(unittest.TestCase):
+    def setUp(self):
+        self.job_id = "job"
+        core.sourcing_ai_job_store[self.job_id] = {"id": self.job_id, "status": "queued"}
+
+    def tearDown(self):
+        core.sourcing_ai_job_store.pop(self.job_id, None)
+
+    def _run(self, items, fake_fill, client):
+        spec_fields = [{"key": "重量", "example": "XXg"}]
+        with patch.object(core, "ensure_supabase", return_value=client), patch.object(
+            core, "ai_fill_product_params", fake_fill
+        ), patch.dict(core.AI_PROVIDER_MIN_INTERVAL, {"deepseek": 0}), patch.dict(
+            core.AI_PROVIDER_CONCURRENCY, {"deepseek": 3}
+        ):
+            asyncio.run(core.run_sourcing_ai_batch_job(self.job_id, items, "耳机", spec_fields, "deepseek-chat"))
+        return core.sourcing_ai_job_store[self.job_id]
+
+    def test_chunks_run_concurrently_and_patch_in_bulk(self):
+        items = [{"id": f"id{i}", "title": f"商品{i}", "spec": {}, "remark": ""} for i in range(30)]
+        in_flight = {"current": 0, "peak": 0}
+
+        async def fake_fill(category, fields, names, model_override=None, force=False):
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            return [{"name": name, "重量": "5g", "评价": "不错"} for name in names]
+
+        client = FakeSupabase()
+        state = self._run(items, fake_fill, client)
+
+        self.assertEqual(state["status"], "done")
+        self.assertEqual((state["processed"], state["success"], state["failed"]), (30, 30, 0))
+        self.assertGreater(in_flight["peak"], 1)
+        self.assertLessEqual(in_flight["peak"], 3)
+        self.assertEqual(client.updates, [])
+        self.assertEqual(len(client.rpc_calls), 3)
+        written = [row["id"] for _, rows in client.rpc_calls for row in rows]
+        self.assertEqual(sorted(written), sorted(item["id"] for item in items))
+        self.assertTrue(all(name == "apply_sourcing_ai_updates" for name, _ in client.rpc_calls))
+        self.assertTrue(all("id" not in row["fields"] for _, rows in client.rpc_calls for row in rows))
+
+    def test_missing_rpc_falls_back_to_grouped_patch(self):
+        items = [{"id": f"id{i}", "title": f"商品{i}", "spec": {}, "remark": ""} for i in range(4)]
+
+        async def fake_fill(category, fields, names, model_override=None, force=False):
+            return [{"name": name, "重量": "5g"} for name in names]
+
+        client = FakeSupabase(rpc_missing=True)
+        state = self._run(items, fake_fill, client)
+
+        self.assertEqual((state["success"], state["failed"]), (4, 0))
+        patched = [item_id for _, _, ids in client.updates for item_id in ids]
+        self.assertEqual(sorted(patched), sorted(item["id"] for item in items))
+
+    def test_deleted_items_are_reported_not_recreated(self):
+        items = [
+            {"id": "keep", "title": "商品A", "spec": {}, "remark": ""},
+            {"id": "gone", "title": "商品B", "spec": {"重量": ""}, "remark": "已有备注"},
+        ]
+
+        async def fake_fill(category, fields, names, model_override=None, force=False):
+            return [{"name": name, "重量": "5g", "评价": "不错"} for name in names]
+
+        client = FakeSupabase(existing_ids={"keep"})
+        state = self._run(items, fake_fill, client)
+
+        self.assertEqual((state["success"], state["failed"]), (1, 1))
+        self.assertEqual(state["failures"], [{"name": "商品B", "reason": "商品不存在"}])
+        fields = {row["id"]: row["fields"] for _, rows in client.rpc_calls for row in rows}
+        self.assertNotIn("remark", fields["gone"])
+
+    def test_only_failed_items_are_retried_in_smaller_chunks(self):
+        items = [{"id": f"id{i}", "title": f"商品{i}", "spec": {}, "remark": ""} for i in range(10)]
+        calls = []
+
+        async def fake_fill(category, fields, names, model_override=None, force=False):
+            calls.append(list(names))
+            if len(calls) == 1:
+                # 首次只返回一半结果
+                return [{"name": name, "重量": "5g"} for name in names[:5]]
+            if "商品9" in names:
+                raise RuntimeError("boom")
+            return [{"name": name, "重量": "5g"} for name in names]
+
+        state = self._run(items, fake_fill, FakeSupabase())
+
+        self.assertEqual(calls[0], [item["title"] for item in items])
+        retried = [name for names in calls[1:] for name in names]
+        self.assertNotIn("商品0", retried)
+        self.assertTrue(all(len(names) <= 2 for names in calls[1:]))
+        self.assertEqual(state["success"], 9)
+        self.assertEqual(state["failed"], 1)
+        self.assertEqual(state["failures"][0]["name"], "商品9")
+        self.assertEqual(state["processed"], 10)
+
+    def test_planner_respects_prompt_budget_and_adapts(self):
+        planner = core.AiBatchChunkPlanner(max_size=10, char_budget=10)
+        queue = deque({"item": {"title": "abcd"}, "attempt": 1, "cap": None} for _ in range(6))
+        self.assertEqual(len(planner.take(queue)), 2)
+        planner.record_failure()
+        self.assertEqual(planner.size, 5)
+        planner.record_success()
+        self.assertEqual(planner.size, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
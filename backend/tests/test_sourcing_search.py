@@ -0,0 +1,105 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+
+
+class FakeSupabase:
+    def __init__(self, rpc_error=None, missing_search_text=False):
+        self.rpc_error = rpc_error
+        self.missing_search_text = missing_search_text
+        self.rpc_calls = []
+        self.select_calls = []
+        self.inserts = []
+
+    async def rpc(self, function_name, params=None, query=None):
+        self.rpc_calls.append((function_name, params, query))
+        if self.rpc_error:
+            raise self.rpc_error
+        return [{"id": "ranked"}]
+
+    async def select(self, table, params=None):
+        self.select_calls.append((table, params))
+        if self.missing_search_text and "search_text" in str((params or {}).get("or")):
+            raise core.SupabaseError(400, "column sourcing_items.search_text does not exist")
+        return [{"id": "plain"}]
+
+    async def insert(self, table, payload):
+        self.inserts.append(payload)
+        if self.missing_search_text and "search_text" in payload:
+            raise core.SupabaseError(400, "Could not find the 'search_text' column of 'sourcing_items'")
+        return [payload]
+
+
+class SourcingSearchTests(unittest.TestCase):
+    def setUp(self):
+        core.cache.invalidate(core.CACHE_NS_SOURCING_ITEMS)
+        core.cache.invalidate(core.CACHE_NS_SOURCING_SEARCH_TEXT_MISSING)
+
+    def tearDown(self):
+        core.cache.invalidate(core.CACHE_NS_SOURCING_SEARCH_TEXT_MISSING)
+
+    def test_search_text_contains_full_pinyin_and_initials(self):
+        self.assertEqual(core.build_sourcing_search_text("小米手环8"), "xiaomishouhuan8 xmsh8")
+        self.assertEqual(core.build_sourcing_search_text("  "), "")
+
+    def test_keyword_filter_matches_pinyin_column(self):
+        clause = core.build_sourcing_keyword_filter("Shou Huan*")
+        self.assertIn("title.ilike.*Shou Huan*", clause)
+        self.assertIn("search_text.ilike.*shouhuan*", clause)
+        self.assertIsNone(core.build_sourcing_keyword_filter(" % "))
+        self.assertEqual(
+            core.build_sourcing_keyword_filter("a_b,(c)", include_search_text=False),
+            "(title.ilike.*a\\_bc*,uid.ilike.*a\\_bc*)",
+        )
+
+    def test_keyword_page_uses_ranked_search(self):
+        client = FakeSupabase()
+        with patch.object(core, "ensure_supabase", return_value=client):
+            payload = asyncio.run(core.fetch_sourcing_items_page(keyword="xmsh", category_id="c1", limit=10))
+        self.assertEqual(payload["items"], [{"id": "ranked"}])
+        self.assertEqual(client.select_calls, [])
+        name, params, query = client.rpc_calls[0]
+        self.assertEqual(name, "search_sourcing_items")
+        self.assertEqual(params["p_category_id"], "c1")
+        self.assertEqual(params["p_limit"], 11)
+        self.assertEqual(query, {"select": core.SOURCING_LIST_FIELDS})
+
+    def test_missing_rpc_falls_back_to_ilike(self):
+        client = FakeSupabase(rpc_error=core.SupabaseError(404, "function not found"))
+        with patch.object(core, "ensure_supabase", return_value=client):
+            payload = asyncio.run(core.fetch_sourcing_items_page(keyword="xmsh", limit=10))
+        self.assertEqual(payload["items"], [{"id": "plain"}])
+        self.assertIn("search_text.ilike.*xmsh*", client.select_calls[0][1]["or"])
+
+    def test_manual_sort_keeps_plain_query(self):
+        client = FakeSupabase()
+        with patch.object(core, "ensure_supabase", return_value=client):
+            asyncio.run(core.fetch_sourcing_items_page(keyword="xmsh", sort="manual"))
+        self.assertEqual(client.rpc_calls, [])
+        self.assertEqual(len(client.select_calls), 1)
+
+    def test_missing_search_text_column_is_left_out(self):
+        client = FakeSupabase(rpc_error=core.SupabaseError(404, "function not found"), missing_search_text=True)
+        with patch.object(core, "ensure_supabase", return_value=client):
+            payload = asyncio.run(core.fetch_sourcing_items_page(keyword="xmsh", limit=10))
+            record = asyncio.run(
+                core.write_sourcing_items(
+                    lambda row: client.insert("sourcing_items", row),
+                    {"title": "小米手环", **core.sourcing_search_text_fields("小米手环")},
+                )
+            )
+        self.assertEqual(payload["items"], [{"id": "plain"}])
+        self.assertNotIn("search_text", client.select_calls[-1][1]["or"])
+        self.assertEqual(record, [{"title": "小米手环"}])
+        self.assertFalse(core.sourcing_search_text_enabled())
+        self.assertEqual(core.sourcing_search_text_fields("小米手环"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from backend.api import comment as comment_api
+from services.http_cache import ConditionalJSON, etag_matches
+
+
+async def get(path, **headers):
+    transport = httpx.ASGITransport(app=core.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+class ConditionalJSONTests(unittest.TestCase):
+    def test_etag_matching_rules(self):
+        self.assertTrue(etag_matches('"a", W/"b"', '"b"'))
+        self.assertTrue(etag_matches("*", '"a"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches(None, '"a"'))
+
+    def test_render_reuses_body_for_same_payload_object(self):
+        responder = ConditionalJSON(max_entries=1)
+        payload = {"items": [1, 2]}
+        body, etag = responder.render("k", payload)
+        with patch("services.http_cache.dump_json", side_effect=AssertionError("re-serialized")):
+            self.assertEqual(responder.render("k", payload), (body, etag))
+        _, other = responder.render("k", {"items": [1, 2, 3]})
+        self.assertNotEqual(other, etag)
+        self.assertEqual(responder.render("k", {"items": [1, 2]})[1], etag)
+
+    def test_memo_is_bounded(self):
+        responder = ConditionalJSON(max_entries=2)
+        for key in ("a", "b", "c"):
+            responder.render(key, {"key": key})
+        self.assertEqual(list(responder._memo), ["b", "c"])
+
+
+class StateRouteETagTests(unittest.TestCase):
+    def test_state_route_returns_304_when_unchanged(self):
+        snapshot = {"accounts": [], "combos": [{"id": "c1", "content": "蓝链"}]}
+
+        async def fake_snapshot():
+            return snapshot
+
+        with patch.object(comment_api, "fetch_comment_snapshot", fake_snapshot):
+            first = asyncio.run(get("/api/comment/blue-links/state-v2"))
+            etag = first.headers["etag"]
+            second = asyncio.run(get("/api/comment/blue-links/state-v2", **{"if-none-match": etag}))
+            snapshot = {"accounts": [], "combos": []}
+            third = asyncio.run(get("/api/comment/blue-links/state-v2", **{"if-none-match": etag}))
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()["combos"][0]["content"], "蓝链")
+        self.assertEqual(first.headers["cache-control"], "no-cache")
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third.headers["etag"], etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from backend.api import video
+
+
+class SubtitleSegmentChunkTests(unittest.TestCase):
+    def test_short_transcript_is_single_chunk(self):
+        chunks = core.build_subtitle_segment_chunks(["a", "b", "c"], max_chars=100)
+        self.assertEqual(chunks, [["a", "b", "c"]])
+
+    def test_chunks_overlap_on_event_boundaries(self):
+        lines = [f"line{i:02d}" for i in range(10)]
+        chunks = core.build_subtitle_segment_chunks(lines, max_chars=30, overlap_lines=1)
+
+        self.assertGreater(len(chunks), 1)
+        for previous, current in zip(chunks, chunks[1:]):
+            self.assertEqual(current[0], previous[-1])
+        covered = [line for line in chunks[0]] + [line for chunk in chunks[1:] for line in chunk[1:]]
+        self.assertEqual(covered, lines)
+
+    def test_long_line_is_split_at_sentence_end(self):
+        pieces = core.split_long_subtitle_line("一二三。四五六七八九", 5)
+        self.assertEqual(pieces[0], "一二三。")
+        self.assertEqual("".join(pieces), "一二三。四五六七八九")
+
+    def test_merge_drops_repeated_seam_with_different_punctuation(self):
+        merged = core.merge_segment_texts("第一款耳机续航很好，价格也便宜。", "价格也便宜！第二款耳机重量很轻。")
+        self.assertEqual(merged, "第二款耳机重量很轻。")
+
+    def test_merge_keeps_text_without_overlap(self):
+        self.assertEqual(core.merge_segment_texts("前面的内容。", "完全不同的后文。"), "完全不同的后文。")
+
+
+class SubtitleSegmentEndpointTests(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        async def fake_completion(text):
+            self.calls.append(text)
+            return text.replace("\n", "，") + "。"
+
+        self.patches = [
+            patch.object(video, "DEEPSEEK_API_KEY", "test"),
+            patch.object(video, "request_segment_completion", fake_completion),
+        ]
+        for item in self.patches:
+            item.start()
+
+    def tearDown(self):
+        for item in self.patches:
+            item.stop()
+
+    def _events(self, count):
+        return [{"content": f"第{i:03d}句字幕内容"} for i in range(count)]
+
+    def test_long_transcript_is_not_truncated(self):
+        events = self._events(600)
+        with patch.object(video, "build_subtitle_segment_chunks", lambda lines: core.build_subtitle_segment_chunks(lines, max_chars=500)):
+            result = asyncio.run(video.segment_subtitle({"events": events}))
+
+        self.assertGreater(len(self.calls), 1)
+        self.assertEqual(result["chunks"], len(self.calls))
+        for index in range(600):
+            self.assertEqual(result["text"].count(f"第{index:03d}句字幕内容"), 1)
+
+    def test_stream_mode_emits_ndjson_events(self):
+        events = self._events(200)
+
+        async def collect():
+            with patch.object(video, "build_subtitle_segment_chunks", lambda lines: core.build_subtitle_segment_chunks(lines, max_chars=400)):
+                response = await video.segment_subtitle({"events": events, "stream": True})
+                return [json.loads(line) async for line in response.body_iterator]
+
+        payloads = asyncio.run(collect())
+        types = [item["type"] for item in payloads]
+        self.assertEqual(types[-1], "done")
+        chunk_events = [item for item in payloads if item["type"] == "chunk"]
+        self.assertEqual([item["index"] for item in chunk_events], list(range(len(chunk_events))))
+        self.assertEqual("".join(item["text"] for item in chunk_events), payloads[-1]["text"])
+
+    def test_chunks_without_detectable_overlap_are_split_by_newline(self):
+        answers = iter(["第一块的改写内容。", "第二块完全不同的改写。"])
+
+        async def rewriting_completion(text):
+            return next(answers)
+
+        with patch.object(video, "request_segment_completion", rewriting_completion), patch.object(
+            video, "SUBTITLE_SEGMENT_CONCURRENCY", 1
+        ), patch.object(
+            video, "build_subtitle_segment_chunks", lambda lines: [lines[:2], lines[1:]]
+        ):
+            result = asyncio.run(video.segment_subtitle({"events": self._events(3)}))
+
+        self.assertEqual(result["text"], "第一块的改写内容。\n第二块完全不同的改写。")
+
+
+if __name__ == "__main__":
+    unittest.main()
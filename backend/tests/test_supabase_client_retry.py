@@ -0,0 +1,93 @@
+import asyncio
+import sys
+from pathlib import Path
+import unittest
+
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+
+
+def make_client(handler, **kwargs):
+    kwargs.setdefault("retry_backoff", 0)
+    client = core.SupabaseClient("https://example.supabase.co", "key", **kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+async def call(client, coro_factory):
+    try:
+        return await coro_factory(client)
+    finally:
+        await client.close()
+
+
+class SupabaseClientRetryTests(unittest.TestCase):
+    def test_get_retries_transient_status(self):
+        statuses = [503, 502, 200]
+
+        def handler(request):
+            status = statuses.pop(0)
+            return httpx.Response(status, json=[{"id": "a"}] if status == 200 else {"message": "busy"})
+
+        rows = asyncio.run(call(make_client(handler), lambda c: c.select("schemes")))
+        self.assertEqual(rows, [{"id": "a"}])
+        self.assertEqual(statuses, [])
+
+    def test_gives_up_after_max_retries(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503, json={"message": "busy"})
+
+        with self.assertRaises(core.SupabaseError) as ctx:
+            asyncio.run(call(make_client(handler, max_retries=1), lambda c: c.select("schemes")))
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertEqual(len(calls), 2)
+
+    def test_post_is_not_retried_on_read_error(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadError("reset", request=request)
+
+        with self.assertRaises(core.SupabaseError) as ctx:
+            asyncio.run(call(make_client(handler), lambda c: c.insert("schemes", {"name": "x"})))
+        self.assertEqual(ctx.exception.status_code, 0)
+        self.assertEqual(len(calls), 1)
+
+    def test_post_is_retried_when_connection_failed(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(201, json=[{"id": "new"}])
+
+        rows = asyncio.run(call(make_client(handler), lambda c: c.insert("schemes", {"name": "x"})))
+        self.assertEqual(rows, [{"id": "new"}])
+        self.assertEqual(len(calls), 2)
+
+    def test_count_shares_retry_and_error_path(self):
+        statuses = [504, 200]
+
+        def handler(request):
+            self.assertEqual(request.headers["Prefer"], "count=estimated")
+            status = statuses.pop(0)
+            return httpx.Response(status, json=[], headers={"Content-Range": "0-0/42"})
+
+        total = asyncio.run(call(make_client(handler), lambda c: c.count("schemes", method="estimated")))
+        self.assertEqual(total, 42)
+
+    def test_http2_is_disabled_without_h2(self):
+        client = core.SupabaseClient("https://example.supabase.co", "key", http2=True)
+        asyncio.run(client.close())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import sys
+from pathlib import Path
+import unittest
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+from services.metrics import RequestContextMiddleware, SupabaseQueryMetrics
+
+
+def make_client(handler, metrics):
+    client = core.SupabaseClient("https://example.supabase.co", "key", retry_backoff=0, metrics=metrics)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+class SupabaseMetricsTests(unittest.TestCase):
+    def test_records_per_table_stats_and_errors(self):
+        metrics = SupabaseQueryMetrics(slow_threshold=60)
+
+        def handler(request):
+            if request.url.path.endswith("/schemes"):
+                return httpx.Response(200, json=[{"id": "a"}])
+            return httpx.Response(400, json={"message": "bad"})
+
+        async def run():
+            client = make_client(handler, metrics)
+            await client.select("schemes")
+            with self.assertRaises(core.SupabaseError):
+                await client.rpc("missing_fn")
+            await client.close()
+
+        asyncio.run(run())
+        snapshot = metrics.snapshot()
+        tables = {(row["table"], row["method"]): row for row in snapshot["tables"]}
+        self.assertEqual(tables[("schemes", "GET")]["requests"], 1)
+        self.assertGreater(tables[("schemes", "GET")]["bytes"], 0)
+        self.assertEqual(tables[("schemes", "GET")]["latency"]["count"], 1)
+        self.assertEqual(tables[("rpc/missing_fn", "POST")]["error_rate"], 1.0)
+        self.assertEqual(snapshot["routes"][0]["route"], "background")
+        self.assertEqual(snapshot["slow_queries"], [])
+
+    def test_slow_queries_are_logged_with_filter_keys_only(self):
+        metrics = SupabaseQueryMetrics(slow_threshold=0)
+        with self.assertLogs("services.metrics", level="WARNING"):
+            metrics.record(table="schemes", method="GET", status=200, seconds=0.2, size=10, params={"id": "eq.1"})
+        slow = metrics.snapshot()["slow_queries"][0]
+        self.assertEqual(slow["table"], "schemes")
+        self.assertEqual(slow["filter_keys"], ["id"])
+        self.assertNotIn("eq.1", str(slow))
+
+    def test_calls_are_attributed_to_route_template(self):
+        metrics = SupabaseQueryMetrics(slow_threshold=60)
+        app = FastAPI()
+        app.add_middleware(RequestContextMiddleware)
+        router = APIRouter()
+
+        @router.get("/items/{item_id}")
+        async def read_item(item_id: str):
+            metrics.record(table="sourcing_items", method="GET", status=200, seconds=0.01, size=1)
+            return {"id": item_id}
+
+        app.include_router(router)
+        with TestClient(app) as client:
+            self.assertEqual(client.get("/items/42").status_code, 200)
+        self.assertEqual(metrics.snapshot()["routes"][0]["route"], "/items/{item_id}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import sys
+from pathlib import Path
+import unittest
+
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import core
+
+
+def make_client(handler):
+    client = core.SupabaseClient("https://example.supabase.co", "key")
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+async def collect(client, table, params, page_size):
+    rows = [row async for row in client.select_iter(table, params, page_size=page_size)]
+    await client.close()
+    return rows
+
+
+class SupabaseSelectIterTests(unittest.TestCase):
+    def test_keyset_pages_on_id(self):
+        rows = [{"id": f"id-{n}"} for n in range(5)]
+        requests = []
+
+        def handler(request):
+            params = dict(request.url.params)
+            requests.append(params)
+            after = params.get("and", "")
+            start = 0
+            if after:
+                last = after.split('id.gt."', 1)[1].split('"', 1)[0]
+                start = next(i for i, row in enumerate(rows) if row["id"] == last) + 1
+            return httpx.Response(200, json=rows[start : start + int(params["limit"])])
+
+        result = asyncio.run(collect(make_client(handler), "zhihu_questions", {"select": "id"}, 2))
+        self.assertEqual(result, rows)
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(requests[0]["order"], "id.asc")
+        self.assertNotIn("and", requests[0])
+        self.assertEqual(requests[2]["and"], '(id.gt."id-3")')
+
+    def test_explicit_order_uses_offset(self):
+        rows = [{"title": str(n)} for n in range(3)]
+        offsets = []
+
+        def handler(request):
+            params = dict(request.url.params)
+            offset = int(params["offset"])
+            offsets.append(offset)
+            return httpx.Response(200, json=rows[offset : offset + int(params["limit"])])
+
+        result = asyncio.run(
+            collect(make_client(handler), "benchmark_entries", {"select": "title", "order": "created_at.desc"}, 2)
+        )
+        self.assertEqual(result, rows)
+        self.assertEqual(offsets, [0, 2])
+
+    def test_helper_falls_back_to_select(self):
+        class PlainClient:
+            async def select(self, table, params=None):
+                return [{"id": "a"}, {"id": "b"}]
+
+        async def run():
+            return [row async for row in core.iter_supabase_rows(PlainClient(), "schemes")]
+
+        self.assertEqual(asyncio.run(run()), [{"id": "a"}, {"id": "b"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -32,6 +32,18 @@ class TaobaoDetailParserTests(unittest.TestCase):
         self.assertEqual(parsed.get("title"), "ATK ??U2V2????????????????????????")
         self.assertEqual(parsed.get("price"), "299.2")
 
+    def test_parse_taobao_detail_html_falls_back_to_first_priced_sku(self):
+        html = (
+            "<title>Page Title</title>"
+            '{"skuCore":{"sku2info":{'
+            '"5811018145970":{"price":{},"note":"{not a brace}"},'
+            '"5811018145971":{"price":{"priceText":"\\u00a5219"}}'
+            "}}}"
+        )
+        parsed = commission.parse_taobao_detail_html(html, "5984860336814")
+        self.assertEqual(parsed.get("title"), "Page Title")
+        self.assertEqual(parsed.get("price"), "219")
+
     @patch("backend.api.commission.fetch_taobao_detail_fallback", new_callable=AsyncMock)
     @patch("backend.api.commission.taobao_item_details", new_callable=AsyncMock)
     def test_taobao_product_info_uses_fallback_html_when_api_fails(self, mock_details, mock_fallback):
@@ -141,6 +141,20 @@ class ZhihuQuestionPagingTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(q2.get("view_count_delta"), 0)
         self.assertEqual(q2.get("answer_count_delta"), 0)
 
+    async def test_count_none_skips_count_and_keeps_has_more(self):
+        data = await main.list_zhihu_questions(limit=2, count="none")
+        self.assertEqual(self.client.count_calls, 0)
+        self.assertIsNone(data["total"])
+        self.assertTrue(data["pagination"]["has_more"])
+        self.assertEqual(len(data["items"]), 2)
+
+    async def test_next_cursor_for_updated_at_order(self):
+        for index, row in enumerate(self.client.questions):
+            row["updated_at"] = f"2026-02-0{9 - index}"
+        data = await main.list_zhihu_questions(limit=2)
+        cursor = data["pagination"]["next_cursor"]
+        self.assertEqual(main.decode_page_cursor(cursor), ("2026-02-08", "q2"))
+
     async def test_fetch_supabase_count_fallback_to_select(self):
         total = await main.fetch_supabase_count(_NoCountClient(), "zhihu_questions", {"title": "ilike.*A*"})
         self.assertEqual(total, 2)
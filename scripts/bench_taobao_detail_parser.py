@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Microbenchmark for the Taobao detail HTML parser.
+
+Times ``parse_taobao_detail_html`` against the previous implementation (kept below
+as the baseline, which re-finds and slice-copies the page per SKU) on saved detail
+pages, and checks both agree.
+Without page arguments a synthetic multi-megabyte page is generated.
+
+Usage: python scripts/bench_taobao_detail_parser.py [page.html ...] [--sku ID] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backend import core  # noqa: E402,F401  (routers import core first)
+from backend.api.commission import (  # noqa: E402
+    TAOBAO_TITLE_BLACKLIST,
+    _decode_js_string,
+    _extract_price_from_sku_obj,
+    parse_taobao_detail_html,
+)
+
+
+def _baseline_object_by_key(raw_html: str, key: str) -> dict:
+    needle = f'"{key}":{{'
+    idx = raw_html.find(needle)
+    if idx < 0:
+        return {}
+    start = idx + len(f'"{key}":')
+    depth = 0
+    end = None
+    for cursor, ch in enumerate(raw_html[start:], start=start):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                end = cursor + 1
+                break
+    if not end:
+        return {}
+    try:
+        return json.loads(raw_html[start:end])
+    except Exception:
+        return {}
+
+
+def _baseline_title(raw_html: str) -> str:
+    pattern = r'"(?:itemName|title|skuName)"\s*:\s*"([^"\\]*(?:\\.[^"\\]*)*)"'
+    candidates = []
+    for raw in re.findall(pattern, raw_html, flags=re.IGNORECASE):
+        decoded = _decode_js_string(raw).strip()
+        if decoded and decoded not in TAOBAO_TITLE_BLACKLIST:
+            candidates.append(decoded)
+    if candidates:
+        return sorted(candidates, key=len, reverse=True)[0]
+    match = re.search(r"<title>(.*?)</title>", raw_html, flags=re.IGNORECASE | re.DOTALL)
+    if not match:
+        return ""
+    text = match.group(1).strip()
+    return "" if text in TAOBAO_TITLE_BLACKLIST else text
+
+
+def baseline_parse(raw_html: str, sku_id: str = "") -> dict:
+    title = _baseline_title(raw_html)
+    price = ""
+    if sku_id:
+        price = _extract_price_from_sku_obj(_baseline_object_by_key(raw_html, sku_id))
+    if not price:
+        seen = set()
+        for match in re.finditer(r'"(\d{10,})":\{', raw_html):
+            key = match.group(1)
+            if key in seen:
+                continue
+            seen.add(key)
+            price = _extract_price_from_sku_obj(_baseline_object_by_key(raw_html, key))
+            if price:
+                break
+    payload = {}
+    if title:
+        payload["title"] = title
+    if price:
+        payload["price"] = price
+    return payload
+
+
+def synthetic_page(skus: int = 300, padding_kb: int = 3000) -> tuple[str, str]:
+    sku_info = {
+        str(5984860336000 + index): {
+            # 只有最后一个 SKU 有价，逼出逐个候选解析的路径
+            "price": {"priceText": f"{250 + index}.5"} if index == skus - 1 else {},
+            "quantity": index,
+        }
+        for index in range(skus)
+    }
+    filler = "<div class=\"desc\">" + "商品详情描述 " * 64 + "</div>\n"
+    body = filler * max(1, padding_kb * 1024 // len(filler.encode("utf-8")))
+    state = json.dumps(
+        {"item": {"title": "示例商品 标题"}, "skuCore": {"sku2info": sku_info}},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    # 详情页的初始状态在 <head> 内联，商品描述在其后
+    html = f"<html><head><title>示例商品</title><script>var data = {state};</script></head><body>{body}</body></html>"
+    return html, str(5984860336000 + skus - 1)
+
+
+def timed(func, html: str, sku: str, repeat: int) -> tuple[float, dict]:
+    best = float("inf")
+    result: dict = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(html, sku)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", type=Path)
+    parser.add_argument("--sku", default="", help="SKU id to price (defaults to none for saved pages)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [(path.name, path.read_text(encoding="utf-8", errors="ignore"), args.sku) for path in args.pages]
+    if not cases:
+        html, sku = synthetic_page()
+        cases.append(("synthetic (target sku)", html, args.sku or sku))
+        cases.append(("synthetic (sku fallback)", html, ""))
+
+    mismatches = 0
+    print(f"{'page':<32}{'size':>10}{'baseline ms':>14}{'current ms':>16}{'speedup':>9}")
+    for name, html, sku in cases:
+        baseline_s, expected = timed(baseline_parse, html, sku, args.repeat)
+        current_s, actual = timed(parse_taobao_detail_html, html, sku, args.repeat)
+        if actual != expected:
+            mismatches += 1
+            print(f"  mismatch on {name}: baseline={expected} current={actual}")
+        size_kb = len(html.encode("utf-8")) / 1024
+        print(
+            f"{name[:31]:<32}{size_kb:>8.0f}KB{baseline_s * 1000:>14.1f}{current_s * 1000:>16.1f}"
+            f"{baseline_s / current_s if current_s else 0:>8.1f}x"
+        )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Report the cold-import cost of the backend, per module.
+
+Runs ``python -X importtime -c "import backend.core"`` in a fresh interpreter and
+lists the slowest modules (cumulative time, children included).
+
+Usage: python scripts/import_report.py [--top 25] [--module backend.core]
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def collect(module: str) -> list[tuple[int, int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows: list[tuple[int, int, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="backend.core")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    rows = collect(args.module)
+    total = next((cumulative for cumulative, _, name in rows if name == args.module), 0)
+    print(f"import {args.module}: {total / 1000:.1f} ms")
+    print(f"{'cumulative ms':>14}  module")
+    for cumulative, depth, name in sorted(rows, reverse=True)[: args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {'  ' * depth}{name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
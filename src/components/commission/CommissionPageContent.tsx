@@ -17,6 +17,13 @@ import {
   getCommissionRowValues,
 } from "@/components/commission/commissionExport"
 import { buildCommissionArchiveSpec } from "@/components/commission/commissionArchive"
+import {
+  applyCommissionStateDelta,
+  buildCommissionStateDelta,
+  COMMISSION_STATE_ENDPOINT,
+  readCommissionStateVersion,
+  saveCommissionStateItems,
+} from "@/components/commission/commissionStateApi"
 import {
   BiliApiError,
   extractLinksFromComment,
@@ -57,7 +64,6 @@ const META_KEYS = {
 }
 
 const TEMP_STORAGE_KEY = "commission_temp_items_v1"
-const COMMISSION_STATE_ENDPOINT = "/api/commission/state"
 const CATEGORY_CACHE_KEY = "sourcing_category_cache_v1"
 const CATEGORY_CACHE_TTL = 5 * 60 * 1000
 const BENCHMARK_PICK_CACHE_KEY = "benchmark_pick_cache_v1"
@@ -279,17 +285,13 @@ const normalizeCommissionStateItems = (value: unknown): CommissionItem[] => {
   })
 }
 
-const fetchCommissionStateItems = async () => {
-  const response = await apiRequest<{ items?: unknown }>(COMMISSION_STATE_ENDPOINT)
+const fetchCommissionState = async () => {
+  const response = await apiRequest<{ items?: unknown; version?: unknown }>(COMMISSION_STATE_ENDPOINT)
   if (!Object.prototype.hasOwnProperty.call(response ?? {}, "items")) return null
-  return normalizeCommissionStateItems(response?.items)
-}
-
-const saveCommissionStateItems = async (items: CommissionItem[]) => {
-  await apiRequest(COMMISSION_STATE_ENDPOINT, {
-    method: "PUT",
-    body: JSON.stringify({ items }),
-  })
+  return {
+    items: normalizeCommissionStateItems(response?.items),
+    version: readCommissionStateVersion(response),
+  }
 }
 
 const API_BASE = import.meta.env.VITE_API_BASE?.replace(/\/$/, "") ?? ""
@@ -643,6 +645,8 @@ export default function CommissionPage() {
   const archiveInitFrameRef = useRef<number | null>(null)
   const itemsLoadedRef = useRef(false)
   const lastPersistedItemsRef = useRef("")
+  const lastPersistedListRef = useRef<CommissionItem[] | null>(null)
+  const stateVersionRef = useRef<number | null>(null)
   const pendingPersistItemsRef = useRef<CommissionItem[] | null>(null)
   const persistTimerRef = useRef<number | null>(null)
   const persistErrorShownRef = useRef(false)
@@ -654,9 +658,26 @@ export default function CommissionPage() {
     const snapshot = JSON.stringify(pending)
     if (snapshot === lastPersistedItemsRef.current) return
     try {
-      await saveCommissionStateItems(pending)
-      lastPersistedItemsRef.current = snapshot
+      const saved = await saveCommissionStateItems(
+        pending,
+        lastPersistedListRef.current,
+        stateVersionRef.current,
+        fetchCommissionState
+      )
+      stateVersionRef.current = saved.version
+      lastPersistedItemsRef.current = JSON.stringify(saved.items)
+      lastPersistedListRef.current = saved.items
       persistErrorShownRef.current = false
+      if (saved.items !== pending) {
+        // 冲突后已合并其他页面的改动：把保存期间的新编辑重放到合并结果上
+        const newer = pendingPersistItemsRef.current
+        const merged = newer
+          ? applyCommissionStateDelta(saved.items, buildCommissionStateDelta(pending, newer))
+          : saved.items
+        if (newer) pendingPersistItemsRef.current = merged
+        saveLocalItems(merged)
+        setItems(merged)
+      }
     } catch (error) {
       pendingPersistItemsRef.current = pending
       if (!persistErrorShownRef.current) {
@@ -690,8 +711,10 @@ export default function CommissionPage() {
     let active = true
     const loadItems = async () => {
       try {
-        const remoteItems = await fetchCommissionStateItems()
+        const remoteState = await fetchCommissionState()
         if (!active) return
+        const remoteItems = remoteState?.items ?? null
+        stateVersionRef.current = remoteState?.version ?? null
         const localItems = getLocalItems()
         if (remoteItems && remoteItems.length === 0 && localItems.length > 0) {
           setItems(localItems)
@@ -704,6 +727,7 @@ export default function CommissionPage() {
           setItems(remoteItems)
           itemsLoadedRef.current = true
           lastPersistedItemsRef.current = JSON.stringify(remoteItems)
+          lastPersistedListRef.current = remoteItems
           return
         }
       } catch {
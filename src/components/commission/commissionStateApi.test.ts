@@ -0,0 +1,80 @@
+import { afterEach, describe, expect, it, vi } from "vitest"
+import { ApiError, apiRequest } from "@/lib/api"
+import {
+  applyCommissionStateDelta,
+  buildCommissionStateDelta,
+  saveCommissionStateItems,
+} from "./commissionStateApi"
+
+vi.mock("@/lib/api", async () => {
+  const actual = await vi.importActual<typeof import("@/lib/api")>("@/lib/api")
+  return { ...actual, apiRequest: vi.fn() }
+})
+
+const apiRequestMock = vi.mocked(apiRequest)
+
+const item = (id: string, title = id) => ({ id, title })
+
+const httpError = (status: number) => new ApiError("failed", { code: `HTTP_${status}`, status })
+
+const requestBody = (call: number) => JSON.parse(String(apiRequestMock.mock.calls[call][1]?.body))
+
+describe("commissionStateApi", () => {
+  afterEach(() => {
+    apiRequestMock.mockReset()
+  })
+
+  it("applies a delta the same way the backend does", () => {
+    const previous = [item("a"), item("b"), item("c")]
+    const next = [item("d"), item("b", "B2"), item("a")]
+    const delta = buildCommissionStateDelta(previous, next)
+    expect(delta.remove).toEqual(["c"])
+    expect(applyCommissionStateDelta(previous, delta)).toEqual(next)
+  })
+
+  it("rebases local edits onto the latest state after a 409", async () => {
+    apiRequestMock.mockRejectedValueOnce(httpError(409)).mockResolvedValueOnce({ version: 8 })
+    const fetchLatest = vi.fn().mockResolvedValue({ items: [item("a"), item("x")], version: 7 })
+
+    const saved = await saveCommissionStateItems(
+      [item("a", "A2")],
+      [item("a")],
+      5,
+      fetchLatest
+    )
+
+    expect(fetchLatest).toHaveBeenCalledTimes(1)
+    expect(requestBody(1)).toEqual({ version: 7, upsert: [item("a", "A2")], remove: [] })
+    expect(saved).toEqual({ items: [item("a", "A2"), item("x")], version: 8 })
+    expect(apiRequestMock.mock.calls.some(([, options]) => options?.method === "PUT")).toBe(false)
+  })
+
+  it("surfaces repeated conflicts instead of overwriting", async () => {
+    apiRequestMock.mockRejectedValue(httpError(409))
+    const fetchLatest = vi.fn().mockResolvedValue({ items: [item("a")], version: 9 })
+
+    await expect(saveCommissionStateItems([item("b")], [item("a")], 5, fetchLatest)).rejects.toMatchObject({
+      status: 409,
+    })
+    expect(apiRequestMock.mock.calls.every(([, options]) => options?.method === "PATCH")).toBe(true)
+  })
+
+  it("falls back to a versioned PUT only when PATCH is unsupported", async () => {
+    apiRequestMock.mockRejectedValueOnce(httpError(405)).mockResolvedValueOnce({ version: 6 })
+
+    const saved = await saveCommissionStateItems([item("b")], [item("a")], 5, vi.fn())
+
+    expect(apiRequestMock.mock.calls[1][1]?.method).toBe("PUT")
+    expect(requestBody(1)).toEqual({ items: [item("b")], version: 5 })
+    expect(saved.version).toBe(6)
+  })
+
+  it("rethrows other failures without a PUT", async () => {
+    apiRequestMock.mockRejectedValueOnce(httpError(500))
+
+    await expect(saveCommissionStateItems([item("b")], [item("a")], 5, vi.fn())).rejects.toMatchObject({
+      status: 500,
+    })
+    expect(apiRequestMock).toHaveBeenCalledTimes(1)
+  })
+})
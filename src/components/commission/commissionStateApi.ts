@@ -0,0 +1,117 @@
+import { apiRequest } from "@/lib/api"
+
+export const COMMISSION_STATE_ENDPOINT = "/api/commission/state"
+
+// 版本冲突时最多按最新服务端状态重放几次本地改动
+const MAX_CONFLICT_RETRIES = 2
+
+type StateItem = { id: string }
+
+export type CommissionStateSnapshot<T extends StateItem> = {
+  items: T[]
+  version: number | null
+}
+
+export type CommissionStateDelta<T extends StateItem> = {
+  upsert: T[]
+  remove: string[]
+  order?: string[]
+}
+
+export const readCommissionStateVersion = (response: { version?: unknown } | null | undefined) =>
+  typeof response?.version === "number" ? response.version : null
+
+export const buildCommissionStateDelta = <T extends StateItem>(
+  previous: T[],
+  next: T[]
+): CommissionStateDelta<T> => {
+  const previousById = new Map(previous.map((item) => [item.id, JSON.stringify(item)]))
+  const nextIds = new Set(next.map((item) => item.id))
+  const upsert = next.filter((item) => previousById.get(item.id) !== JSON.stringify(item))
+  const remove = previous.filter((item) => !nextIds.has(item.id)).map((item) => item.id)
+  // 服务端默认保留原顺序、新增追加到末尾；只有顺序不同才发送 order
+  const defaultOrder = [
+    ...previous.filter((item) => nextIds.has(item.id)).map((item) => item.id),
+    ...next.filter((item) => !previousById.has(item.id)).map((item) => item.id),
+  ]
+  const desiredOrder = next.map((item) => item.id)
+  const orderChanged = defaultOrder.some((id, index) => id !== desiredOrder[index])
+  return { upsert, remove, order: orderChanged ? desiredOrder : undefined }
+}
+
+// 与后端 apply_commission_state_delta 的合并规则保持一致
+export const applyCommissionStateDelta = <T extends StateItem>(
+  items: T[],
+  delta: CommissionStateDelta<T>
+): T[] => {
+  const removed = new Set(delta.remove)
+  const changed = new Map(delta.upsert.map((item) => [item.id, item]))
+  const result: T[] = []
+  items.forEach((item) => {
+    if (removed.has(item.id)) return
+    result.push(changed.get(item.id) ?? item)
+    changed.delete(item.id)
+  })
+  changed.forEach((item, id) => {
+    if (!removed.has(id)) result.push(item)
+  })
+  if (!delta.order) return result
+  const byId = new Map(result.map((item) => [item.id, item]))
+  const ordered: T[] = []
+  new Set(delta.order).forEach((id) => {
+    const item = byId.get(id)
+    if (!item) return
+    ordered.push(item)
+    byId.delete(id)
+  })
+  return [...ordered, ...result.filter((item) => byId.has(item.id))]
+}
+
+const readStatus = (error: unknown) => {
+  const status = (error as { status?: unknown } | null)?.status
+  return typeof status === "number" ? status : undefined
+}
+
+/**
+ * 增量保存佣金列表，返回服务端确认后的列表与版本。
+ *
+ * 409 时拉取最新状态，把本地改动（previous -> items）重放到最新列表上再提交，
+ * 因此返回的 items 可能包含其他页面的改动；多次冲突则抛出错误。服务端不支持
+ * PATCH（404/405）时才退回整表 PUT，并带上 version 由服务端拒绝过期写入。
+ */
+export const saveCommissionStateItems = async <T extends StateItem>(
+  items: T[],
+  previous: T[] | null,
+  version: number | null,
+  fetchLatest: () => Promise<CommissionStateSnapshot<T> | null>
+): Promise<CommissionStateSnapshot<T>> => {
+  let target = items
+  let baseVersion = version
+  if (previous && version !== null) {
+    const localDelta = buildCommissionStateDelta(previous, items)
+    let base = previous
+    for (let attempt = 0; ; attempt += 1) {
+      try {
+        const response = await apiRequest<{ version?: unknown }>(COMMISSION_STATE_ENDPOINT, {
+          method: "PATCH",
+          body: JSON.stringify({ version: baseVersion, ...buildCommissionStateDelta(base, target) }),
+        })
+        return { items: target, version: readCommissionStateVersion(response) }
+      } catch (error) {
+        const status = readStatus(error)
+        if (status === 404 || status === 405) break
+        if (status !== 409 || attempt >= MAX_CONFLICT_RETRIES) throw error
+        const latest = await fetchLatest()
+        if (!latest || latest.version === null) throw error
+        base = latest.items
+        baseVersion = latest.version
+        target = applyCommissionStateDelta(latest.items, localDelta)
+      }
+    }
+  }
+  const response = await apiRequest<{ version?: unknown }>(COMMISSION_STATE_ENDPOINT, {
+    method: "PUT",
+    body: JSON.stringify(baseVersion === null ? { items: target } : { items: target, version: baseVersion }),
+  })
+  return { items: target, version: readCommissionStateVersion(response) }
+}
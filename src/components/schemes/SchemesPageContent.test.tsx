@@ -72,7 +72,7 @@ describe("SchemesPageContent", () => {
     let resolveSchemes: ((value: { schemes: [] }) => void) | null = null
 
     vi.mocked(apiRequest).mockImplementation((path: string) => {
-      if (path === "/api/schemes") {
+      if (path === "/api/schemes?fields=summary") {
         return new Promise((resolve) => {
           resolveSchemes = resolve
         })
@@ -54,7 +54,7 @@ export default function SchemesPage({ onEnterScheme }: SchemesPageProps) {
     ttlMs: 3 * 60 * 1000,
     pageSize: 50,
     initialFilters: { scope: "all" },
-    fetcher: async () => apiRequest<{ schemes: Scheme[] }>("/api/schemes"),
+    fetcher: async () => apiRequest<{ schemes: Scheme[] }>("/api/schemes?fields=summary"),
     mapResponse: (response) => ({
       items: Array.isArray(response.schemes) ? response.schemes : [],
       pagination: { hasMore: false, nextOffset: response.schemes?.length ?? 0 },
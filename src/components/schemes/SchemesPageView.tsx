@@ -146,7 +146,8 @@ export default function SchemesPageView({
           ) : (
             <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3" data-testid="schemes-card-grid">
               {filteredSchemes.map((scheme) => {
-                const itemCount = Array.isArray(scheme.items) ? scheme.items.length : 0
+                const itemCount =
+                  scheme.item_count ?? (Array.isArray(scheme.items) ? scheme.items.length : 0)
                 return (
                   <InteractiveCard asChild interactive key={scheme.id}>
                     <article
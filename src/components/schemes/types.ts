@@ -11,6 +11,7 @@ export interface Scheme {
   remark?: string
   created_at?: string
   items?: SchemeItem[]
+  item_count?: number
 }
 
 export interface SchemesPageProps {
@@ -0,0 +1,46 @@
+-- Trigram search for sourcing items: title / uid / pinyin keywords
+create extension if not exists pg_trgm;
+
+-- Full pinyin and initials of the title, e.g. "xiaomishouhuan xmsh";
+-- written by the backend on insert / title update
+alter table if exists sourcing_items
+  add column if not exists search_text text;
+
+create index if not exists sourcing_items_title_trgm_idx
+  on sourcing_items using gin (title gin_trgm_ops);
+
+create index if not exists sourcing_items_uid_trgm_idx
+  on sourcing_items using gin (uid gin_trgm_ops);
+
+create index if not exists sourcing_items_search_text_trgm_idx
+  on sourcing_items using gin (search_text gin_trgm_ops);
+
+-- Keyword search ordered by relevance: exact uid first, then trigram similarity
+create or replace function public.search_sourcing_items(
+  p_keyword text,
+  p_category_id text default null,
+  p_limit integer default 50,
+  p_offset integer default 0
+)
+returns setof sourcing_items
+language sql
+stable
+as $$
+  select s.*
+  from sourcing_items s
+  where (p_category_id is null or s.category_id::text = p_category_id)
+    and (
+      s.title ilike '%' || p_keyword || '%'
+      or s.uid ilike '%' || p_keyword || '%'
+      or s.search_text ilike '%' || lower(p_keyword) || '%'
+    )
+  order by
+    (lower(s.uid) = lower(p_keyword)) desc,
+    greatest(
+      similarity(s.title, p_keyword),
+      word_similarity(lower(p_keyword), coalesce(s.search_text, ''))
+    ) desc,
+    s.created_at desc
+  limit p_limit
+  offset p_offset;
+$$;
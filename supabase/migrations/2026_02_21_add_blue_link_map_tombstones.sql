@@ -0,0 +1,12 @@
+-- Soft-delete tombstones for blue-link map delta sync (/api/blue-link-map/state-v2?since=...)
+alter table if exists blue_link_map_entries
+  add column if not exists deleted_at timestamptz;
+
+-- Delta reads: rows (live or tombstoned) changed since a version
+create index if not exists blue_link_map_entries_updated_at_idx
+  on blue_link_map_entries (updated_at);
+
+-- Full snapshot reads only live rows
+create index if not exists blue_link_map_entries_live_updated_at_idx
+  on blue_link_map_entries (updated_at desc)
+  where deleted_at is null;
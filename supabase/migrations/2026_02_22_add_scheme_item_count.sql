@@ -0,0 +1,6 @@
+-- Item count for the scheme list (/api/schemes?fields=summary), kept in sync by Postgres
+alter table if exists schemes
+  add column if not exists item_count integer
+  generated always as (
+    case when jsonb_typeof(items) = 'array' then jsonb_array_length(items) else 0 end
+  ) stored;
@@ -0,0 +1,22 @@
+-- Optimistic concurrency for scheme item patches (PATCH /api/schemes/{id}/items)
+alter table if exists schemes
+  add column if not exists version integer not null default 0;
+
+-- Every write that changes items (item patches, full rewrites, field syncs) bumps the version
+create or replace function public.bump_scheme_version()
+returns trigger
+language plpgsql
+as $$
+begin
+  if new.items is distinct from old.items then
+    new.version := old.version + 1;
+  end if;
+  return new;
+end;
+$$;
+
+drop trigger if exists schemes_bump_version on schemes;
+create trigger schemes_bump_version
+  before update on schemes
+  for each row
+  execute function public.bump_scheme_version();
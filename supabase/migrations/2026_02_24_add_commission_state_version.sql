@@ -0,0 +1,21 @@
+-- Versioned delta updates for the commission list (PATCH /api/commission/state)
+alter table if exists public.commission_state
+  add column if not exists version integer not null default 0;
+
+create or replace function public.bump_commission_state_version()
+returns trigger
+language plpgsql
+as $$
+begin
+  if new.items is distinct from old.items then
+    new.version := old.version + 1;
+  end if;
+  return new;
+end;
+$$;
+
+drop trigger if exists commission_state_bump_version on public.commission_state;
+create trigger commission_state_bump_version
+  before update on public.commission_state
+  for each row
+  execute function public.bump_commission_state_version();
@@ -0,0 +1,25 @@
+-- Deleting a blue-link map category now tombstones its entries (deleted_at) instead of
+-- hard-deleting them, so delta sync can report the removals. Re-point the entries ->
+-- categories foreign key to ON DELETE SET NULL so the category row can still be
+-- deleted without cascading the tombstones away.
+alter table if exists blue_link_map_entries
+  alter column category_id drop not null;
+
+do $$
+declare
+  fk record;
+begin
+  for fk in
+    select con.conname
+    from pg_constraint con
+    where con.contype = 'f'
+      and con.conrelid = 'blue_link_map_entries'::regclass
+      and con.confrelid = 'blue_link_map_categories'::regclass
+  loop
+    execute format('alter table blue_link_map_entries drop constraint %I', fk.conname);
+  end loop;
+
+  alter table blue_link_map_entries
+    add constraint blue_link_map_entries_category_id_fkey
+    foreign key (category_id) references blue_link_map_categories (id) on delete set null;
+end $$;
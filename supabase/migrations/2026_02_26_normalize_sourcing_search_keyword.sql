@@ -0,0 +1,37 @@
+-- Normalise the search_sourcing_items keyword the same way the backend does
+-- (normalize_sourcing_keyword): the pinyin keyword is lowercased with spaces removed,
+-- and LIKE wildcards (% _ \) in the keyword match literally.
+create or replace function public.search_sourcing_items(
+  p_keyword text,
+  p_category_id text default null,
+  p_limit integer default 50,
+  p_offset integer default 0
+)
+returns setof sourcing_items
+language sql
+stable
+as $$
+  with kw as (
+    select
+      replace(replace(replace(p_keyword, '\', '\\'), '%', '\%'), '_', '\_') as text_pattern,
+      replace(replace(replace(replace(lower(p_keyword), ' ', ''), '\', '\\'), '%', '\%'), '_', '\_') as pinyin_pattern,
+      replace(lower(p_keyword), ' ', '') as pinyin_keyword
+  )
+  select s.*
+  from sourcing_items s, kw
+  where (p_category_id is null or s.category_id::text = p_category_id)
+    and (
+      s.title ilike '%' || kw.text_pattern || '%'
+      or s.uid ilike '%' || kw.text_pattern || '%'
+      or (kw.pinyin_keyword <> '' and s.search_text ilike '%' || kw.pinyin_pattern || '%')
+    )
+  order by
+    (lower(s.uid) = lower(p_keyword)) desc,
+    greatest(
+      similarity(s.title, p_keyword),
+      word_similarity(kw.pinyin_keyword, coalesce(s.search_text, ''))
+    ) desc,
+    s.created_at desc
+  limit p_limit
+  offset p_offset;
+$$;
@@ -0,0 +1,18 @@
+-- Bulk write-back for sourcing AI fill: one call per chunk instead of one PATCH per item.
+-- p_updates: [{"id": "<item id>", "fields": {"spec": {...}, "remark": "...", "updated_at": "..."}}]
+-- Only existing rows are updated; only the keys present in "fields" are changed.
+-- Returns the ids that were updated.
+create or replace function public.apply_sourcing_ai_updates(p_updates jsonb)
+returns table (id text)
+language sql
+as $$
+  update sourcing_items s
+  set
+    spec = case when u.fields ? 'spec' then r.spec else s.spec end,
+    remark = case when u.fields ? 'remark' then r.remark else s.remark end,
+    updated_at = case when u.fields ? 'updated_at' then r.updated_at else s.updated_at end
+  from jsonb_to_recordset(p_updates) as u(id text, fields jsonb),
+    lateral jsonb_populate_record(null::sourcing_items, u.fields || jsonb_build_object('id', u.id)) as r
+  where s.id = r.id
+  returning s.id::text;
+$$;